@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+
+class AggregationEngine():
+    """
+    Moteur de comptage par np.bincount sur des codes entiers.
+
+    Les comptages sont calculés directement sur les codes des colonnes encodées
+    (dtype category), sans DataFrame intermédiaire ni groupby. Chaque méthode
+    retourne des tableaux NumPy accompagnés de leurs vecteurs d'étiquettes.
+    """
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def bincount_nd(indices, shape):
+        """
+        Comptage multidimensionnel: nombre d'occurrences de chaque combinaison d'indices.
+
+        Args:
+            indices: Liste de tableaux d'indices entiers de même longueur, un par axe
+            shape: Taille de chaque axe
+
+        Returns:
+            numpy.ndarray: Tableau de comptages de forme shape
+        """
+        flat = np.ravel_multi_index(tuple(np.asarray(i, dtype=np.int64) for i in indices), shape)
+        return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+    @staticmethod
+    def get_codes(series):
+        """Codes entiers (-1 pour les valeurs manquantes) et étiquettes d'une colonne."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy(), series.cat.categories.tolist()
+        codes, labels = pd.factorize(series.to_numpy(), sort=True)
+        return codes, labels.tolist()
+
+    def count(self, data, column):
+        """
+        Comptage des valeurs d'une colonne.
+
+        Returns:
+            tuple: (labels, counts) avec counts[i] le nombre de lignes d'étiquette labels[i]
+        """
+        codes, labels = self.get_codes(data[column])
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        return labels, counts
+
+    def count_by_period(self, data, column, time_granularity=1):
+        """
+        Comptage croisé (période × valeur) d'une colonne.
+
+        Seules les périodes et les valeurs présentes sont conservées.
+
+        Args:
+            data: DataFrame avec la colonne Year_Ceremony et la colonne étudiée
+            column: Colonne étudiée
+            time_granularity: Taille des périodes en années (1, 5, 10, ...)
+
+        Returns:
+            tuple: (periods, labels, counts) où counts est de forme (len(periods), len(labels))
+        """
+        codes, labels = self.get_codes(data[column])
+        valid = codes >= 0
+        if not valid.any():
+            return [], [], np.zeros((0, 0), dtype=np.int64)
+
+        years = data['Year_Ceremony'].to_numpy()[valid].astype(np.int64)
+        buckets = (years // time_granularity) * time_granularity
+        first = buckets.min()
+        n_periods = int((buckets.max() - first) // time_granularity) + 1
+        counts = self.bincount_nd([(buckets - first) // time_granularity, codes[valid]], (n_periods, len(labels)))
+
+        present_periods = counts.sum(axis=1) > 0
+        present_labels = counts.sum(axis=0) > 0
+        periods = first + time_granularity * np.flatnonzero(present_periods)
+        return (
+            periods.tolist(),
+            [label for label, keep in zip(labels, present_labels) if keep],
+            counts[present_periods][:, present_labels],
+        )
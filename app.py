@@ -1,17 +1,26 @@
 # dash app
 import dash
+import dash._callback
+import flask
 from dash import dcc
 from dash import html
-from dash.dependencies import Input, Output
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from dash.exceptions import MissingCallbackContextException
 import json
+import os
 
 import figures.figure_1 as figure_1
 import figures.figure_3 as figure_3
 import figures.figure_4 as figure_4
 import figures.figure_2 as figure_2
 
-from helper import DataLoader
-from layout import create_figure_section
+from cache import FigureCache
+from helper import DEMOGRAPHIC_COLUMNS, FILTER_COLUMNS, HOVER_COLUMNS, DataLoader, QueryContext, generate_color_dict
+from layout import create_figure_section, create_filter_panel
+from metrics import MetricsRegistry
+from profiling import RequestProfiler
+from serialization import FigureEncoder, install_raw_json
+from warmup import Warmup
 
 print("\nLancement de l'application Dash...")
 
@@ -25,6 +34,9 @@ app = dash.Dash(__name__,
                 ],
                 update_title=None)
 
+# Serveur Flask sous-jacent, pour les serveurs WSGI (voir wsgi.py)
+server = app.server
+
 # Modification du titre de l'onglet du navigateur
 app.title = "Oscars - Analyse de diversité"
 
@@ -66,11 +78,54 @@ hauteur_default_figure = 700
 
 espace_entre_figures = 150
 
+# Nombre de catégories affichées individuellement dans le Sankey (figure 2), les autres étant regroupées dans 'Other'
+nb_categories_sankey = 5
+
+# Nombre maximal de figures conservées dans le cache LRU
+taille_cache_figures = 256
+
+# Au-delà de ce nombre de points, le graphique en gaufre passe en rendu WebGL (une seule trace)
+seuil_waffle_webgl = 3000
+
+# Survol différé des figures 1 et 3: les figures ne portent que des identifiants et le détail
+# de l'infobulle est calculé au survol (OSCARS_SURVOL_DIFFERE=0 pour revenir aux infobulles intégrées)
+survol_differe = os.environ.get('OSCARS_SURVOL_DIFFERE', '1') != '0'
+
+# Agrégation côté client des figures 2 à 4: le cube de comptages est envoyé une fois au navigateur
+# et les callbacks de ces figures s'exécutent en JavaScript (assets/aggregation.js). Nécessite le survol
+# différé: les exemples de personnes des infobulles intégrées (figure 3) ne se déduisent pas du cube
+agregation_client = os.environ.get('OSCARS_AGREGATION_CLIENT', '0') == '1' and survol_differe
+if os.environ.get('OSCARS_AGREGATION_CLIENT', '0') == '1' and not survol_differe:
+    print("OSCARS_AGREGATION_CLIENT ignoré: l'agrégation côté client nécessite le survol différé")
+
+# Métriques de temps par étape exposées au format Prometheus sur /metrics (OSCARS_METRIQUES=0 pour désactiver).
+# Avec plusieurs processus (gunicorn), OSCARS_METRIQUES_DIR désigne le dossier partagé où les métriques de
+# chaque processus sont additionnées (défini par gunicorn.conf.py)
+metriques = os.environ.get('OSCARS_METRIQUES', '1') != '0'
+dossier_metriques = os.environ.get('OSCARS_METRIQUES_DIR') or None
+
+# Profilage cProfile des callbacks: toutes les requêtes avec OSCARS_PROFILAGE=1, sinon seulement celles qui
+# portent l'en-tête X-Oscars-Profile avec le jeton secret OSCARS_PROFILAGE_JETON, depuis la machine locale.
+# Profils consultables sur /_profiles avec le même en-tête. Sans jeton (défaut), l'en-tête est ignoré et /_profiles
+# est désactivé: derrière un proxy local (gunicorn), l'adresse de la requête ne prouve rien. OSCARS_PROFILAGE=1
+# exige donc aussi le jeton: sans lui, chaque callback paierait le profilage sans que les profils soient lisibles
+jeton_profilage = os.environ.get('OSCARS_PROFILAGE_JETON') or None
+profilage = os.environ.get('OSCARS_PROFILAGE', '0') == '1' and jeton_profilage is not None
+if os.environ.get('OSCARS_PROFILAGE', '0') == '1' and jeton_profilage is None:
+    print('OSCARS_PROFILAGE ignoré: définir OSCARS_PROFILAGE_JETON pour consulter les profils sur /_profiles')
+nb_profils = int(os.environ.get('OSCARS_NB_PROFILS', '20'))
+
+# Préchauffage du cache de figures au démarrage (OSCARS_PRECHAUFFAGE=1): états initiaux de chaque onglet,
+# rendus par OSCARS_PRECHAUFFAGE_WORKERS processus (défaut: nombre de cœurs) en au plus OSCARS_PRECHAUFFAGE_BUDGET secondes
+prechauffage = os.environ.get('OSCARS_PRECHAUFFAGE', '0') == '1'
+workers_prechauffage = int(os.environ['OSCARS_PRECHAUFFAGE_WORKERS']) if 'OSCARS_PRECHAUFFAGE_WORKERS' in os.environ else None
+budget_prechauffage = float(os.environ.get('OSCARS_PRECHAUFFAGE_BUDGET', '60'))
+
 
 # Textes pour les explications (syntaxe Markdown: **texte** pour gras)
 txt_fig1 = """Dans ce graphique, **chacun des points représente un gagnant ou un nominé aux Oscars**. En passant en survol sur chacun de ces points, un encadré vous indique à qui est attribué ce point. 
 
-*Avez-vous réussi à trouver la première femme noire à avoir reçu un oscar ?*
+*Avez-vous réussi à trouver la première femme noire à avoir reçu un oscar ?* Le champ de recherche met en évidence les points d'une personne ou d'un film.
 
 Si nous analysons les résultats de l'onglet **Ethnie**, nous voyons la distribution des gagnants selon les groupes ethniques. Sur les 416 gagnants, **seulement 50 font partie de la population non-blanche**. Ce qui équivaut à 12% des gagnants. Étant donné que 40% de la population totale des État-Unis est non-blanche (selon Wikipédia), on peut estimer que les gagnants des Oscars ne représentent pas bien les gens de la diversité culturelle. 
 
@@ -108,6 +163,21 @@ De nos jours, cette tendance semble tranquillement se renverser à cause de la c
 Malgré ces progrès, **le chemin vers une représentation équitable reste long**. Notre visualisation souligne l'importance de continuer à promouvoir la diversité et l'inclusion dans l'industrie cinématographique.
 """
 
+dataloader = DataLoader()
+dataloader.load_preprocessed('assets/The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+df = dataloader.filter_data(1928, 2025)
+distribution_dict, total = dataloader.get_unique_distribution(df)
+
+# Libellés des colonnes des filtres croisés
+libelles_filtres = {
+    'Category': 'Catégorie de prix',
+    'Age': 'Âge',
+    'Gender': 'Genre',
+    'Race or Ethnicity': 'Ethnie',
+    'Religion': 'Religion',
+    'Sexual orientation': 'Orientation',
+}
+
 app.layout = \
     html.Div([
 
@@ -125,11 +195,22 @@ app.layout = \
         
         html.Main(children=[
 
+            # Filtres croisés, communs aux quatre figures
+            create_filter_panel(
+                [(col, libelles_filtres[col], dataloader.get_vocabulary(col)) for col in FILTER_COLUMNS],
+                font=FONT,
+            ),
+
+            # Espace entre les filtres et la première figure
+            html.Div(style={'height': f'{espace_entre_figures}px', 'width': '100%', 'clear': 'both'}),
+
             # Figure 1
             create_figure_section(
                 figure_id=1,
                 title='Portrait des gagnants: Qui sont les lauréats des Oscars?',
                 graph_id='waffle-chart',
+                has_tooltip=survol_differe,
+                has_search=True,
                 has_checklist=True,
                 intervalle=intervalle_defaut,
                 font=FONT,
@@ -159,6 +240,7 @@ app.layout = \
                 figure_id=3,
                 title='La progression à travers le temps: L\'évolution de la diversité aux Oscars',
                 graph_id='line-chart',
+                has_tooltip=survol_differe,
                 has_checklist=True,
                 intervalle=intervalle_defaut,
                 font=FONT,
@@ -216,145 +298,266 @@ app.layout = \
     ],
     style={'width': '80%', 'margin': 'auto', 'fontFamily': FONT})
 
-dataloader = DataLoader()
-dataloader.load_data('assets/The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
-dataloader.preprocess_data()
-df = dataloader.filter_data(1928, 2025)
-distribution_dict, total = dataloader.get_unique_distribution(df)
+
+# Cache des figures partagé par les quatre callbacks de figures. Les figures y sont stockées déjà
+# sérialisées en JSON: un succès évite à la fois la construction de la figure et son encodage
+figure_cache = FigureCache(maxsize=taille_cache_figures)
+figure_encoder = FigureEncoder()
+install_raw_json(dash._callback)
 
 # Fonctions utilitaires pour les callbacks
-def get_filtered_distribution(year_range, category, winner_filter, include_other=False):
-    """Fonction utilitaire pour obtenir la distribution filtrée des données"""
-    is_winner = None if winner_filter == 'all' else True
-    df = dataloader.filter_data(year_range[0], year_range[1], is_winner=is_winner)
-    distribution_dict, _ = dataloader.get_unique_distribution(df)
-    
-    # Préparation des options pour la checklist
-    options = [{'label': key, 'value': key} for key in distribution_dict[category].keys()]
-    if include_other:
-        options.append({'label': 'Other', 'value': 'Other'})
-    
-    # Sélection des 5 premières catégories par défaut
-    selected_categories = list(distribution_dict[category].keys())[:5]
-    if include_other and len(distribution_dict[category]) > 5:
-        selected_categories.append('Other')
+def get_triggered_id():
+    """Identifiant du composant déclencheur, None au chargement initial ou hors d'une requête Dash"""
+    try:
+        return dash.callback_context.triggered_id
+    except MissingCallbackContextException:
+        return None
+
+
+def server_callback(*args, **kwargs):
+    """Comme app.callback, sauf en mode d'agrégation côté client où la version JavaScript est utilisée."""
+    if agregation_client:
+        return lambda func: func
+    return app.callback(*args, **kwargs)
+
+
+def resolve_selection(context, figure_id, selected_categories, include_other):
+    """
+    Détermine les sorties de la checklist et la sélection à tracer pour une interaction.
     
-    return df, distribution_dict, options, selected_categories
+    Si la checklist est à l'origine de l'interaction, ses options et sa valeur sont conservées.
+    Sinon (slider, onglet, filtre, chargement initial), la sélection revient aux valeurs par défaut
+    et la figure est tracée directement avec celle-ci, sans second passage par le callback.
+    """
+    if get_triggered_id() == f'category-checklist_fig_{figure_id}':
+        return dash.no_update, dash.no_update, context.sort_like_options(selected_categories)
+    default_selection = context.get_default_selection(include_other)
+    return context.get_options(include_other), default_selection, context.sort_like_options(default_selection)
+
+
+# Filtres croisés: les contrôles du panneau sont rassemblés dans un Store, entrée des quatre figures
+@app.callback(
+    Output('cross-filter-store', 'data'),
+    Output('cross-filter-count', 'children'),
+    [Input(f'cross-filter-values_{i}', 'value') for i in range(len(FILTER_COLUMNS))],
+    [Input(f'cross-filter-mode_{i}', 'value') for i in range(len(FILTER_COLUMNS))],
+    Input('cross-filter-combine', 'value'),
+)
+def update_cross_filter(*args):
+    values, modes, combine = args[:len(FILTER_COLUMNS)], args[len(FILTER_COLUMNS):-1], args[-1]
+    filters = [
+        {'column': col, 'values': col_values, 'exclude': mode == 'exclude'}
+        for col, col_values, mode in zip(FILTER_COLUMNS, values, modes) if col_values
+    ]
+    # « ou »: une seule clause, disjonction des caractéristiques choisies
+    if combine == 'any' and len(filters) > 1:
+        filters = [{'any': filters}]
+    if not filters:
+        return None, f'Aucun filtre: {len(dataloader.data)} nominations.'
+    return filters, f'{dataloader.count_filtered_rows(filters)} nominations sur {len(dataloader.data)} correspondent aux filtres.'
 
 
 # Callbacks pour Figure 1
+# La figure est envoyée dans le Store 'waffle-chart-figure': le graphique la combine côté client avec
+# les points trouvés par la recherche (Store 'waffle-chart-highlight'), sans nouveau rendu serveur
 @app.callback(
     Output('category-checklist_fig_1', 'options'),
     Output('category-checklist_fig_1', 'value'),
+    Output('waffle-chart-figure', 'data'),
     Input('year-slider_fig_1', 'value'),
     Input('tabs_fig_1', 'value'),
+    Input('category-checklist_fig_1', 'value'),
     Input('winner-filter_fig_1', 'value'),
+    Input('cross-filter-store', 'data'),
 )
-def update_category_dropdown_fig_1(year_range, category, winner_filter):
-    # Filtrer par gagnants uniquement ou tous les nominés
-    df, distribution_dict, options, selected = get_filtered_distribution(
-        year_range, category, winner_filter, include_other=False
-    )
-    return options, selected
+def update_waffle_chart(year_range, category, selected_categories, winner_filter, filters=None):
+    context = QueryContext(dataloader, year_range, category, winner_filter, filters)
+    options, value, selected_categories = resolve_selection(context, 1, selected_categories, include_other=False)
+    return options, value, render_waffle_chart(context, selected_categories)
+
+def waffle_layout(context, selected_categories):
+    """Effectif des catégories affichées, par valeur décroissante, et mode de rendu du graphique en gaufre."""
+    class_num_dict = {key: context.distribution[key] for key in selected_categories}
+    # Trie du dictionnaire par valeur décroissante
+    sorted_dict = dict(sorted(class_num_dict.items(), key=lambda item: item[1], reverse=True))
+    render_mode = 'webgl' if sum(sorted_dict.values()) > seuil_waffle_webgl else 'svg'
+    return sorted_dict, render_mode
 
+@figure_cache.memoize
+def render_waffle_chart(context, selected_categories):
+    wchart = figure_1.WaffleChart()
+    sorted_dict, render_mode = waffle_layout(context, selected_categories)
+    fig = wchart.plot_scatter_waffle_chart(sorted_dict, context.df, context.category, height=hauteur_default_figure,
+                                           is_winner=context.is_winner, render_mode=render_mode, lazy_hover=survol_differe)
+    return figure_encoder.encode('waffle', fig)
+
+# Recherche par nom ou film: indices des points trouvés, pour les mêmes entrées que le graphique
 @app.callback(
-    Output('waffle-chart', 'figure'),
+    Output('waffle-chart-highlight', 'data'),
+    Output('search-count_fig_1', 'children'),
+    Input('search_fig_1', 'value'),
     Input('year-slider_fig_1', 'value'),
     Input('tabs_fig_1', 'value'),
     Input('category-checklist_fig_1', 'value'),
     Input('winner-filter_fig_1', 'value'),
-    allow_duplicate=True
+    Input('cross-filter-store', 'data'),
 )
-def update_waffle_chart(year_range, category, selected_categories, winner_filter):
-    is_winner = None if winner_filter == 'all' else True
-    df = dataloader.filter_data(year_range[0], year_range[1], is_winner=is_winner)
-    distribution_dict, _ = dataloader.get_unique_distribution(df)
-    wchart = figure_1.WaffleChart()
-    class_num_dict = {key: distribution_dict[category][key] for key in selected_categories}
-    # Trie du dictionnaire par valeur décroissante
-    sorted_dict = dict(sorted(class_num_dict.items(), key=lambda item: item[1], reverse=True))
-    return wchart.plot_scatter_waffle_chart(sorted_dict, df, category, height=hauteur_default_figure, is_winner=is_winner)
+def update_waffle_search(query, year_range, category, selected_categories, winner_filter, filters=None):
+    if not (query or '').strip():
+        return None, ''
+    row_ids = dataloader.search(query)
+    if len(row_ids) == 0:
+        return None, 'Aucun résultat.'
+    context = QueryContext(dataloader, year_range, category, winner_filter, filters)
+    sorted_dict, render_mode = waffle_layout(context, context.sort_like_options(selected_categories))
+    points = figure_1.WaffleChart().locate_points(sorted_dict, context.df, context.category, row_ids, render_mode)
+    n_points = sum(len(indices) for _, indices in points)
+    return points or None, f'{n_points} point(s) affiché(s) sur {len(row_ids)} nomination(s) trouvée(s).'
+
+app.clientside_callback(
+    ClientsideFunction(namespace='search', function_name='highlightWaffle'),
+    Output('waffle-chart', 'figure'),
+    Input('waffle-chart-figure', 'data'),
+    Input('waffle-chart-highlight', 'data'),
+)
+
+if survol_differe:
+    @app.callback(
+        Output('waffle-chart-tooltip', 'show'),
+        Output('waffle-chart-tooltip', 'bbox'),
+        Output('waffle-chart-tooltip', 'children'),
+        Input('waffle-chart', 'hoverData'),
+    )
+    def update_waffle_tooltip(hover_data):
+        if hover_data is None:
+            return False, dash.no_update, dash.no_update
+        point = hover_data['points'][0]
+        row = dataloader.get_rows(point['customdata'], HOVER_COLUMNS)[0]
+        children = html.Div([
+            html.B(row['Name']),
+            html.Br(), html.Br(),
+            html.I('Catégorie:'), f" {row['Category']}", html.Br(),
+            html.I('Film:'), ' ', html.Span(row['Film'], style={'color': '#1f77b4'}), html.Br(),
+            html.I('Année:'), f" {row['Year_Ceremony']}", html.Br(),
+            html.I('Statut:'), f" {'WINNER' if row['Win_Oscar?'] else 'NOMINEE'}",
+        ], style={'fontFamily': FONT, 'textAlign': 'left'})
+        return True, point['bbox'], children
 
 # Callbacks pour Figure 3
-@app.callback(
+@server_callback(
     Output('category-checklist_fig_3', 'options'),
     Output('category-checklist_fig_3', 'value'),
-    Input('year-slider_fig_3', 'value'),
-    Input('tabs_fig_3', 'value'),
-    Input('winner-filter_fig_3', 'value'),
-)
-def update_category_dropdown_fig_3(year_range, category, winner_filter):
-    df, distribution_dict, options, selected = get_filtered_distribution(
-        year_range, category, winner_filter, include_other=True
-    )
-    return options, selected
-
-@app.callback(
     Output('line-chart', 'figure'),
     Input('year-slider_fig_3', 'value'),
     Input('tabs_fig_3', 'value'),
     Input('category-checklist_fig_3', 'value'),
     Input('winner-filter_fig_3', 'value'),
     Input('scale-selector_fig_3', 'value'),
-    allow_duplicate=True
+    Input('cross-filter-store', 'data'),
 )
-def update_line_chart(year_range, category, selected_categories, winner_filter, scale_type):
-    is_winner = None if winner_filter == 'all' else True
-    df = dataloader.filter_data(year_range[0], year_range[1], is_winner=is_winner)
-    
-    # Données détaillées pour l'affichage au survol
-    hover_df = df.copy()
-    
-    # Obtenir les données cumulatives
-    distribution_dict = dataloader.get_cumulative_yearly_distribution(
-        df[['Year_Ceremony', category]], 
-        selected_categories,
-        time_granularity=1
+def update_line_chart(year_range, category, selected_categories, winner_filter, scale_type, filters=None):
+    context = QueryContext(dataloader, year_range, category, winner_filter, filters)
+    # Le changement d'échelle conserve la sélection courante
+    if get_triggered_id() == 'scale-selector_fig_3':
+        options, value, selected_categories = dash.no_update, dash.no_update, context.sort_like_options(selected_categories)
+    else:
+        options, value, selected_categories = resolve_selection(context, 3, selected_categories, include_other=True)
+    return options, value, render_line_chart(context, selected_categories, scale_type)
+
+@figure_cache.memoize
+def render_line_chart(context, selected_categories, scale_type):
+    # Obtenir les données cumulatives à partir du cube de comptages
+    distribution_dict = dataloader.get_range_cumulative_yearly_distribution(
+        context.year_range[0], context.year_range[1],
+        context.category,
+        is_winner=context.is_winner,
+        selected_categories=selected_categories,
+        time_granularity=1,
+        filters=context.filters
     )
     
     line_chart = figure_3.LineChart()
     
-    return line_chart.plot_line_chart(
+    # Données détaillées pour l'affichage au survol (infobulles intégrées seulement: le survol
+    # différé n'en a pas besoin et le filtrage des lignes serait un parcours inutile)
+    fig = line_chart.plot_line_chart(
         distribution_dict, 
-        category, 
+        context.category, 
         selected_categories, 
-        hover_df, 
+        None if survol_differe else context.df, 
         cumulative=True, 
         scale_type=scale_type,
-        height=hauteur_default_figure
+        height=hauteur_default_figure,
+        lazy_hover=survol_differe
     )
+    return figure_encoder.encode('line', fig)
+
+if survol_differe:
+    @app.callback(
+        Output('line-chart-tooltip', 'show'),
+        Output('line-chart-tooltip', 'bbox'),
+        Output('line-chart-tooltip', 'children'),
+        Input('line-chart', 'hoverData'),
+        State('tabs_fig_3', 'value'),
+        State('winner-filter_fig_3', 'value'),
+        State('category-checklist_fig_3', 'value'),
+        State('cross-filter-store', 'data'),
+    )
+    def update_line_tooltip(hover_data, category, winner_filter, selected_categories, filters):
+        if hover_data is None:
+            return False, dash.no_update, dash.no_update
+        point = hover_data['points'][0]
+        category_name, year, year_count = point['customdata'], int(point['x']), int(point['y'])
+
+        # Personnes de l'année pour la valeur survolée ('Other': valeurs hors sélection)
+        year_data = dataloader.filter_data(year, year, is_winner=None if winner_filter == 'all' else True, filters=filters)
+        if category_name == 'Other':
+            year_data = year_data[~year_data[category].isin([c for c in selected_categories if c != 'Other'])]
+        else:
+            year_data = year_data[year_data[category] == category_name]
+
+        children = [html.B(category_name), html.Br(), f'Année: {year}', html.Br(),
+                    f'Total cumulé: {year_count}', html.Br(), f'Nouveaux cette année: {len(year_data)}', html.Br()]
+        # Exemples de gagnants/nominés
+        if len(year_data):
+            children += [html.Br(), 'Exemples:', html.Br()]
+            for entry in year_data[['Name', 'Film']].head(3).to_dict('records'):
+                children += [f"• {entry['Name']} ({entry['Film']})", html.Br()]
+            if len(year_data) > 3:
+                children.append(f'...et {len(year_data) - 3} autres')
+        return True, point['bbox'], html.Div(children, style={'fontFamily': FONT, 'textAlign': 'left'})
 
 # Callbacks pour Figure 4
-@app.callback(
+@server_callback(
     Output('category-checklist_fig_4', 'options'),
     Output('category-checklist_fig_4', 'value'),
-    Input('year-slider_fig_4', 'value'),
-    Input('tabs_fig_4', 'value'),
-    Input('winner-filter_fig_4', 'value'),
-)
-def update_category_dropdown_fig_4(year_range, category, winner_filter):
-    df, distribution_dict, options, selected = get_filtered_distribution(
-        year_range, category, winner_filter, include_other=True
-    )
-    return options, selected
-
-@app.callback(
     Output('stacked-area-chart', 'figure'),
     Input('year-slider_fig_4', 'value'),
     Input('tabs_fig_4', 'value'),
     Input('category-checklist_fig_4', 'value'),
     Input('winner-filter_fig_4', 'value'),
     Input('granularity-selector_fig_4', 'value'),
-    allow_duplicate=True
+    Input('cross-filter-store', 'data'),
 )
-def update_stacked_area_chart(year_range, category, selected_categories, winner_filter, time_granularity):
-    is_winner = None if winner_filter == 'all' else True
-    df = dataloader.filter_data(year_range[0], year_range[1], is_winner=is_winner)
-    # Extraction de l'année et de la catégorie
-    distribution_dict = dataloader.get_yearly_distribution(
-        df[['Year_Ceremony', category]], 
-        selected_categories,
-        time_granularity=time_granularity
+def update_stacked_area_chart(year_range, category, selected_categories, winner_filter, time_granularity, filters=None):
+    context = QueryContext(dataloader, year_range, category, winner_filter, filters)
+    # Le changement de granularité conserve la sélection courante
+    if get_triggered_id() == 'granularity-selector_fig_4':
+        options, value, selected_categories = dash.no_update, dash.no_update, context.sort_like_options(selected_categories)
+    else:
+        options, value, selected_categories = resolve_selection(context, 4, selected_categories, include_other=True)
+    return options, value, render_stacked_area_chart(context, selected_categories, time_granularity)
+
+@figure_cache.memoize
+def render_stacked_area_chart(context, selected_categories, time_granularity):
+    # Distribution par période lue dans le cube de comptages
+    distribution_dict = dataloader.get_range_yearly_distribution(
+        context.year_range[0], context.year_range[1],
+        context.category,
+        is_winner=context.is_winner,
+        selected_categories=selected_categories,
+        time_granularity=time_granularity,
+        filters=context.filters
     )
     
     stacked_chart = figure_4.StackedAreaChart()
@@ -369,35 +572,177 @@ def update_stacked_area_chart(year_range, category, selected_categories, winner_
         margin=dict(l=30, r=30, t=30, b=50)
     )
     
-    return fig
+    return figure_encoder.encode('stacked_area', fig)
 
 # Callbacks pour Figure 2
-@app.callback(
+@server_callback(
     Output('category-checklist_fig_2', 'options'),
     Output('category-checklist_fig_2', 'value'),
-    Input('year-slider_fig_2', 'value'),
-    Input('tabs_fig_2', 'value'),
-)
-def update_category_dropdown_fig_2(year_range, category):
-    df, distribution_dict, options, selected = get_filtered_distribution(
-        year_range, category, "all", include_other=True
-    )
-    return options, selected
-
-@app.callback(
     Output('figure-2-graph', 'figure'),
     Input('tabs_fig_2', 'value'),
     Input('year-slider_fig_2', 'value'),
-    Input('category-checklist_fig_2', 'value')
+    Input('category-checklist_fig_2', 'value'),
+    Input('cross-filter-store', 'data'),
 )
-def update_sankey_chart(demographic_column, year_range, selected_categories):
+def update_sankey_chart(demographic_column, year_range, selected_categories, filters=None):
     # Inclure tous les nominés pour la comparaison
-    df = dataloader.filter_data(year_range[0], year_range[1], is_winner=None)
-    if selected_categories:
-        df = df[df[demographic_column].isin(selected_categories)]
+    context = QueryContext(dataloader, year_range, demographic_column, 'all', filters)
+    options, value, selected_categories = resolve_selection(context, 2, selected_categories, include_other=True)
+    return options, value, render_sankey_chart(context, selected_categories)
+
+@figure_cache.memoize
+def render_sankey_chart(context, selected_categories):
+    # Comptages (valeur × statut) lus dans le cube, restreints à la sélection
+    labels, counts = dataloader.get_range_win_counts(context.year_range[0], context.year_range[1], context.category,
+                                                     selected_categories=selected_categories, filters=context.filters)
     sankey = figure_2.SankeyDemographicChart()
-    return sankey.plot_sankey_chart(df, demographic_column, height=hauteur_default_figure)
+    fig = sankey.plot_sankey_chart(labels, counts, height=hauteur_default_figure, top_k=nb_categories_sankey)
+    return figure_encoder.encode('sankey', fig)
+
+
+def build_clientside_store(filters=None):
+    """
+    Données du mode d'agrégation côté client: cube de comptages, palettes de couleurs et
+    mises en page des figures 2 à 4 (le thème Plotly commun n'est envoyé qu'une fois).
+
+    Avec des filtres croisés, le cube ne compte que les lignes qui les satisfont.
+    """
+    context = QueryContext(dataloader, intervalle_defaut, 'Race or Ethnicity', 'all')
+    selection = context.sort_like_options(context.get_default_selection(include_other=True))
+    figures = {
+        'sankey': render_sankey_chart(context, selection),
+        'line': render_line_chart(context, selection, 'linear'),
+        'stacked_area': render_stacked_area_chart(context, selection, 5),
+    }
+    layouts = {name: json.loads(fig.data)['layout'] for name, fig in figures.items()}
+    template = [layout.pop('template') for layout in layouts.values()][0]
+    n_max = max(len(dataloader.get_vocabulary(col)) for col in DEMOGRAPHIC_COLUMNS) + 1
+    return {
+        'cube': dataloader.export_count_cube(filters),
+        'palettes': {n: list(generate_color_dict(n_colors=n, colorscale_name='Oranges').values()) for n in range(1, n_max + 1)},
+        'layouts': layouts,
+        'template': template,
+        'shapes_2015': layouts['line'].get('shapes', []),
+        'sankey_top_k': nb_categories_sankey,
+    }
+
+
+if agregation_client:
+    app.layout.children.append(dcc.Store(id='count-cube-store', data=build_clientside_store()))
+
+    # Les filtres croisés ne peuvent pas être appliqués au cube global dans le navigateur: le cube
+    # filtré est renvoyé par le serveur, ce qui redéclenche les trois callbacks côté client
+    @app.callback(
+        Output('count-cube-store', 'data'),
+        Input('cross-filter-store', 'data'),
+        prevent_initial_call=True,
+    )
+    def update_count_cube_store(filters):
+        return build_clientside_store(filters)
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='aggregation', function_name='updateSankeyChart'),
+        Output('category-checklist_fig_2', 'options'),
+        Output('category-checklist_fig_2', 'value'),
+        Output('figure-2-graph', 'figure'),
+        Input('tabs_fig_2', 'value'),
+        Input('year-slider_fig_2', 'value'),
+        Input('category-checklist_fig_2', 'value'),
+        Input('count-cube-store', 'data'),
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='aggregation', function_name='updateLineChart'),
+        Output('category-checklist_fig_3', 'options'),
+        Output('category-checklist_fig_3', 'value'),
+        Output('line-chart', 'figure'),
+        Input('year-slider_fig_3', 'value'),
+        Input('tabs_fig_3', 'value'),
+        Input('category-checklist_fig_3', 'value'),
+        Input('winner-filter_fig_3', 'value'),
+        Input('scale-selector_fig_3', 'value'),
+        Input('count-cube-store', 'data'),
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='aggregation', function_name='updateStackedAreaChart'),
+        Output('category-checklist_fig_4', 'options'),
+        Output('category-checklist_fig_4', 'value'),
+        Output('stacked-area-chart', 'figure'),
+        Input('year-slider_fig_4', 'value'),
+        Input('tabs_fig_4', 'value'),
+        Input('category-checklist_fig_4', 'value'),
+        Input('winner-filter_fig_4', 'value'),
+        Input('granularity-selector_fig_4', 'value'),
+        Input('count-cube-store', 'data'),
+    )
+
+
+if metriques:
+    metrics_registry = MetricsRegistry(directory=dossier_metriques)
+    metrics_registry.instrument(dataloader, ['filter_data'], stage='filter')
+    metrics_registry.instrument(dataloader, ['get_unique_distribution', 'get_range_distribution', 'get_range_win_counts',
+                                             'get_range_yearly_distribution', 'get_range_cumulative_yearly_distribution'],
+                                stage='aggregation')
+    metrics_registry.instrument(figure_1.WaffleChart, ['plot_scatter_waffle_chart'], stage='plot')
+    metrics_registry.instrument(figure_2.SankeyDemographicChart, ['plot_sankey_chart'], stage='plot')
+    metrics_registry.instrument(figure_3.LineChart, ['plot_line_chart'], stage='plot')
+    metrics_registry.instrument(figure_4.StackedAreaChart, ['plot_stacked_area_chart'], stage='plot')
+    # Sérialisation JSON des réponses des callbacks (fonction to_json de dash._callback, dash==2.6.2)
+    metrics_registry.instrument_serialization(dash._callback)
+    metrics_registry.instrument_callbacks(app)
+    # Encodage des figures avant leur mise en cache, par type de figure
+    figure_encoder.observer = lambda name, seconds: metrics_registry.observe('encode', name, seconds)
+    metrics_registry.set_counter('oscars_figure_cache_hits_total', 'Succès du cache de figures', lambda: figure_cache.stats()['hits'])
+    metrics_registry.set_counter('oscars_figure_cache_misses_total', 'Échecs du cache de figures', lambda: figure_cache.stats()['misses'])
+    metrics_registry.set_counter('oscars_figure_cache_coalesced_total', 'Requêtes ayant attendu un calcul identique en cours',
+                                 lambda: figure_cache.stats()['coalesced'])
+    metrics_registry.set_gauge('oscars_figure_cache_size', 'Nombre de figures en cache', lambda: figure_cache.stats()['size'])
+
+    @server.route('/metrics')
+    def metrics_route():
+        return flask.Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_profiler = RequestProfiler(maxsize=nb_profils, always=profilage, token=jeton_profilage)
+server.view_functions['/_dash-update-component'] = request_profiler.wrap(server.view_functions['/_dash-update-component'])
+request_profiler.register_routes(server)
+
+
+def warmup_tasks():
+    """
+    États initiaux les plus fréquents: intervalle par défaut, sélection par défaut de chaque onglet,
+    les deux filtres gagnants, toutes les échelles (figure 3) et granularités (figure 4).
+    """
+    tasks = []
+    for category in DEMOGRAPHIC_COLUMNS:
+        for winner_filter in ('all', 'winners'):
+            context = QueryContext(dataloader, intervalle_defaut, category, winner_filter)
+            selection = context.sort_like_options(context.get_default_selection(include_other=True))
+            tasks.append((render_waffle_chart, (context, context.sort_like_options(context.get_default_selection()))))
+            if agregation_client:
+                # Figures 2 à 4 calculées dans le navigateur
+                continue
+            tasks += [(render_line_chart, (context, selection, scale_type)) for scale_type in ('linear', 'log')]
+            tasks += [(render_stacked_area_chart, (context, selection, time_granularity)) for time_granularity in (1, 5, 10)]
+            if winner_filter == 'all':
+                tasks.append((render_sankey_chart, (context, selection)))
+    return tasks
+
+
+warmup = Warmup(figure_cache, warmup_tasks() if prechauffage else [], workers=workers_prechauffage, budget=budget_prechauffage)
+if prechauffage:
+    warmup.start()
+else:
+    warmup.run()
+
+
+@server.route('/ready')
+def ready_route():
+    """Sonde de disponibilité: 503 tant que le préchauffage du cache n'est pas terminé."""
+    response = flask.jsonify(warmup.status())
+    response.status_code = 200 if warmup.ready else 503
+    return response
 
 
 if __name__ == '__main__':
-    app.run(port=8070, debug=True)
\ No newline at end of file
+    # Serveur de développement; en production, utiliser wsgi.py (OSCARS_DEBUG=0 désactive le mode debug)
+    app.run(port=8070, debug=os.environ.get('OSCARS_DEBUG', '1') != '0')
\ No newline at end of file
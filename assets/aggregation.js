@@ -0,0 +1,334 @@
+/*
+ * Mode d'agrégation côté client (OSCARS_AGREGATION_CLIENT=1).
+ *
+ * Le cube de comptages (DataLoader.export_count_cube) est envoyé une seule fois au
+ * navigateur dans le dcc.Store 'count-cube-store'. Les changements d'intervalle d'années,
+ * de filtre gagnants, de granularité et de sélection des figures 2 à 4 sont alors
+ * recalculés ici, sans aller-retour avec le serveur.
+ *
+ * Chaque fonction reproduit le callback serveur correspondant de app.py et retourne
+ * [options de la checklist, valeur de la checklist, figure].
+ */
+(function () {
+    'use strict';
+
+    // Nombre de catégories affichées par défaut avant regroupement dans 'Other'
+    const N_DEFAULT = 5;
+
+    function clip(value, low, high) {
+        return Math.min(Math.max(value, low), high);
+    }
+
+    function clone(obj) {
+        return JSON.parse(JSON.stringify(obj));
+    }
+
+    // Pourcentage à une décimale comme le format '.1f' de Python: les égalités exactes
+    // (x.x5 représentable, soit 4x entier impair) sont arrondies au chiffre pair, pas vers le haut
+    function formatPercent(value) {
+        if (Number.isInteger(value * 4) && (value * 4) % 2 !== 0) {
+            const tenths = Math.floor(value * 10);
+            return ((tenths % 2 === 0 ? tenths : tenths + 1) / 10).toFixed(1);
+        }
+        return value.toFixed(1);
+    }
+
+    function isWinnerFilter(winnerFilter) {
+        return winnerFilter === 'all' ? null : true;
+    }
+
+    // Comptages par (année, valeur) d'une colonne sur un intervalle d'années inclusif
+    function yearlyCounts(cube, column, yearRange, isWinner) {
+        const col = cube.columns[column];
+        const nValues = col.labels.length;
+        const first = cube.years[0];
+        const nYears = cube.years[1] - first + 1;
+        const start = clip(yearRange[0] - first, 0, nYears);
+        const end = clip(yearRange[1] - first + 1, start, nYears);
+        const wins = isWinner === null ? [0, 1] : (isWinner ? [1] : [0]);
+
+        const years = [];
+        const counts = [];
+        for (let y = start; y < end; y++) {
+            const row = new Array(nValues).fill(0);
+            for (const w of wins) {
+                const offset = (y * 2 + w) * nValues;
+                for (let v = 0; v < nValues; v++) {
+                    row[v] += col.counts[offset + v];
+                }
+            }
+            years.push(first + y);
+            counts.push(row);
+        }
+        return {periods: years, labels: col.labels, counts: counts};
+    }
+
+    // Total de chaque valeur sur toutes les périodes
+    function columnTotals(yearly) {
+        const totals = new Array(yearly.labels.length).fill(0);
+        for (const row of yearly.counts) {
+            row.forEach((count, v) => { totals[v] += count; });
+        }
+        return totals;
+    }
+
+    // Distribution triée par comptage décroissant (tri stable), valeurs absentes exclues
+    function distribution(yearly) {
+        const totals = columnTotals(yearly);
+        return yearly.labels
+            .map((label, v) => [label, totals[v]])
+            .filter(entry => entry[1] > 0)
+            .sort((a, b) => b[1] - a[1]);
+    }
+
+    // Regroupement par périodes de granularity ans; périodes et valeurs absentes retirées
+    function bucket(yearly, granularity) {
+        const periods = [];
+        const rows = [];
+        yearly.periods.forEach((year, y) => {
+            const period = Math.floor(year / granularity) * granularity;
+            if (periods.length === 0 || periods[periods.length - 1] !== period) {
+                periods.push(period);
+                rows.push(new Array(yearly.labels.length).fill(0));
+            }
+            const row = rows[rows.length - 1];
+            yearly.counts[y].forEach((count, v) => { row[v] += count; });
+        });
+
+        const totals = columnTotals({labels: yearly.labels, counts: rows});
+        const keptLabels = yearly.labels.map((label, v) => v).filter(v => totals[v] > 0);
+        const result = {periods: [], labels: keptLabels.map(v => yearly.labels[v]), counts: []};
+        rows.forEach((row, p) => {
+            if (row.some(count => count > 0)) {
+                result.periods.push(periods[p]);
+                result.counts.push(keptLabels.map(v => row[v]));
+            }
+        });
+        return result;
+    }
+
+    // Équivalent de fold_selected_counts: 'Other' = total moins les colonnes conservées
+    function foldSelected(table, selected) {
+        const position = new Map(table.labels.map((label, v) => [label, v]));
+        const kept = selected.filter(key => key !== 'Other' && position.has(key));
+        const labels = kept.slice();
+        const withOther = selected.includes('Other');
+        if (withOther) {
+            labels.push('Other');
+        }
+        const counts = table.counts.map(row => {
+            const folded = kept.map(key => row[position.get(key)]);
+            if (withOther) {
+                const total = row.reduce((a, b) => a + b, 0);
+                folded.push(total - folded.reduce((a, b) => a + b, 0));
+            }
+            return folded;
+        });
+        return {periods: table.periods, labels: labels, counts: counts};
+    }
+
+    function sortLikeOptions(dist, selected) {
+        const rank = new Map(dist.map((entry, i) => [entry[0], i]));
+        const key = value => (rank.has(value) ? rank.get(value) : rank.size);
+        return (selected || []).slice().sort((a, b) => key(a) - key(b));
+    }
+
+    function triggeredId() {
+        const ctx = window.dash_clientside.callback_context;
+        const triggered = ctx && ctx.triggered && ctx.triggered[0];
+        return triggered && triggered.prop_id ? triggered.prop_id.split('.')[0] : null;
+    }
+
+    // Équivalent de resolve_selection: options, valeur et sélection à tracer
+    function resolveSelection(dist, figureId, selected, includeOther, keepSelectionIds) {
+        const noUpdate = window.dash_clientside.no_update;
+        const triggered = triggeredId();
+        const keepIds = [`category-checklist_fig_${figureId}`].concat(keepSelectionIds || []);
+        if (keepIds.includes(triggered)) {
+            return [noUpdate, noUpdate, sortLikeOptions(dist, selected)];
+        }
+        const options = dist.map(entry => ({label: entry[0], value: entry[0]}));
+        const selection = dist.slice(0, N_DEFAULT).map(entry => entry[0]);
+        if (includeOther) {
+            options.push({label: 'Other', value: 'Other'});
+            if (dist.length > N_DEFAULT) {
+                selection.push('Other');
+            }
+        }
+        return [options, selection, sortLikeOptions(dist, selection)];
+    }
+
+    function colorsFor(store, n) {
+        return store.palettes[String(n)] || [];
+    }
+
+    function layoutFor(store, name) {
+        const layout = clone(store.layouts[name]);
+        layout.template = store.template;
+        return layout;
+    }
+
+    function updateSankeyChart(category, yearRange, selected, store) {
+        const yearly = yearlyCounts(store.cube, category, yearRange, null);
+        const dist = distribution(yearly);
+        const [options, value, selection] = resolveSelection(dist, 2, selected, true);
+
+        // Comptages des nominés et des gagnants, restreints aux valeurs sélectionnées
+        const winners = columnTotals(yearlyCounts(store.cube, category, yearRange, true));
+        const winnerOf = new Map(yearly.labels.map((label, v) => [label, winners[v]]));
+        const nominees = selection.length ? dist.filter(entry => selection.includes(entry[0])) : dist;
+
+        const topK = store.sankey_top_k;
+        const top = nominees.slice(0, topK);
+        const categories = top.map(entry => entry[0]);
+        const nomineeCounts = new Map(top);
+        const winnerCounts = new Map(categories.map(cat => [cat, winnerOf.get(cat)]));
+        if (nominees.length > topK) {
+            const rest = nominees.slice(topK);
+            categories.push('Other');
+            nomineeCounts.set('Other', rest.reduce((a, entry) => a + entry[1], 0));
+            winnerCounts.set('Other', rest.reduce((a, entry) => a + winnerOf.get(entry[0]), 0));
+        }
+        const percentage = cat => (nomineeCounts.get(cat) > 0 ? winnerCounts.get(cat) / nomineeCounts.get(cat) * 100 : 0);
+
+        // Nœuds: catégories, gagnants par catégorie, puis perdants
+        const rightLabels = categories.map(cat => `Gagnants ${cat} (${formatPercent(percentage(cat))}%)`);
+        const labels = categories.map(String).concat(rightLabels, ['Perdants']);
+        const losersTotal = categories.reduce((a, cat) => a + nomineeCounts.get(cat) - winnerCounts.get(cat), 0);
+        const customdata = categories.map(cat => `${cat} : ${nomineeCounts.get(cat)}`)
+            .concat(categories.map(cat => `Gagnants ${cat} : ${winnerCounts.get(cat)}`), [`Perdants : ${losersTotal}`]);
+
+        const palette = colorsFor(store, top.length);
+        const winnerLinks = {source: [], target: [], value: [], color: []};
+        const loserLinks = {source: [], target: [], value: [], color: []};
+        categories.forEach((cat, i) => {
+            if (winnerCounts.get(cat) > 0) {
+                winnerLinks.source.push(i);
+                winnerLinks.target.push(categories.length + i);
+                winnerLinks.value.push(winnerCounts.get(cat));
+                winnerLinks.color.push(cat === 'Other' ? 'gray' : palette[i]);
+            }
+            const losers = nomineeCounts.get(cat) - winnerCounts.get(cat);
+            if (losers > 0) {
+                loserLinks.source.push(i);
+                loserLinks.target.push(labels.length - 1);
+                loserLinks.value.push(losers);
+                loserLinks.color.push('lightgray');
+            }
+        });
+
+        const figure = {
+            data: [{
+                type: 'sankey',
+                node: {
+                    pad: 20,
+                    thickness: 20,
+                    label: labels,
+                    customdata: customdata,
+                    hovertemplate: '%{customdata}<extra></extra>',
+                    color: labels.map(() => '#d9d9d9'),
+                },
+                link: {
+                    source: loserLinks.source.concat(winnerLinks.source),
+                    target: loserLinks.target.concat(winnerLinks.target),
+                    value: loserLinks.value.concat(winnerLinks.value),
+                    color: loserLinks.color.concat(winnerLinks.color),
+                    hovertemplate: '%{source.label} → %{target.label}: %{value}<extra></extra>',
+                },
+            }],
+            layout: layoutFor(store, 'sankey'),
+        };
+        return [options, value, figure];
+    }
+
+    function updateLineChart(yearRange, category, selected, winnerFilter, scaleType, store) {
+        const yearly = yearlyCounts(store.cube, category, yearRange, isWinnerFilter(winnerFilter));
+        const dist = distribution(yearly);
+        const [options, value, selection] = resolveSelection(dist, 3, selected, true, ['scale-selector_fig_3']);
+
+        const folded = foldSelected(bucket(yearly, 1), selection);
+        const years = folded.periods;
+        const palette = colorsFor(store, selection.length);
+
+        const data = selection.map((name, i) => {
+            const column = folded.labels.indexOf(name);
+            const annual = years.map((year, p) => (column < 0 ? 0 : folded.counts[p][column]));
+            let total = 0;
+            const cumulative = annual.map(count => (total += count));
+            const trace = {
+                type: 'scatter',
+                x: years,
+                y: cumulative,
+                mode: 'lines+markers',
+                name: String(name),
+                line: {color: palette[i], width: 3},
+                marker: {size: 8, color: palette[i]},
+            };
+            // Survol différé seulement (voir app.py): détail résolu côté serveur par le callback de l'infobulle
+            trace.customdata = years.map(() => name);
+            trace.hoverinfo = 'none';
+            return trace;
+        });
+
+        // Ligne verticale pour marquer 2015 (si dans l'intervalle)
+        const layout = layoutFor(store, 'line');
+        layout.yaxis.type = scaleType;
+        layout.shapes = (years.length && years[0] <= 2015 && 2015 <= years[years.length - 1]) ? store.shapes_2015 : [];
+        return [options, value, {data: data, layout: layout}];
+    }
+
+    function updateStackedAreaChart(yearRange, category, selected, winnerFilter, granularity, store) {
+        const yearly = yearlyCounts(store.cube, category, yearRange, isWinnerFilter(winnerFilter));
+        const dist = distribution(yearly);
+        const [options, value, selection] = resolveSelection(dist, 4, selected, true, ['granularity-selector_fig_4']);
+
+        const folded = foldSelected(bucket(yearly, granularity), selection);
+        const periods = folded.periods.map(String);
+        const percentages = folded.counts.map(row => {
+            const total = row.reduce((a, b) => a + b, 0);
+            return row.map(count => count / total * 100);
+        });
+        // Comme côté serveur, les catégories sont lues dans les périodes: aucune période, aucune aire
+        const labels = periods.length ? folded.labels : [];
+        const palette = colorsFor(store, labels.length);
+
+        const data = labels.map((name, i) => ({
+            type: 'scatter',
+            x: periods,
+            y: percentages.map(row => row[i]),
+            mode: 'lines',
+            stackgroup: 'one',
+            name: String(name),
+            line: {width: 0},
+            fillcolor: palette[i],
+            hoverinfo: 'skip',
+        }));
+
+        // Trace invisible pour les infobulles personnalisées
+        data.push({
+            type: 'scatter',
+            x: periods,
+            y: periods.map(() => 50),
+            mode: 'markers',
+            marker: {opacity: 0},
+            hoverinfo: 'text',
+            hovertext: periods.map((period, p) => `Année : ${period}<br>` + folded.labels.map((name, i) =>
+                `${name} : ${formatPercent(percentages[p][i])}% (${folded.counts[p][i]})<br>`).join('')),
+            showlegend: false,
+        });
+        return [options, value, {data: data, layout: layoutFor(store, 'stacked_area')}];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        aggregation: {
+            updateSankeyChart: updateSankeyChart,
+            updateLineChart: updateLineChart,
+            updateStackedAreaChart: updateStackedAreaChart,
+        },
+    });
+
+    // Export pour les vérifications hors navigateur (node)
+    if (typeof module !== 'undefined') {
+        module.exports = window.dash_clientside.aggregation;
+    }
+})();
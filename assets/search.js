@@ -0,0 +1,59 @@
+/*
+ * Mise en évidence des résultats de la recherche par nom ou film dans le graphique en gaufre.
+ *
+ * Le serveur envoie la figure dans le dcc.Store 'waffle-chart-figure' et, à chaque recherche,
+ * seulement les indices des points trouvés ([indice de trace, [indices des points]]) dans
+ * 'waffle-chart-highlight'. Les points trouvés sont entourés par une trace superposée,
+ * construite ici à partir des coordonnées déjà présentes dans la figure.
+ */
+(function () {
+    'use strict';
+
+    const HIGHLIGHT_COLOR = '#1f77b4';
+
+    function overlayTrace(trace, points) {
+        const valid = points.filter(p => p < trace.x.length);
+        const size = typeof trace.marker.size === 'number' ? trace.marker.size : 10;
+        return {
+            type: trace.type || 'scatter',
+            x: valid.map(p => trace.x[p]),
+            y: valid.map(p => trace.y[p]),
+            xaxis: trace.xaxis,
+            yaxis: trace.yaxis,
+            mode: 'markers',
+            marker: {
+                symbol: 'circle-open',
+                size: size * 1.6 + 4,
+                color: HIGHLIGHT_COLOR,
+                line: {width: 3, color: HIGHLIGHT_COLOR},
+            },
+            hoverinfo: 'skip',
+            showlegend: false,
+        };
+    }
+
+    function highlightWaffle(figure, highlight) {
+        if (!figure) {
+            return window.dash_clientside.no_update;
+        }
+        if (!highlight || highlight.length === 0) {
+            return figure;
+        }
+        // Les traces de la figure ne sont pas copiées: seules les traces superposées sont ajoutées
+        const overlays = highlight
+            .filter(([trace]) => trace < figure.data.length)
+            .map(([trace, points]) => overlayTrace(figure.data[trace], points));
+        return {data: figure.data.concat(overlays), layout: Object.assign({}, figure.layout)};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        search: {
+            highlightWaffle: highlightWaffle,
+        },
+    });
+
+    // Export pour les vérifications hors navigateur (node)
+    if (typeof module !== 'undefined') {
+        module.exports = window.dash_clientside.search;
+    }
+})();
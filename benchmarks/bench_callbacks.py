@@ -0,0 +1,170 @@
+"""
+Suite de benchmarks des callbacks de app.py sur toute la grille d'entrées, sans navigateur.
+
+Chaque callback de figure (qui met aussi à jour les options et la valeur de sa checklist)
+est appelé par la vraie route de dispatch de Dash, sur la grille:
+onglets × filtre gagnants × intervalles d'années représentatifs × granularité (figure 4)
+× échelle (figure 3), pour deux déclencheurs: un changement d'onglet (sélection par défaut)
+et un changement de checklist (sélection conservée).
+
+Pour chaque cas, on mesure la latence à froid (cache de figures vidé) et à chaud (figure en
+cache), ainsi que la taille de la réponse JSON. Le rapport (p50/p95 par callback et détail
+par cas) est écrit en JSON. Avec --baseline, les p95 sont comparés à un rapport précédent et
+le script échoue si l'un d'eux dépasse la tolérance.
+
+Usage:
+    python benchmarks/bench_callbacks.py [--repeat 5] [--output callback_benchmark.json]
+                                         [--baseline ancien_rapport.json] [--tolerance 1.25]
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app as dash_app
+from count_callback_calls import dispatch, find_callback
+from helper import DEMOGRAPHIC_COLUMNS
+
+YEAR_RANGES = [[1928, 2025], [1928, 1960], [1960, 2000], [2000, 2025], [2015, 2015]]
+WINNER_FILTERS = ['winners', 'all']
+SCALES = ['linear', 'log']
+GRANULARITIES = [1, 5, 10]
+
+CALLBACKS = {1: 'update_waffle_chart', 2: 'update_sankey_chart', 3: 'update_line_chart', 4: 'update_stacked_area_chart'}
+
+
+def build_grid(figure_id, inputs):
+    """Valeurs des entrées de chaque cas de la grille d'une figure."""
+    ids = [i['id'] for i in inputs]
+    axes = {
+        f'tabs_fig_{figure_id}': DEMOGRAPHIC_COLUMNS,
+        f'winner-filter_fig_{figure_id}': WINNER_FILTERS,
+        f'year-slider_fig_{figure_id}': YEAR_RANGES,
+        f'scale-selector_fig_{figure_id}': SCALES,
+        f'granularity-selector_fig_{figure_id}': GRANULARITIES,
+    }
+    axes = {key: values for key, values in axes.items() if key in ids}
+    for combination in itertools.product(*axes.values()):
+        values = dict(zip(axes, combination))
+        values[f'category-checklist_fig_{figure_id}'] = []
+        values['cross-filter-store'] = None
+        yield values
+
+
+def percentiles(samples):
+    return {'p50': float(np.percentile(samples, 50)), 'p95': float(np.percentile(samples, 95))}
+
+
+def run_case(client, output, inputs, values, triggered, repeat):
+    """Latences (ms) à froid et à chaud et taille (octets) de la réponse d'un cas."""
+    cold, warm = [], []
+    for _ in range(repeat):
+        dash_app.figure_cache.clear()
+        start = time.perf_counter()
+        response = dispatch(client, output, inputs, values, [triggered])
+        cold.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        dispatch(client, output, inputs, values, [triggered])
+        warm.append((time.perf_counter() - start) * 1000)
+    return cold, warm, len(response.data)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Callbacks dont le p95 à froid dépasse tolerance × celui du rapport de référence."""
+    regressions = []
+    for name, summary in report['callbacks'].items():
+        reference = baseline.get('callbacks', {}).get(name)
+        if reference and summary['cold_ms']['p95'] > tolerance * reference['cold_ms']['p95']:
+            regressions.append((name, reference['cold_ms']['p95'], summary['cold_ms']['p95']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures par cas')
+    parser.add_argument('--output', default='callback_benchmark.json', help='Fichier du rapport JSON')
+    parser.add_argument('--baseline', help='Rapport de référence pour détecter les régressions')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='Facteur de p95 toléré par rapport à la référence')
+    args = parser.parse_args()
+
+    client = dash_app.app.server.test_client()
+    cases, summaries = [], {}
+
+    print(f"{'callback':<28} {'cas':>5} {'p50 froid':>10} {'p95 froid':>10} {'p50 chaud':>10} {'JSON moyen':>11}")
+    for figure_id, name in CALLBACKS.items():
+        output, inputs = find_callback(figure_id)
+        checklist = f'category-checklist_fig_{figure_id}'
+        all_cold, all_warm, sizes = [], [], []
+        for values in build_grid(figure_id, inputs):
+            # Changement d'onglet: options et sélection par défaut recalculées
+            cold, warm, size = run_case(client, output, inputs, values, f'tabs_fig_{figure_id}', args.repeat)
+            cases.append({'callback': name, 'trigger': 'tabs', 'inputs': values, 'cold_ms': percentiles(cold),
+                          'warm_ms': percentiles(warm), 'response_bytes': size})
+            all_cold += cold
+            all_warm += warm
+            sizes.append(size)
+
+            # Changement de checklist: sélection par défaut réutilisée telle quelle
+            default = json.loads(dispatch(client, output, inputs, values, [f'tabs_fig_{figure_id}']).data)['response']
+            checked = dict(values, **{checklist: default[checklist]['value']})
+            cold, warm, size = run_case(client, output, inputs, checked, checklist, args.repeat)
+            cases.append({'callback': name, 'trigger': 'checklist', 'inputs': checked, 'cold_ms': percentiles(cold),
+                          'warm_ms': percentiles(warm), 'response_bytes': size})
+            all_cold += cold
+            all_warm += warm
+            sizes.append(size)
+
+        summaries[name] = {
+            'cases': len(sizes),
+            'cold_ms': percentiles(all_cold),
+            'warm_ms': percentiles(all_warm),
+            'response_bytes': {'mean': float(np.mean(sizes)), 'max': int(np.max(sizes))},
+        }
+        summary = summaries[name]
+        print(f"{name:<28} {summary['cases']:>5} {summary['cold_ms']['p50']:>10.1f} {summary['cold_ms']['p95']:>10.1f} "
+              f"{summary['warm_ms']['p50']:>10.1f} {summary['response_bytes']['mean'] / 1024:>9.1f} Ko")
+
+    report = {
+        'metadata': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'repeat': args.repeat,
+        },
+        'callbacks': summaries,
+        'cases': cases,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'\nRapport écrit dans {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f'Régression: {name} p95 à froid {before:.1f} ms -> {after:.1f} ms')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
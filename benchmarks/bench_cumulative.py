@@ -0,0 +1,112 @@
+"""
+Micro-benchmark de la distribution cumulative (get_cumulative_yearly_distribution) et de la
+construction du graphique en aires empilées (figure 4), anciennes versions cellule par cellule
+contre versions vectorisées, à l'échelle 1×, 10× et 100×.
+
+Pour grossir le jeu de données, chaque copie est décalée d'autant d'années que la période
+d'origine: à 100×, on obtient ~100 fois plus de lignes et ~100 fois plus d'années.
+
+Usage:
+    python benchmarks/bench_cumulative.py [--scales 1 10 100] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import pandas as pd
+import plotly.graph_objects as go
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import DataLoader, generate_color_dict
+from figures.figure_4 import StackedAreaChart
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+COLUMN = 'Race or Ethnicity'
+
+
+def legacy_cumulative(dataloader, data, selected_categories=None, time_granularity=1):
+    """Ancienne version: DataFrame vide rempli cellule par cellule avec .loc, puis iterrows()."""
+    yearly_distribution = dataloader.get_yearly_distribution(data, selected_categories, time_granularity)
+    years = sorted(yearly_distribution.keys())
+    categories = list(set().union(*[d.keys() for d in yearly_distribution.values()]))
+    cumulative_df = pd.DataFrame(index=years, columns=categories).fillna(0)
+    for year, dist in yearly_distribution.items():
+        for category, count in dist.items():
+            cumulative_df.loc[year, category] = count
+    cumulative_df = cumulative_df.cumsum()
+    return {year: row.to_dict() for year, row in cumulative_df.iterrows()}
+
+
+def legacy_stacked_traces(data):
+    """Ancienne version des traces de la figure 4 (sans la mise en page): une lecture .loc par cellule."""
+    df = pd.DataFrame(data).T.fillna(0)
+    df.index = df.index.astype(str)
+    df_percentage = df.div(df.sum(axis=1), axis=0) * 100
+    color_dict = generate_color_dict(identifiers=df_percentage.columns, colorscale_name='Oranges')
+    fig = go.Figure()
+    for col in df_percentage.columns:
+        fig.add_trace(go.Scatter(x=df_percentage.index, y=df_percentage[col], mode='lines', stackgroup='one',
+                                 name=col, line=dict(width=0), fillcolor=color_dict[col], hoverinfo='skip'))
+    hover_texts = []
+    for year in df_percentage.index:
+        text = f"Année : {year}<br>"
+        for col in df_percentage.columns:
+            text += f"{col} : {df_percentage.loc[year, col]:.1f}% ({int(df.loc[year, col])})<br>"
+        hover_texts.append(text)
+    fig.add_trace(go.Scatter(x=df_percentage.index, y=[50] * len(df_percentage), mode='markers',
+                             marker=dict(opacity=0), hoverinfo='text', hovertext=hover_texts, showlegend=False))
+    return fig
+
+
+def scaled_data(data, scale):
+    """Réplique les données scale fois en décalant les années de chaque copie."""
+    span = int(data['Year_Ceremony'].max() - data['Year_Ceremony'].min()) + 1
+    copies = []
+    for i in range(scale):
+        copy = data[['Year_Ceremony', COLUMN]].copy()
+        copy['Year_Ceremony'] = copy['Year_Ceremony'].astype('int64') + i * span
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def best_ms(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help='Facteurs de réplication')
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures (on garde la meilleure)')
+    args = parser.parse_args()
+
+    dataloader = DataLoader()
+    dataloader.load_data(DATA_PATH)
+    dataloader.preprocess_data()
+    selected = ['White', 'Black', 'Hispanic', 'Asian', 'Other']
+    chart = StackedAreaChart()
+
+    print(f"{'échelle':<8} {'lignes':>9} {'années':>7} {'cumul avant':>12} {'cumul après':>12} {'fig4 avant':>11} {'fig4 après':>11}  (ms)")
+    for scale in args.scales:
+        data = scaled_data(dataloader.data, scale)
+        n_years = data['Year_Ceremony'].nunique()
+
+        old = legacy_cumulative(dataloader, data, list(selected))
+        new = dataloader.get_cumulative_yearly_distribution(data, selected)
+        assert all(old[year][key] == new[year][key] for year in new for key in new[year])
+
+        cumulative_before = best_ms(lambda: legacy_cumulative(dataloader, data, list(selected)), args.repeat)
+        cumulative_after = best_ms(lambda: dataloader.get_cumulative_yearly_distribution(data, selected), args.repeat)
+
+        yearly = dataloader.get_yearly_distribution(data, selected, time_granularity=5)
+        figure_before = best_ms(lambda: legacy_stacked_traces(yearly), args.repeat)
+        figure_after = best_ms(lambda: chart.plot_stacked_area_chart(yearly), args.repeat)
+
+        print(f"{scale:<8} {len(data):>9,} {n_years:>7} {cumulative_before:>12.1f} {cumulative_after:>12.1f} {figure_before:>11.1f} {figure_after:>11.1f}")
+    print("fig4 avant: traces et infobulles seulement; fig4 après: figure complète, mise en page comprise")
+
+
+if __name__ == '__main__':
+    main()
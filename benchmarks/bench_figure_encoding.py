@@ -0,0 +1,81 @@
+"""
+Temps d'encodage JSON des figures des quatre callbacks, par type de figure.
+
+Pour chaque onglet et chaque filtre gagnants (intervalle complet, sélection par défaut), la
+figure est construite une fois, puis encodée:
+  - par le chemin de Dash sans cache pré-sérialisé (to_json de Plotly sur la réponse complète);
+  - par serialization.encode_figure (orjson direct si disponible), utilisé avant la mise en cache;
+  - par la réponse de Dash pour une figure déjà en cache (insertion du RawJSON).
+
+Usage:
+    python benchmarks/bench_figure_encoding.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app as dash_app
+import dash._callback
+from helper import DEMOGRAPHIC_COLUMNS
+from serialization import encode_figure
+
+FULL_RANGE = [1928, 2025]
+
+
+def collect_figures():
+    """(type de figure, go.Figure) pour chaque état par défaut, capturés avant leur encodage."""
+    figures = []
+    encode = dash_app.figure_encoder.encode
+    dash_app.figure_encoder.encode = lambda name, fig: figures.append((name, fig)) or encode(name, fig)
+    try:
+        for column in DEMOGRAPHIC_COLUMNS:
+            for winner_filter in ('winners', 'all'):
+                dash_app.update_waffle_chart(FULL_RANGE, column, None, winner_filter)
+                dash_app.update_line_chart(FULL_RANGE, column, None, winner_filter, 'linear')
+                dash_app.update_stacked_area_chart(FULL_RANGE, column, None, winner_filter, 5)
+            dash_app.update_sankey_chart(column, FULL_RANGE, None)
+    finally:
+        dash_app.figure_encoder.encode = encode
+    return figures
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures par figure (on garde la meilleure)')
+    args = parser.parse_args()
+
+    dash_app.figure_cache.clear()
+    timings = defaultdict(lambda: defaultdict(list))
+    for name, fig in collect_figures():
+        raw = dash_app.figure_encoder.encode(name, fig)
+        timings[name]['plotly'].append(best_ms(lambda: to_json_plotly({'response': {'graph': {'figure': fig}}}), args.repeat))
+        timings[name]['encode_figure'].append(best_ms(lambda: encode_figure(fig), args.repeat))
+        timings[name]['hit'].append(best_ms(lambda: dash._callback.to_json({'response': {'graph': {'figure': raw}}}), args.repeat))
+        timings[name]['bytes'].append(len(raw))
+
+    print(f"{'figure':<14} {'n':>3} {'Plotly (ms)':>12} {'encode (ms)':>12} {'succès (ms)':>12} {'JSON moyen':>11}")
+    for name, values in timings.items():
+        print(f"{name:<14} {len(values['bytes']):>3} {np.mean(values['plotly']):>12.2f} {np.mean(values['encode_figure']):>12.2f} "
+              f"{np.mean(values['hit']):>12.2f} {np.mean(values['bytes']) / 1024:>8.1f} Ko")
+
+
+if __name__ == '__main__':
+    main()
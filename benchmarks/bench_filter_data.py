@@ -0,0 +1,58 @@
+"""
+Compare le filtrage par masques booléens (ancienne version de DataLoader.filter_data)
+avec le filtrage par tranche contiguë sur l'index trié par année.
+
+Usage:
+    python benchmarks/bench_filter_data.py [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import DataLoader
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+
+YEAR_RANGES = [(1928, 2025), (1928, 1960), (1960, 2000), (2000, 2025), (2015, 2015)]
+
+
+def filter_data_mask(data, start_year, end_year, is_winner=None):
+    """Ancienne implémentation: deux masques sur toute la table, puis un troisième pour is_winner."""
+    filtered_df = data[(data['Year_Ceremony'] >= start_year) &
+                       (data['Year_Ceremony'] <= end_year)]
+    if is_winner is not None:
+        filtered_df = filtered_df[filtered_df['Win_Oscar?'] == is_winner]
+    return filtered_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help="Nombre d'appels par mesure")
+    args = parser.parse_args()
+
+    dataloader = DataLoader()
+    dataloader.load_data(DATA_PATH)
+    dataloader.preprocess_data()
+    data = dataloader.data
+
+    print(f"{'intervalle':<12} {'is_winner':<10} {'masques (µs)':>14} {'tranche (µs)':>14} {'gain':>8}")
+    for start_year, end_year in YEAR_RANGES:
+        for is_winner in (None, True):
+            # Les deux chemins doivent retourner les mêmes lignes
+            expected = filter_data_mask(data, start_year, end_year, is_winner)
+            result = dataloader.filter_data(start_year, end_year, is_winner)
+            assert expected.reset_index(drop=True).equals(result.reset_index(drop=True))
+
+            mask_time = timeit.timeit(lambda: filter_data_mask(data, start_year, end_year, is_winner), number=args.repeat)
+            slice_time = timeit.timeit(lambda: dataloader.filter_data(start_year, end_year, is_winner), number=args.repeat)
+            mask_us = mask_time / args.repeat * 1e6
+            slice_us = slice_time / args.repeat * 1e6
+            print(f"{start_year}-{end_year:<7} {str(is_winner):<10} {mask_us:>14.1f} {slice_us:>14.1f} {mask_us / slice_us:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
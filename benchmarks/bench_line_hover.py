@@ -0,0 +1,86 @@
+"""
+Micro-benchmark des textes d'infobulle de la figure 3 (LineChart), ancienne version
+(filtrage par catégorie et par année, x_years.index(), head(3).iterrows()) contre la
+version en une passe groupée, sur l'intervalle complet 1928-2025 avec tous les nominés.
+
+Pour chaque onglet, toutes les valeurs de la colonne sont sélectionnées (pire cas).
+
+Usage:
+    python benchmarks/bench_line_hover.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import DEMOGRAPHIC_COLUMNS, DataLoader
+from figures.figure_3 import LineChart
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+
+
+def legacy_hover_texts(distribution_dict, category, selected_categories, df, cumulative=True):
+    """Ancienne version: un filtrage du DataFrame par (catégorie, année) et iterrows() sur les exemples."""
+    hover_texts = {}
+    for category_name in selected_categories:
+        x_years = sorted(distribution_dict.keys())
+        filtered_df = df[df[category] == category_name]
+        texts = []
+        for year in x_years:
+            year_count = distribution_dict[year].get(category_name, 0)
+            annual_count = year_count
+            if cumulative and year > min(x_years):
+                previous_year = x_years[x_years.index(year) - 1]
+                annual_count = year_count - distribution_dict[previous_year].get(category_name, 0)
+            year_data = filtered_df[filtered_df['Year_Ceremony'] == year]
+            text = f"<b>{category_name}</b><br>"
+            text += f"Année: {year}<br>"
+            if cumulative:
+                text += f"Total cumulé: {year_count}<br>"
+                text += f"Nouveaux cette année: {annual_count}<br>"
+            else:
+                text += f"Nombre cette année: {annual_count}<br>"
+            if not year_data.empty and annual_count > 0:
+                text += "<br>Exemples:<br>"
+                for _, entry in year_data.head(3).iterrows():
+                    text += f"• {entry['Name']} ({entry['Film']})<br>"
+                if len(year_data) > 3:
+                    text += f"...et {len(year_data) - 3} autres"
+            texts.append(text)
+        hover_texts[category_name] = texts
+    return hover_texts
+
+
+def best_ms(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures (on garde la meilleure)')
+    args = parser.parse_args()
+
+    dataloader = DataLoader()
+    dataloader.load_preprocessed(DATA_PATH)
+    df = dataloader.filter_data(1928, 2025)
+
+    print(f"{'onglet':<20} {'courbes':>8} {'points':>7} {'avant':>10} {'après':>10}  (ms)")
+    for column in DEMOGRAPHIC_COLUMNS:
+        selected = dataloader.get_vocabulary(column)
+        distribution_dict = dataloader.get_range_cumulative_yearly_distribution(1928, 2025, column, selected_categories=selected)
+
+        old = legacy_hover_texts(distribution_dict, column, selected, df)
+        new = LineChart._get_hover_texts(distribution_dict, column, selected, df)
+        assert old == new, f'Textes différents pour {column}'
+
+        before = best_ms(lambda: legacy_hover_texts(distribution_dict, column, selected, df), args.repeat)
+        after = best_ms(lambda: LineChart._get_hover_texts(distribution_dict, column, selected, df), args.repeat)
+        n_points = len(selected) * len(distribution_dict)
+        print(f'{column:<20} {len(selected):>8} {n_points:>7} {before:>10.1f} {after:>10.1f}  ({before / after:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare l'empreinte mémoire des données prétraitées, ramenée à 1M de lignes:
+  - avant: colonnes textuelles en chaînes Python (dtype object), Year_Ceremony en int64;
+  - après: colonnes encodées en dictionnaire (codes int8/int16 + vocabulaire partagé).
+
+Le jeu de données est répliqué jusqu'à atteindre au moins --rows lignes.
+
+Usage:
+    python benchmarks/bench_memory.py [--rows 1000000]
+"""
+import argparse
+import math
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import DataLoader
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+
+
+def as_object_frame(data):
+    """Représentation d'origine: chaque valeur textuelle est une chaîne Python distincte."""
+    frame = data.copy()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(object)
+    frame['Year_Ceremony'] = frame['Year_Ceremony'].astype('int64')
+    return frame
+
+
+def per_million(frame):
+    """Mémoire par colonne (Mo) ramenée à 1M de lignes."""
+    usage = frame.memory_usage(deep=True, index=False)
+    return usage / len(frame) * 1e6 / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Nombre minimal de lignes après réplication')
+    args = parser.parse_args()
+
+    dataloader = DataLoader()
+    dataloader.load_data(DATA_PATH)
+    encoded = dataloader.preprocess_data()
+
+    copies = math.ceil(args.rows / len(encoded))
+    encoded = pd.concat([encoded] * copies, ignore_index=True)
+    before = per_million(as_object_frame(encoded))
+    after = per_million(encoded)
+
+    print(f'{len(encoded):,} lignes, mémoire en Mo par 1M de lignes')
+    print(f"{'colonne':<20} {'avant':>10} {'après':>10}")
+    for col in encoded.columns:
+        print(f'{col:<20} {before[col]:>10.1f} {after[col]:>10.1f}')
+    print(f"{'total':<20} {before.sum():>10.1f} {after.sum():>10.1f}  ({before.sum() / after.sum():.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
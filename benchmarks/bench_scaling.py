@@ -0,0 +1,133 @@
+"""
+Courbes de passage à l'échelle de chaque étape du pipeline sur des données synthétiques
+(voir generate_synthetic_data.py): lecture du CSV, prétraitement, cache binaire, filtres,
+agrégations et construction + sérialisation JSON de chacune des quatre figures.
+
+Toutes les requêtes portent sur l'intervalle complet avec tous les nominés, la sélection
+par défaut de chaque figure et la colonne --column. Les figures sont construites comme
+dans app.py (rendu WebGL du graphique en gaufre au-delà du seuil, survol différé).
+
+Usage:
+    python benchmarks/bench_scaling.py [--rows 10000 100000 1000000] [--column 'Race or Ethnicity']
+        [--cardinality 'Religion=200'] [--repeat 3] [--output scaling.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_synthetic_data import generate_csv, parse_cardinality
+from helper import DataLoader, QueryContext
+from figures.figure_1 import WaffleChart
+from figures.figure_2 import SankeyDemographicChart
+from figures.figure_3 import LineChart
+from figures.figure_4 import StackedAreaChart
+
+# Mêmes réglages que app.py
+WAFFLE_WEBGL_THRESHOLD = 3000
+HEIGHT = 700
+
+
+def best_ms(func, repeat):
+    """Meilleur temps (ms) sur repeat appels."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def stages(dataloader, csv_path, cache_dir, column):
+    """Étapes mesurées: nom -> fonction sans argument."""
+    first, last = int(dataloader.years[0]), int(dataloader.years[-1])
+    context = QueryContext(dataloader, (first, last), column, 'all')
+    selection = context.sort_like_options(context.get_default_selection(include_other=True))
+    waffle = {key: context.distribution[key] for key in context.get_default_selection()}
+    render_mode = 'webgl' if sum(waffle.values()) > WAFFLE_WEBGL_THRESHOLD else 'svg'
+
+    def load_csv():
+        DataLoader().load_data(csv_path)
+
+    def preprocess():
+        loader = DataLoader()
+        loader.load_data(csv_path)
+        loader.preprocess_data()
+
+    def read_cache():
+        DataLoader().load_preprocessed(csv_path, cache_dir=cache_dir)
+
+    def figure_1():
+        WaffleChart().plot_scatter_waffle_chart(waffle, context.df, column, height=HEIGHT, is_winner=None,
+                                                render_mode=render_mode, lazy_hover=True).to_json()
+
+    def figure_2():
+        labels, counts = dataloader.get_range_win_counts(first, last, column, selected_categories=selection)
+        SankeyDemographicChart().plot_sankey_chart(labels, counts, height=HEIGHT).to_json()
+
+    def figure_3():
+        distribution = dataloader.get_range_cumulative_yearly_distribution(first, last, column, selected_categories=selection)
+        LineChart().plot_line_chart(distribution, column, selection, context.df, height=HEIGHT, lazy_hover=True).to_json()
+
+    def figure_4():
+        distribution = dataloader.get_range_yearly_distribution(first, last, column, selected_categories=selection, time_granularity=5)
+        StackedAreaChart().plot_stacked_area_chart(distribution, height=HEIGHT).to_json()
+
+    return {
+        'lecture CSV': load_csv,
+        'CSV + prétraitement': preprocess,
+        'lecture du cache': read_cache,
+        'filter_data': lambda: dataloader.filter_data(first, last),
+        'distribution': lambda: dataloader.get_range_distribution(first, last),
+        'distribution par période': lambda: dataloader.get_range_yearly_distribution(first, last, column, selected_categories=selection, time_granularity=5),
+        'figure 1': figure_1,
+        'figure 2': figure_2,
+        'figure 3': figure_3,
+        'figure 4': figure_4,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='Tailles des jeux de données')
+    parser.add_argument('--column', default='Race or Ethnicity', help='Colonne démographique étudiée')
+    parser.add_argument('--cardinality', action='append', metavar='COLONNE=N', help='Cardinalité d\'une colonne (répétable)')
+    parser.add_argument('--winner-ratio', type=float, default=0.2, help='Proportion de gagnants')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de mesures par étape (on garde la meilleure)')
+    parser.add_argument('--output', help='Fichier JSON des courbes (optionnel)')
+    args = parser.parse_args()
+    cardinality = parse_cardinality(args.cardinality)
+
+    curves = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, f'synthetic_{rows}.csv')
+            generate_csv(csv_path, rows, cardinality, args.winner_ratio)
+            dataloader = DataLoader()
+            dataloader.load_preprocessed(csv_path, cache_dir=tmp)
+            for name, func in stages(dataloader, csv_path, tmp, args.column).items():
+                repeat = 1 if name in ('lecture CSV', 'CSV + prétraitement') and rows >= 1_000_000 else args.repeat
+                curves.setdefault(name, {})[rows] = best_ms(func, repeat)
+
+    print(f"{'étape':<26}" + ''.join(f'{rows:>12,}' for rows in args.rows) + '   (ms)   pente')
+    for name, timings in curves.items():
+        values = [timings[rows] for rows in args.rows]
+        # Exposant de croissance: pente en log-log entre la plus petite et la plus grande taille
+        slope = np.log(values[-1] / values[0]) / np.log(args.rows[-1] / args.rows[0]) if len(values) > 1 else float('nan')
+        print(f'{name:<26}' + ''.join(f'{value:>12.1f}' for value in values) + f'   {slope:>10.2f}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'column': args.column, 'curves_ms': curves}, f, indent=1)
+        print(f'\nCourbes écrites dans {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Latence de la recherche par nom ou film (DataLoader.search) sur des données synthétiques
+(voir generate_synthetic_data.py), et temps de construction de l'index.
+
+Les requêtes sont tirées des noms et films du jeu de données: nom complet, préfixes de
+plusieurs longueurs (ex. 'person 12', très peu sélectif sur les noms synthétiques), films,
+et une requête sans résultat. Le budget visé est de 5 ms par recherche à 1M de lignes.
+
+Usage:
+    python benchmarks/bench_search.py [--rows 10000 100000 1000000] [--queries 200] [--budget 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_synthetic_data import generate_csv
+from helper import DataLoader
+
+
+def build_queries(dataloader, n_queries, seed=0):
+    """Requêtes nommées: type -> liste de textes."""
+    rng = random.Random(seed)
+    names = dataloader.get_vocabulary('Name')
+    films = dataloader.get_vocabulary('Film')
+    picks = [rng.choice(names) for _ in range(n_queries)]
+    return {
+        'nom complet': picks,
+        'nom, dernier mot tronqué': [name[:max(2, len(name) - 2)] for name in picks],
+        'préfixe court (2-3 car.)': [name.split()[-1][:rng.randint(2, 3)] for name in picks],
+        'film': [rng.choice(films) for _ in range(n_queries)],
+        'sans résultat': ['zzqx'] * n_queries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='Tailles des jeux de données')
+    parser.add_argument('--queries', type=int, default=200, help='Nombre de requêtes par type')
+    parser.add_argument('--budget', type=float, default=5.0, help='Latence maximale visée (ms, p95)')
+    args = parser.parse_args()
+
+    over_budget = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, f'synthetic_{rows}.csv')
+            generate_csv(csv_path, rows)
+            dataloader = DataLoader()
+            dataloader.load_preprocessed(csv_path, cache_dir=tmp)
+            start = time.perf_counter()
+            dataloader.build_search_index()
+            build_ms = (time.perf_counter() - start) * 1000
+            print(f'\n{rows:,} lignes: index construit en {build_ms:.0f} ms ({len(dataloader.search_index.tokens):,} termes)')
+            print(f"{'requête':<28} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'résultats':>10}")
+
+            for name, queries in build_queries(dataloader, args.queries).items():
+                timings, results = [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    rows_found = dataloader.search(query)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    results.append(len(rows_found))
+                p95 = float(np.percentile(timings, 95))
+                over_budget += p95 > args.budget
+                print(f'{name:<28} {np.percentile(timings, 50):>9.3f} {p95:>9.3f} {max(timings):>9.3f} {np.median(results):>10.0f}'
+                      + ('  <-- au-delà du budget' if p95 > args.budget else ''))
+
+    if over_budget:
+        print(f'\n{over_budget} type(s) de requête au-delà de {args.budget} ms')
+        sys.exit(1)
+    print(f'\nOK: p95 sous {args.budget} ms pour tous les types de requête')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Mesure le temps de démarrage avec et sans le cache binaire des données prétraitées.
+
+Deux mesures sont faites:
+  - le chargement seul (DataLoader), répété dans le même processus;
+  - l'import complet de app.py dans un nouveau processus, comme un worker au démarrage.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 20]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helper import CACHE_DIR, DataLoader
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+
+
+def time_loader(repeat, cache_dir):
+    """Temps médian (ms) de chargement + prétraitement, avec cache_dir (None: sans cache)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        DataLoader().load_preprocessed(DATA_PATH, cache_dir=cache_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def time_app_import(repeat, clear_cache):
+    """Temps médian (ms) d'un `import app` dans un processus neuf."""
+    timings = []
+    for _ in range(repeat):
+        if clear_cache:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='Nombre de mesures par configuration')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        no_cache = time_loader(args.repeat, cache_dir=None)
+        DataLoader().load_preprocessed(DATA_PATH, cache_dir=cache_dir)
+        warm_cache = time_loader(args.repeat, cache_dir=cache_dir)
+    print('Chargement des données (médiane)')
+    print(f'  CSV + prétraitement : {no_cache:8.1f} ms')
+    print(f'  cache binaire       : {warm_cache:8.1f} ms  ({no_cache / warm_cache:.1f}x)')
+
+    repeat = max(1, args.repeat // 4)
+    cold = time_app_import(repeat, clear_cache=True)
+    warm = time_app_import(repeat, clear_cache=False)
+    print('Import de app.py dans un nouveau processus (médiane)')
+    print(f'  sans cache          : {cold:8.1f} ms')
+    print(f'  avec cache          : {warm:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Vérifie que les callbacks JavaScript du mode d'agrégation côté client (assets/aggregation.js)
+produisent les mêmes options, sélections et traces que les callbacks serveur des figures 2 à 4.
+
+Les réponses du serveur sont obtenues par la vraie route de dispatch des callbacks Dash;
+les fonctions JavaScript sont exécutées avec node sur le même cube de comptages.
+Mesure aussi la taille du dcc.Store envoyé au navigateur.
+
+Usage:
+    python benchmarks/check_clientside_aggregation.py
+"""
+import gzip
+import itertools
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+
+import plotly.utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app as dash_app
+from count_callback_calls import dispatch, find_callback
+from helper import DEMOGRAPHIC_COLUMNS
+
+YEAR_RANGES = [[1928, 2025], [1960, 2000], [2015, 2015]]
+WINNER_FILTERS = ['winners', 'all']
+# Sans filtre croisé, puis avec un cube filtré renvoyé par le serveur: femmes non blanches
+# (index bitmap) et seconds rôles (comptages précalculés par catégorie de prix)
+CROSS_FILTERS = [None,
+                 [{'column': 'Gender', 'values': ['Female'], 'exclude': False},
+                  {'column': 'Race or Ethnicity', 'values': ['White'], 'exclude': True}],
+                 [{'column': 'Category', 'values': ['ACTOR IN A SUPPORTING ROLE', 'ACTRESS IN A SUPPORTING ROLE'],
+                   'exclude': False}]]
+
+# Fonction JavaScript et ordre des entrées de chaque figure
+JS_FUNCTIONS = {2: 'updateSankeyChart', 3: 'updateLineChart', 4: 'updateStackedAreaChart'}
+EXTRA_INPUTS = {3: ('scale-selector_fig_3', ['linear', 'log']), 4: ('granularity-selector_fig_4', [1, 5, 10])}
+
+NODE_DRIVER = """
+const fs = require('fs');
+global.window = {dash_clientside: {no_update: {no_update: true}}};
+const aggregation = require(process.argv[process.argv.length - 1]);
+const {stores, cases} = JSON.parse(fs.readFileSync(0, 'utf8'));
+const results = cases.map(c => {
+    window.dash_clientside.callback_context = {triggered: [{prop_id: c.triggered + '.value'}]};
+    return aggregation[c.function](...c.args, stores[c.store]);
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def build_cases():
+    """Grille d'interactions: (figure_id, valeurs des entrées, composant déclencheur)."""
+    cases = []
+    for figure_id in JS_FUNCTIONS:
+        output, inputs = find_callback(figure_id)
+        ids = [i['id'] for i in inputs]
+        extra_id, extra_values = EXTRA_INPUTS.get(figure_id, (None, [None]))
+        filters = WINNER_FILTERS if f'winner-filter_fig_{figure_id}' in ids else [None]
+        grid = itertools.product(range(len(CROSS_FILTERS)), DEMOGRAPHIC_COLUMNS, YEAR_RANGES, filters, extra_values)
+        for store, column, year_range, winner_filter, extra in grid:
+            values = {f'tabs_fig_{figure_id}': column, f'year-slider_fig_{figure_id}': year_range,
+                      f'category-checklist_fig_{figure_id}': [], f'winner-filter_fig_{figure_id}': winner_filter, extra_id: extra,
+                      'cross-filter-store': CROSS_FILTERS[store]}
+            values = {key: value for key, value in values.items() if key in ids}
+            cases.append((figure_id, output, inputs, values, f'tabs_fig_{figure_id}', store))
+            # Sélection réduite par la checklist: deux premières valeurs et 'Other'
+            checked = dict(values)
+            checked[f'category-checklist_fig_{figure_id}'] = None
+            cases.append((figure_id, output, inputs, checked, f'category-checklist_fig_{figure_id}', store))
+    return cases
+
+
+def server_response(client, output, inputs, values, triggered):
+    response = dispatch(client, output, inputs, values, [triggered])
+    return json.loads(response.data)['response']
+
+
+def same(a, b):
+    """Égalité récursive avec tolérance sur les flottants (NaN == NaN)."""
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is None and b is None or (isinstance(a, float) and math.isnan(a)) or (isinstance(b, float) and math.isnan(b))
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def is_no_update(value):
+    return isinstance(value, dict) and value.get('no_update', False)
+
+
+def comparable_traces(traces):
+    """Attributs comparés des traces."""
+    keys = ['type', 'x', 'y', 'name', 'mode', 'stackgroup', 'fillcolor', 'line', 'marker', 'hovertext', 'hoverinfo',
+            'node', 'link', 'customdata']
+    return [{k: trace.get(k) for k in keys if k in trace} for trace in traces]
+
+
+def main():
+    if shutil.which('node') is None:
+        print('node est introuvable: vérification ignorée')
+        return
+
+    if not dash_app.survol_differe:
+        print("survol différé désactivé: l'agrégation côté client n'est pas disponible, vérification ignorée")
+        return
+
+    client = dash_app.app.server.test_client()
+    stores = [json.loads(json.dumps(dash_app.build_clientside_store(filters), cls=plotly.utils.PlotlyJSONEncoder))
+              for filters in CROSS_FILTERS]
+    store = stores[0]
+    payload = json.dumps(store).encode()
+    print(f'dcc.Store: {len(payload) / 1024:.1f} Ko ({len(gzip.compress(payload)) / 1024:.1f} Ko compressé)')
+
+    cases, js_cases = [], []
+    for figure_id, output, inputs, values, triggered, store_index in build_cases():
+        values = dict(values)
+        checklist = f'category-checklist_fig_{figure_id}'
+        if values[checklist] is None:
+            # Sélection partielle construite à partir des options par défaut du serveur
+            default = server_response(client, output, inputs, dict(values, **{checklist: []}), f'tabs_fig_{figure_id}')
+            options = [o['value'] for o in default[checklist]['options']]
+            values[checklist] = list(dict.fromkeys(options[:2] + ['Other']))
+        dash_app.figure_cache.clear()
+        cases.append((figure_id, server_response(client, output, inputs, values, triggered)))
+        # Le Store des filtres croisés est remplacé côté client par le cube filtré
+        js_cases.append({'function': JS_FUNCTIONS[figure_id], 'triggered': triggered, 'store': store_index,
+                         'args': [values[i['id']] for i in inputs if i['id'] != 'cross-filter-store']})
+
+    driver = subprocess.run(['node', '-e', NODE_DRIVER, '--', os.path.join(ROOT, 'assets', 'aggregation.js')],
+                            input=json.dumps({'stores': stores, 'cases': js_cases}), capture_output=True, text=True)
+    if driver.returncode:
+        sys.exit(driver.stderr)
+    results = json.loads(driver.stdout)
+
+    failures = 0
+    for (figure_id, expected), (options, value, figure) in zip(cases, results):
+        checklist = f'category-checklist_fig_{figure_id}'
+        ok = same(expected.get(checklist, {}).get('options'), None if is_no_update(options) else options)
+        ok &= same(expected.get(checklist, {}).get('value'), None if is_no_update(value) else value)
+        expected_figure = next(v['figure'] for k, v in expected.items() if k != checklist)
+        ok &= same(comparable_traces(expected_figure['data']), comparable_traces(figure['data']))
+        if figure_id == 3:
+            ok &= same(expected_figure['layout'].get('shapes', []), figure['layout']['shapes'])
+            ok &= expected_figure['layout']['yaxis']['type'] == figure['layout']['yaxis']['type']
+        failures += not ok
+
+    print(f'{len(cases) - failures}/{len(cases)} interactions identiques')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
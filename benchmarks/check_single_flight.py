@@ -0,0 +1,78 @@
+"""
+Vérifie le dédoublonnage des calculs identiques simultanés (single-flight du cache de figures).
+
+Pour chaque figure, --clients requêtes identiques (même onglet, intervalle et filtre) sont
+envoyées en même temps, cache vidé, par la vraie route de dispatch de Dash: la figure ne doit
+être construite qu'une fois, les autres requêtes attendant ce calcul (compteur coalesced).
+
+Usage:
+    python benchmarks/check_single_flight.py [--clients 20]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app as dash_app
+from count_callback_calls import INITIAL_VALUES, CallCounter, dispatch, find_callback
+from figures.figure_1 import WaffleChart
+from figures.figure_2 import SankeyDemographicChart
+from figures.figure_3 import LineChart
+from figures.figure_4 import StackedAreaChart
+
+PLOT_METHODS = {
+    1: (WaffleChart, 'plot_scatter_waffle_chart'),
+    2: (SankeyDemographicChart, 'plot_sankey_chart'),
+    3: (LineChart, 'plot_line_chart'),
+    4: (StackedAreaChart, 'plot_stacked_area_chart'),
+}
+
+
+def burst(figure_id, clients):
+    """Envoie clients requêtes identiques simultanées; retourne (réponses distinctes, durée en ms)."""
+    output, inputs = find_callback(figure_id)
+    values = dict(INITIAL_VALUES[figure_id], **{f'winner-filter_fig_{figure_id}': 'all'})
+    barrier = threading.Barrier(clients)
+    responses = [None] * clients
+
+    def client(i):
+        test_client = dash_app.app.server.test_client()
+        barrier.wait()
+        responses[i] = dispatch(test_client, output, inputs, values, [f'tabs_fig_{figure_id}']).data
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(set(responses)), (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=20, help='Nombre de requêtes identiques simultanées')
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'figure':<8} {'constructions':>13} {'regroupées':>11} {'réponses distinctes':>20} {'durée (ms)':>11}")
+    for figure_id, (cls, method) in PLOT_METHODS.items():
+        original = getattr(cls, method)
+        counter = CallCounter(cls, [method])
+        dash_app.figure_cache.clear()
+        distinct, elapsed = burst(figure_id, args.clients)
+        setattr(cls, method, original)
+        builds, coalesced = counter.counts[method], dash_app.figure_cache.stats()['coalesced']
+        print(f'{figure_id:<8} {builds:>13} {coalesced:>11} {distinct:>20} {elapsed:>11.1f}')
+        failures += builds != 1 or distinct != 1
+    print('\nOK: une seule construction par figure' if not failures else f'\nÉCHEC: {failures} figure(s) construites plusieurs fois')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Compte les appels à filter_data et aux méthodes d'agrégation de DataLoader pour chaque
+interaction utilisateur, en passant par la vraie route de dispatch des callbacks Dash.
+
+Chaque interaction (chargement, slider, onglet, filtre gagnants, checklist, ...) correspond
+à une seule requête de callback et doit faire au plus un filter_data et au plus deux
+agrégations (la distribution des options, puis celle de la figure). Le cache de figures
+est vidé avant chaque interaction afin de mesurer un rendu à froid.
+
+Usage:
+    python benchmarks/count_callback_calls.py
+"""
+import os
+import sys
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app as dash_app
+
+AGGREGATION_METHODS = [
+    'get_unique_distribution',
+    'get_yearly_distribution',
+    'get_cumulative_yearly_distribution',
+    'get_range_distribution',
+    'get_range_win_counts',
+    'get_range_yearly_distribution',
+    'get_range_cumulative_yearly_distribution',
+]
+
+MAX_FILTER_CALLS = 1
+MAX_AGGREGATION_CALLS = 2
+
+# Valeurs initiales des entrées de chaque section (figure_id -> {composant: valeur})
+INITIAL_VALUES = {
+    1: {'year-slider_fig_1': [1928, 2025], 'tabs_fig_1': 'Race or Ethnicity',
+        'category-checklist_fig_1': ['White', 'Black'], 'winner-filter_fig_1': 'winners', 'cross-filter-store': None},
+    2: {'tabs_fig_2': 'Race or Ethnicity', 'year-slider_fig_2': [1928, 2025],
+        'category-checklist_fig_2': [], 'cross-filter-store': None},
+    3: {'year-slider_fig_3': [1928, 2025], 'tabs_fig_3': 'Race or Ethnicity',
+        'category-checklist_fig_3': ['White', 'Black', 'Other'], 'winner-filter_fig_3': 'winners',
+        'scale-selector_fig_3': 'linear', 'cross-filter-store': None},
+    4: {'year-slider_fig_4': [1928, 2025], 'tabs_fig_4': 'Race or Ethnicity',
+        'category-checklist_fig_4': ['White', 'Black', 'Other'], 'winner-filter_fig_4': 'winners',
+        'granularity-selector_fig_4': 5, 'cross-filter-store': None},
+}
+
+# Interactions simulées: (nom, composant modifié, nouvelle valeur)
+INTERACTIONS = [
+    ('chargement initial', None, None),
+    ('slider', 'year-slider_fig_{}', [1960, 2000]),
+    ('onglet', 'tabs_fig_{}', 'Gender'),
+    ('filtre gagnants', 'winner-filter_fig_{}', 'all'),
+    ('checklist', 'category-checklist_fig_{}', ['White']),
+    ('échelle', 'scale-selector_fig_{}', 'log'),
+    ('granularité', 'granularity-selector_fig_{}', 10),
+    ('filtres croisés', 'cross-filter-store', [{'column': 'Gender', 'values': ['Female'], 'exclude': False},
+                                               {'column': 'Race or Ethnicity', 'values': ['White'], 'exclude': True}]),
+    ('catégorie de prix', 'cross-filter-store', [{'column': 'Category', 'values': ['DIRECTING'], 'exclude': True}]),
+]
+
+
+class CallCounter():
+    """Remplace des méthodes d'une instance par des versions qui comptent leurs appels."""
+
+    def __init__(self, obj, names):
+        self.counts = Counter()
+        for name in names:
+            setattr(obj, name, self._wrap(name, getattr(obj, name)))
+
+    def _wrap(self, name, method):
+        def wrapper(*args, **kwargs):
+            self.counts[name] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+
+def find_callback(figure_id):
+    """Retourne l'identifiant de sortie et la liste des entrées du callback d'une section."""
+    for output, callback in dash_app.app.callback_map.items():
+        if any(i['id'] == f'category-checklist_fig_{figure_id}' for i in callback['inputs']) and 'figure' in output:
+            return output, callback['inputs']
+    raise KeyError(f'Aucun callback pour la figure {figure_id}')
+
+
+def dispatch(client, output, inputs, values, changed):
+    """Envoie une requête de callback identique à celle du navigateur."""
+    payload = {
+        'output': output,
+        'inputs': [dict(i, value=values[i['id']]) for i in inputs],
+        'changedPropIds': [f'{component}.value' for component in changed],
+        'state': [],
+    }
+    response = client.post('/_dash-update-component', json=payload)
+    assert response.status_code in (200, 204), response.data
+    return response
+
+
+def main():
+    client = dash_app.app.server.test_client()
+    counter = CallCounter(dash_app.dataloader, ['filter_data'] + AGGREGATION_METHODS)
+    failures = 0
+
+    print(f"{'figure':<8} {'interaction':<20} {'filter_data':>12} {'agrégations':>12}")
+    for figure_id, initial in INITIAL_VALUES.items():
+        output, inputs = find_callback(figure_id)
+        for name, component, value in INTERACTIONS:
+            values = dict(initial)
+            changed = []
+            if component is not None:
+                component = component.format(figure_id)
+                if component not in values:
+                    continue
+                values[component] = value
+                changed = [component]
+
+            dash_app.figure_cache.clear()
+            counter.counts.clear()
+            dispatch(client, output, inputs, values, changed)
+
+            n_filter = counter.counts['filter_data']
+            n_aggregation = sum(counter.counts[m] for m in AGGREGATION_METHODS)
+            ok = n_filter <= MAX_FILTER_CALLS and n_aggregation <= MAX_AGGREGATION_CALLS
+            failures += not ok
+            print(f"{figure_id:<8} {name:<20} {n_filter:>12} {n_aggregation:>12} {'' if ok else '  <-- trop d appels'}")
+
+    if failures:
+        print(f'\n{failures} interaction(s) dépassent le budget d appels')
+        sys.exit(1)
+    print('\nOK: au plus un filter_data et deux agrégations par interaction')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Génère un jeu de données synthétique de même schéma que le CSV des Oscars, pour tester
+DataLoader et les figures à grande échelle (10k à 10M lignes).
+
+Les valeurs des colonnes démographiques suivent une loi de Zipf (quelques valeurs dominantes,
+une longue traîne), comme dans les données réelles. Les premières étiquettes de chaque colonne
+reprennent les valeurs réelles; au-delà, des étiquettes synthétiques sont ajoutées pour atteindre
+la cardinalité demandée. Les lignes sont triées par année de cérémonie et écrites par blocs.
+
+Usage:
+    python benchmarks/generate_synthetic_data.py --rows 1000000 --output synthetic_1M.csv
+        [--first-year 1928] [--last-year 2025] [--winner-ratio 0.2]
+        [--cardinality 'Race or Ethnicity=50' --cardinality 'Religion=200'] [--seed 0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_PATH = os.path.join(ROOT, 'assets', 'The_Oscar_Award_Demographics_1928-2025 - The_Oscar_Award_Demographics_1928-2025_v3.csv')
+
+# Colonnes du CSV d'origine, dans le même ordre
+COLUMNS = ['Name', 'Category', 'Film', 'Win_Oscar?', 'Year_Ceremony', 'Birth_Date', 'Birth_Place',
+           'Gender', 'Race or Ethnicity', 'Sexual orientation', 'Religion', 'Link']
+
+# Colonnes à valeurs tirées dans un vocabulaire, et leur cardinalité par défaut (celle des données réelles)
+VOCABULARY_COLUMNS = {'Category': 5, 'Gender': 2, 'Race or Ethnicity': 9, 'Sexual orientation': 7, 'Religion': 29}
+
+# Exposant de la loi de Zipf des fréquences des valeurs
+ZIPF_EXPONENT = 1.2
+
+CHUNK_ROWS = 500_000
+
+
+def build_vocabulary(real_values, cardinality, column):
+    """Valeurs réelles (les plus fréquentes d'abord), complétées par des étiquettes synthétiques."""
+    labels = [str(value) for value in real_values[:cardinality]]
+    labels += [f'{column} {i}' for i in range(len(labels), cardinality)]
+    return np.array(labels, dtype=object)
+
+
+def zipf_weights(n):
+    weights = 1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT
+    return weights / weights.sum()
+
+
+def generate_chunk(rng, n_rows, years, vocabularies, winner_ratio, n_people, n_films):
+    """Un bloc de n_rows lignes, pour les années données (déjà triées)."""
+    people = rng.integers(0, n_people, n_rows)
+    films = rng.integers(0, n_films, n_rows)
+
+    # Âge à la cérémonie entre 18 et 95 ans, converti en date de naissance
+    age_days = (np.clip(rng.normal(45, 13, n_rows), 18, 95) * 365.25).astype('timedelta64[D]')
+    ceremony = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]') + 59
+    birth_dates = np.datetime_as_string(ceremony - age_days, unit='D')
+
+    chunk = {
+        'Name': np.char.add('Person ', people.astype(str)),
+        'Film': np.char.add('Film ', films.astype(str)),
+        'Win_Oscar?': np.where(rng.random(n_rows) < winner_ratio, 'TRUE', 'FALSE'),
+        'Year_Ceremony': years,
+        'Birth_Date': birth_dates,
+        'Birth_Place': 'Synthetic City',
+        'Link': np.char.add('/people/', people.astype(str)),
+    }
+    for column, labels in vocabularies.items():
+        chunk[column] = labels[rng.choice(len(labels), n_rows, p=zipf_weights(len(labels)))]
+    return pd.DataFrame(chunk, columns=COLUMNS)
+
+
+def generate_csv(path, rows, cardinality=None, winner_ratio=0.2, first_year=1928, last_year=2025, seed=0):
+    """
+    Écrit un CSV synthétique de rows lignes.
+
+    Args:
+        path: Fichier de sortie
+        rows: Nombre de lignes
+        cardinality: {colonne: nombre de valeurs distinctes} pour les colonnes de VOCABULARY_COLUMNS
+        winner_ratio: Proportion de gagnants
+        first_year, last_year: Intervalle des années de cérémonie
+        seed: Graine du générateur aléatoire
+    """
+    cardinality = dict(VOCABULARY_COLUMNS, **(cardinality or {}))
+    rng = np.random.default_rng(seed)
+
+    real = pd.read_csv(DATA_PATH, usecols=list(VOCABULARY_COLUMNS))
+    vocabularies = {
+        column: build_vocabulary(real[column].value_counts().index.tolist(), cardinality[column], column)
+        for column in VOCABULARY_COLUMNS
+    }
+
+    # Années réparties uniformément puis triées, comme dans le fichier d'origine
+    years = np.sort(rng.integers(first_year, last_year + 1, rows))
+    n_people, n_films = max(1, rows // 2), max(1, rows // 2)
+
+    for start in range(0, rows, CHUNK_ROWS):
+        end = min(start + CHUNK_ROWS, rows)
+        chunk = generate_chunk(rng, end - start, years[start:end], vocabularies, winner_ratio, n_people, n_films)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def parse_cardinality(items):
+    """['Religion=200', ...] -> {'Religion': 200, ...}"""
+    cardinality = {}
+    for item in items or []:
+        column, _, value = item.rpartition('=')
+        if column not in VOCABULARY_COLUMNS:
+            raise ValueError(f'Colonne inconnue: {column} (colonnes possibles: {", ".join(VOCABULARY_COLUMNS)})')
+        cardinality[column] = int(value)
+    return cardinality
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help='Nombre de lignes')
+    parser.add_argument('--output', required=True, help='Fichier CSV de sortie')
+    parser.add_argument('--first-year', type=int, default=1928, help='Première année de cérémonie')
+    parser.add_argument('--last-year', type=int, default=2025, help='Dernière année de cérémonie')
+    parser.add_argument('--winner-ratio', type=float, default=0.2, help='Proportion de gagnants')
+    parser.add_argument('--cardinality', action='append', metavar='COLONNE=N',
+                        help='Nombre de valeurs distinctes d\'une colonne (répétable)')
+    parser.add_argument('--seed', type=int, default=0, help='Graine du générateur aléatoire')
+    args = parser.parse_args()
+
+    generate_csv(args.output, args.rows, parse_cardinality(args.cardinality), args.winner_ratio,
+                 args.first_year, args.last_year, args.seed)
+    print(f'{args.rows:,} lignes écrites dans {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Nombre de bits à 1 de chaque octet
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class BitmapIndex():
+    """
+    Index bitmap par (colonne, valeur): un bit par ligne, compacté 8 lignes par octet.
+
+    Un filtre est une liste de clauses {'column', 'values', 'exclude'}: les valeurs d'une clause
+    sont combinées par OU, les clauses par ET, et exclude inverse la clause (ex. Race ≠ White).
+    Une clause peut aussi être une disjonction de clauses de colonnes différentes (ex. Gender =
+    Female OU Race ≠ White): toute combinaison en forme normale conjonctive est exprimable.
+    Évaluer un filtre coûte quelques OU/ET/NON vectorisés sur des tableaux de n_rows / 8 octets,
+    puis un comptage de bits par table de correspondance.
+    """
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.bitmaps = {}
+        # Toutes les lignes: les bits de remplissage du dernier octet restent à 0
+        self.all_rows = np.packbits(np.ones(n_rows, dtype=bool))
+
+    def add_column(self, column, codes, n_values):
+        """Bitmaps des n_values valeurs d'une colonne à partir de ses codes (-1: valeur manquante)."""
+        bitmaps = np.zeros((n_values, len(self.all_rows)), dtype=np.uint8)
+        for value in range(n_values):
+            bitmaps[value] = np.packbits(codes == value)
+        self.bitmaps[column] = bitmaps
+
+    def values_bitmap(self, column, codes):
+        """Lignes dont la valeur de column est l'un des codes (OU des bitmaps)."""
+        codes = np.asarray(codes, dtype=np.int64)
+        codes = codes[codes >= 0]
+        if len(codes) == 0:
+            return np.zeros_like(self.all_rows)
+        return np.bitwise_or.reduce(self.bitmaps[column][codes], axis=0)
+
+    def clause_bitmap(self, column, codes, exclude):
+        """Lignes qui satisfont une clause (les bits de remplissage peuvent valoir 1 si exclude)."""
+        bitmap = self.values_bitmap(column, codes)
+        return np.invert(bitmap) if exclude else bitmap
+
+    def evaluate(self, clauses):
+        """
+        Bitmap des lignes qui satisfont toutes les clauses.
+
+        Args:
+            clauses: Itérable de (colonne, codes, exclude), ou de listes de tels triplets
+                     pour une disjonction (OU des triplets)
+
+        Returns:
+            numpy.ndarray: Bitmap compacté (uint8) de len(all_rows) octets
+        """
+        mask = self.all_rows.copy()
+        for clause in clauses:
+            if isinstance(clause, list):
+                bitmap = np.bitwise_or.reduce([self.clause_bitmap(*literal) for literal in clause], axis=0)
+            else:
+                bitmap = self.clause_bitmap(*clause)
+            np.bitwise_and(mask, bitmap, out=mask)
+        return mask
+
+    @staticmethod
+    def count(bitmap):
+        """Nombre de lignes sélectionnées (popcount)."""
+        return int(POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def to_mask(self, bitmap):
+        """Masque booléen d'une ligne par élément."""
+        return np.unpackbits(bitmap, count=self.n_rows).view(bool)
@@ -0,0 +1,128 @@
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class FigureCache():
+    """
+    Cache LRU borné des figures produites par les callbacks.
+
+    Les clés sont normalisées: les listes et ensembles (ex. selected_categories) deviennent
+    des tuples triés, de sorte que l'ordre de sélection ne crée pas d'entrées en double.
+    Les tuples, eux, sont considérés comme ordonnés (ex. year_range). Les objets qui exposent
+    une méthode cache_key (ex. QueryContext) sont remplacés par cette clé: le cache ne retient
+    pas les données qu'ils portent.
+
+    Les calculs sont dédoublonnés (single-flight): pendant qu'une entrée absente est calculée,
+    les requêtes identiques attendent ce calcul et en partagent le résultat au lieu de le refaire.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(value):
+        """Convertit une valeur d'entrée de callback en élément de clé hachable et canonique."""
+        if isinstance(value, (list, set, frozenset)):
+            # Les étiquettes peuvent mélanger entiers (Age) et chaînes ('Other')
+            return tuple(sorted((FigureCache.normalize(v) for v in value), key=repr))
+        if isinstance(value, tuple):
+            return tuple(FigureCache.normalize(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, FigureCache.normalize(v)) for k, v in value.items()))
+        cache_key = getattr(value, 'cache_key', None)
+        if callable(cache_key):
+            return (type(value).__name__, FigureCache.normalize(cache_key()))
+        return value
+
+    def make_key(self, name, args, kwargs):
+        """Construit la clé d'une entrée à partir du nom de la fonction et de ses arguments."""
+        return (name, self.normalize(tuple(args)), self.normalize(kwargs))
+
+    def get(self, key, default=None):
+        """Retourne l'entrée associée à key (et la marque comme récente), sinon default."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Ajoute une entrée et évince la moins récemment utilisée si la taille est dépassée."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Retourne l'entrée associée à key, sinon la calcule avec compute() et la met en cache.
+
+        Si le même calcul est déjà en cours dans un autre thread, attend son résultat (ou son
+        exception) au lieu de le relancer; ces requêtes sont comptées dans coalesced.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.result()
+        try:
+            result = compute()
+        except BaseException as error:
+            flight.set_exception(error)
+            raise
+        else:
+            self.set(key, result)
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro (les calculs en cours ne sont pas interrompus)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+
+    def stats(self):
+        """Retourne les compteurs du cache sous forme de dictionnaire."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced,
+                    'in_flight': len(self._in_flight), 'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def memoize(self, func):
+        """
+        Décorateur qui mémorise le résultat de func selon ses arguments normalisés.
+
+        La fonction décorée doit être pure: ses arguments ne sont pas modifiés et
+        son résultat, partagé entre les appels, ne doit pas l'être non plus.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.make_key(func.__qualname__, args, kwargs)
+            return self.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = self
+        return wrapper
@@ -1,10 +1,50 @@
 import math 
+import functools
 import numpy as np
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
 from helper import TRANSPARENT, generate_color_dict
 
+# Largeur de référence de la figure (px), utilisée pour dimensionner la grille en mode WebGL
+REFERENCE_WIDTH = 1300
+# Écart entre deux panneaux de catégories, en fraction de la largeur d'un panneau
+PANEL_GAP = 0.25
+
+# Infobulle d'un point: customdata = [Nom, Catégorie, Film, Année, Statut]
+HOVERTEMPLATE = (
+    "<b>%{customdata[0]}</b><br><br>"                    # Nom en gras
+    "<i>Catégorie:</i> %{customdata[1]}<br>"          # Catégorie
+    "<i>Film:</i> <span style='color:#1f77b4'>%{customdata[2]}</span><br>"  # Film avec couleur
+    "<i>Année:</i> %{customdata[3]}<br>"              # Année
+    "<i>Statut:</i> %{customdata[4]}<br>"            # Gagnant
+    "<extra></extra>"
+)
+
+
+@functools.lru_cache(maxsize=64)
+def get_grid_coordinates(x_size, y_size):
+    """
+    Coordonnées (x, y) des cellules d'une grille x_size × y_size normalisée dans [0, 1],
+    remplie ligne par ligne depuis le bas. Le résultat est mis en cache et en lecture seule.
+    """
+    x_grid = np.tile(np.linspace(0, 1, x_size), y_size)
+    y_grid = np.repeat(np.linspace(0, 1, y_size), x_size)
+    x_grid.flags.writeable = False
+    y_grid.flags.writeable = False
+    return x_grid, y_grid
+
+
+def get_grid_size(max_len, n_panels, height, width=REFERENCE_WIDTH):
+    """
+    Dimensions de grille (x_size, y_size) déduites du plus grand groupe à afficher:
+    la grille contient au moins max_len cellules et suit les proportions d'un panneau.
+    """
+    panel_aspect = (width / max(n_panels, 1)) / height
+    x_size = max(1, math.ceil(math.sqrt(max_len * panel_aspect)))
+    y_size = max(1, math.ceil(max_len / x_size))
+    return x_size, y_size
+
 class WaffleChart():
 
     def __init__(self):
@@ -22,7 +62,92 @@ class WaffleChart():
         z = np.array(z).reshape(n_rows, n_cols)
         return z
     
-    def plot_scatter_waffle_chart(self, distribution, df, category, font_size=16, font_family='Jost', height=700, is_winner=False):
+    @staticmethod
+    def _get_hover(sub_df, lazy_hover=False):
+        """
+        Attributs d'infobulle des points d'une trace.
+
+        En mode différé (lazy_hover), chaque point ne porte que l'identifiant de sa ligne:
+        l'infobulle native est désactivée et les détails sont résolus côté serveur
+        à partir de hoverData (voir DataLoader.get_rows).
+        """
+        if lazy_hover:
+            return dict(customdata=sub_df.index.to_numpy(), hoverinfo='none')
+        return dict(customdata=WaffleChart._get_customdata(sub_df), hovertemplate=HOVERTEMPLATE)
+
+    @staticmethod
+    def _webgl_row_order(keys, df, category):
+        """Positions des lignes de df dans l'ordre des points de la trace WebGL (groupe par groupe, ordre stable)."""
+        panel_of_value = {key: i for i, key in enumerate(keys)}
+        row_panel = df[category].map(panel_of_value).to_numpy(dtype=float)
+        return np.argsort(np.where(np.isnan(row_panel), len(keys), row_panel), kind='stable')
+
+    def locate_points(self, distribution, df, category, row_ids, render_mode='svg'):
+        """
+        Points du graphique en gaufre qui représentent des lignes données, sans reconstruire la figure.
+
+        Les points sont ordonnés comme dans plot_scatter_waffle_chart: une trace par catégorie en SVG,
+        une seule trace (catégories à la suite) en WebGL.
+
+        Args:
+            distribution: Même dictionnaire que pour plot_scatter_waffle_chart
+            df: Même DataFrame que pour plot_scatter_waffle_chart
+            category: Colonne de regroupement
+            row_ids: Identifiants globaux des lignes recherchées (index de df)
+            render_mode: 'svg' ou 'webgl'
+
+        Returns:
+            list: [indice de trace, [indices des points]] pour chaque trace qui contient au moins un point
+        """
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if render_mode == 'webgl':
+            counts = sum(distribution.values())
+            index = df.index.to_numpy()[self._webgl_row_order(list(distribution), df, category)[:counts]]
+            groups = [(0, index)]
+        else:
+            groups = [(i, df.index.to_numpy()[(df[category] == key).to_numpy()][:count])
+                      for i, (key, count) in enumerate(distribution.items())]
+        located = []
+        for trace, index in groups:
+            points = np.flatnonzero(np.isin(index, row_ids))
+            if len(points):
+                located.append([trace, points.tolist()])
+        return located
+
+    @staticmethod
+    def _get_customdata(sub_df):
+        """Données d'infobulle des points: nom, catégorie, film, année et statut (WINNER/NOMINEE)."""
+        status = np.where(sub_df['Win_Oscar?'].to_numpy(dtype=bool), 'WINNER', 'NOMINEE')
+        return np.column_stack([
+            sub_df['Name'].to_numpy(dtype=object),
+            sub_df['Category'].to_numpy(dtype=object),
+            sub_df['Film'].to_numpy(dtype=object),
+            sub_df['Year_Ceremony'].to_numpy(dtype=object),
+            status.astype(object),
+        ])
+
+    @staticmethod
+    def _empty_figure(font_size=16, font_family='Jost', height=700):
+        """Figure sans point, avec la mise en page habituelle du graphique en gaufre."""
+        fig = go.Figure()
+        fig.update_xaxes(range=[-0.1, 1.1], showline=False, zeroline=False, visible=False)
+        fig.update_yaxes(range=[-0.1, 1.05], showline=False, zeroline=False, visible=False)
+        fig.update_layout(
+            height=height,
+            autosize=False,
+            plot_bgcolor=TRANSPARENT,
+            paper_bgcolor=TRANSPARENT,
+            margin=dict(l=0, r=0, t=0, b=10),
+            showlegend=False,
+            hoverlabel=dict(
+                bgcolor="white",
+                font_size=font_size,
+                font_family=font_family
+            )
+        )
+        return fig
+
+    def plot_scatter_waffle_chart(self, distribution, df, category, font_size=16, font_family='Jost', height=700, is_winner=False, render_mode='svg', lazy_hover=False):
         """
         Génère un graphique en gaufre avec des points représentant les individus.
         
@@ -33,10 +158,19 @@ class WaffleChart():
             font_size: Taille de police pour les annotations
             font_family: Police à utiliser
             height: Hauteur du graphique en pixels
+            render_mode: 'svg' (un sous-graphique par catégorie, grilles fixes si le plus grand groupe y tient) ou
+                         'webgl' (une seule trace Scattergl, grille déduite des données)
+            lazy_hover: Si True, les points ne portent que l'identifiant de leur ligne
             
         Returns:
             Figure Plotly
         """
+        # Aucune ligne (ex. filtres croisés trop restrictifs): figure vide
+        if not distribution or sum(distribution.values()) == 0:
+            return self._empty_figure(font_size, font_family, height)
+
+        if render_mode == 'webgl':
+            return self.plot_webgl_waffle_chart(distribution, df, category, font_size, font_family, height, lazy_hover)
 
         # Trouver la taille de grille maximale nécessaire
         max_len = max(distribution.values())
@@ -49,7 +183,7 @@ class WaffleChart():
 
         # print(f"is_winner: {is_winner}, category: {category}, x_size: {x_size}, y_size: {y_size}, max_len: {max_len}, cols: {cols}")
 
-        # Hard-code pour garder la même taille indépendamment des années        
+        # Hard-code pour garder la même taille indépendamment des années (données réelles)
         layout_by_winner = {
             True: {
                 'Race or Ethnicity': {'x_size': 11, 'y_size': 39, 'max_len': 425, 'cols': 5, 'size': 15},
@@ -66,12 +200,18 @@ class WaffleChart():
                 'Sexual orientation': {'x_size': 22, 'y_size': 92, 'max_len': 2017, 'cols': 5, 'size': 15}
             }
         }
-        x_size = layout_by_winner[is_winner][category]['x_size'] 
-        y_size = layout_by_winner[is_winner][category]['y_size']
+        fixed_layout = layout_by_winner.get(is_winner, {}).get(category)
+        if fixed_layout and max_len <= fixed_layout['x_size'] * fixed_layout['y_size']:
+            x_size, y_size = fixed_layout['x_size'], fixed_layout['y_size']
+            marker_size = min(fixed_layout['size'], height/(y_size + 3))
+        else:
+            # Groupe plus grand que la grille fixe (autres données) ou regroupement sans grille fixe:
+            # grille déduite des données, comme en WebGL, pour que chaque ligne ait son point
+            x_size, y_size = get_grid_size(max_len, cols, height)
+            marker_size = max(2, min(height/(y_size + 3), REFERENCE_WIDTH/cols/(x_size + 1)))
 
         # Etablir la grille 
-        x_grid = np.tile(np.linspace(0, 1, x_size), y_size)
-        y_grid = np.repeat(np.linspace(0, 1, y_size), x_size)
+        x_grid, y_grid = get_grid_coordinates(x_size, y_size)
 
         # max_len = layout_by_winner[is_winner][category]['max_len']
 
@@ -85,24 +225,11 @@ class WaffleChart():
         # Générer les couleurs 
         color_scale_dict = generate_color_dict(distribution.keys(), colorscale_name='Oranges')
 
-        # Hover template 
-        hovertemplate = (
-            "<b>%{customdata[0]}</b><br><br>"                    # Nom en gras
-            "<i>Catégorie:</i> %{customdata[1]}<br>"          # Catégorie
-            "<i>Film:</i> <span style='color:#1f77b4'>%{customdata[2]}</span><br>"  # Film avec couleur
-            "<i>Année:</i> %{customdata[3]}<br>"              # Année
-            "<i>Statut:</i> %{customdata[4]}<br>"            # Gagnant
-            "<extra></extra>"
-        )
-
         # Pour chaque figure 
         for i, (key, count) in enumerate(distribution.items()):
 
             # Sous-dataframe pour chaque catégorie, avec nom acteur, film et année et catégorie
             sub_df = df[df[category] == key]
-
-            # sub_df changer tout les Win_Oscar? true par 'Gagnant' et false par 'Nominée'
-            sub_df['Win_Oscar?'] = sub_df['Win_Oscar?'].replace({True: 'WINNER', False: 'NOMINEE'})
             
             # On ne garde que le nombre pour cette période 
             x_vals = x_grid[:count]
@@ -114,21 +241,16 @@ class WaffleChart():
                 y=y_vals,
                 mode='markers',
                 marker=dict(
-                    size=min(layout_by_winner[is_winner][category]['size'], height/(y_size + 3)), 
+                    size=marker_size, 
                     color=[color_scale_dict[key]] * len(x_vals),
                     symbol="circle",
                 ),
-                customdata=sub_df[['Name', 'Category', 'Film', 'Year_Ceremony', 'Win_Oscar?']],
-                hovertemplate=hovertemplate,
+                **self._get_hover(sub_df, lazy_hover),
             ), row=1, col=i+1)
 
-            # Axis limits
-            fig.update_xaxes(range=[-0.1, 1.1], row=1, col=i+1)
-            fig.update_yaxes(range=[-0.1, 1.05], row=1, col=i+1)
-
-            # Supprimer la grille 
-            fig.update_xaxes(showline=False, zeroline=False, visible=False, row=1, col=i+1)
-            fig.update_yaxes(showline=False, zeroline=False, visible=False, row=1, col=i+1)
+            # Limites des axes et suppression de la grille 
+            fig.update_xaxes(range=[-0.1, 1.1], showline=False, zeroline=False, visible=False, row=1, col=i+1)
+            fig.update_yaxes(range=[-0.1, 1.05], showline=False, zeroline=False, visible=False, row=1, col=i+1)
 
             # Annotation pour le nom de la catégorie
             fig.add_annotation(x=0.5, y=-0.05, xref=f'x{i+1}', yref=f'y{i+1}',
@@ -152,3 +274,92 @@ class WaffleChart():
         )
 
         return fig
+
+
+    def plot_webgl_waffle_chart(self, distribution, df, category, font_size=16, font_family='Jost', height=700, lazy_hover=False):
+        """
+        Variante du graphique en gaufre pour les grands volumes: une seule trace Scattergl,
+        les catégories étant placées côte à côte sur un même axe.
+
+        La taille de la grille est déduite du plus grand groupe (et non d'une table fixe),
+        et les coordonnées de grille sont mises en cache.
+
+        Args:
+            distribution: Dictionnaire contenant le nombre d'individus par catégorie (ordre d'affichage)
+            df: DataFrame avec les données complètes
+            category: Colonne à utiliser pour le regroupement
+            font_size: Taille de police pour les annotations
+            font_family: Police à utiliser
+            height: Hauteur du graphique en pixels
+            lazy_hover: Si True, les points ne portent que l'identifiant de leur ligne
+
+        Returns:
+            Figure Plotly
+        """
+        if not distribution or sum(distribution.values()) == 0:
+            return self._empty_figure(font_size, font_family, height)
+
+        keys = list(distribution.keys())
+        counts = np.array([distribution[key] for key in keys], dtype=np.int64)
+        n_panels = len(keys)
+        x_size, y_size = get_grid_size(int(counts.max()), n_panels, height)
+        x_grid, y_grid = get_grid_coordinates(x_size, y_size)
+
+        # Position de chaque point: indice dans son groupe -> cellule de la grille, décalée par panneau
+        panel = np.repeat(np.arange(n_panels), counts)
+        rank = np.arange(len(panel)) - np.repeat(np.cumsum(counts) - counts, counts)
+        x_vals = panel * (1 + PANEL_GAP) + x_grid[rank]
+        y_vals = y_grid[rank]
+
+        # Lignes du DataFrame dans le même ordre que les points (groupe par groupe, ordre stable)
+        order = self._webgl_row_order(keys, df, category)[:len(panel)]
+        hover = self._get_hover(df.iloc[order], lazy_hover)
+
+        # Couleurs: un indice de catégorie par point et une échelle discrète
+        color_scale_dict = generate_color_dict(keys, colorscale_name='Oranges')
+        colors = [color_scale_dict[key] for key in keys]
+        colorscale = [[i / max(n_panels - 1, 1), color] for i, color in enumerate(colors)]
+        if n_panels == 1:
+            colorscale = [[0, colors[0]], [1, colors[0]]]
+
+        panel_width_px = REFERENCE_WIDTH / (n_panels * (1 + PANEL_GAP))
+        marker_size = max(2, min(height / (y_size + 3), panel_width_px / (x_size + 1)))
+
+        fig = go.Figure(go.Scattergl(
+            x=x_vals,
+            y=y_vals,
+            mode='markers',
+            marker=dict(
+                size=marker_size,
+                color=panel,
+                colorscale=colorscale,
+                cmin=0,
+                cmax=max(n_panels - 1, 1),
+                symbol='circle',
+            ),
+            **hover,
+        ))
+
+        # Nom de chaque panneau
+        for i, key in enumerate(keys):
+            fig.add_annotation(x=i * (1 + PANEL_GAP) + 0.5, y=-0.05, text=key, showarrow=False,
+                               font_size=font_size, font_family=font_family)
+
+        fig.update_xaxes(range=[-0.1, n_panels * (1 + PANEL_GAP) - PANEL_GAP + 0.1],
+                         showline=False, zeroline=False, visible=False)
+        fig.update_yaxes(range=[-0.1, 1.05], showline=False, zeroline=False, visible=False)
+        fig.update_layout(
+            height=height,
+            autosize=False,
+            plot_bgcolor=TRANSPARENT,
+            paper_bgcolor=TRANSPARENT,
+            margin=dict(l=0, r=0, t=0, b=10),
+            showlegend=False,
+            hoverlabel=dict(
+                bgcolor="white",
+                font_size=font_size,
+                font_family=font_family
+            )
+        )
+
+        return fig
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from helper import TRANSPARENT, generate_color_dict
@@ -6,7 +7,7 @@ class LineChart():
     def __init__(self):
         pass
 
-    def plot_line_chart(self, distribution_dict, category, selected_categories, df, cumulative=True, scale_type='linear', height=700):
+    def plot_line_chart(self, distribution_dict, category, selected_categories, df, cumulative=True, scale_type='linear', height=700, lazy_hover=False):
         """
         Génère un graphique en lignes montrant l'évolution d'une catégorie au fil du temps.
         
@@ -14,10 +15,12 @@ class LineChart():
             distribution_dict: Dictionnaire des distributions par année
             category: Colonne de regroupement (ex. 'Ethnicity', 'Gender', etc.)
             selected_categories: Liste des catégories à afficher
-            df: DataFrame contenant les données complètes
+            df: DataFrame contenant les données complètes (inutilisé, et peut valoir None, si lazy_hover)
             cumulative: Si True, affiche les données de manière cumulative
             scale_type: Type d'échelle pour l'axe Y ('linear' ou 'log')
             height: Hauteur du graphique en pixels
+            lazy_hover: Si True, les points ne portent que le nom de leur catégorie: le texte
+                        d'infobulle n'est pas construit et est résolu côté serveur à partir de hoverData
             
         Returns:
             Figure Plotly
@@ -27,47 +30,19 @@ class LineChart():
         # Couleurs pour les catégories
         color_dict = generate_color_dict(selected_categories, colorscale_name='Oranges')
         
+        # Textes d'infobulle de toutes les courbes (mode intégré seulement)
+        if not lazy_hover:
+            hover_texts = self._get_hover_texts(distribution_dict, category, selected_categories, df, cumulative)
+
         # Tracer les courbes pour chaque catégorie
+        x_years = sorted(distribution_dict.keys())
         for i, category_name in enumerate(selected_categories):
-            x_years = sorted(distribution_dict.keys())
             y_values = [distribution_dict[year].get(category_name, 0) for year in x_years]
-            
-            # Données pour les infobulles
-            filtered_df = df[df[category] == category_name]
-            hover_texts = []
-            
-            for year in x_years:
-                # Comptage annuel vs cumulatif
-                year_count = distribution_dict[year].get(category_name, 0)
-                annual_count = year_count
-                
-                if cumulative and year > min(x_years):
-                    previous_year_index = x_years.index(year) - 1
-                    previous_year = x_years[previous_year_index]
-                    annual_count = year_count - distribution_dict[previous_year].get(category_name, 0)
-                
-                year_data = filtered_df[filtered_df['Year_Ceremony'] == year]
-                
-                # Texte pour l'infobulle
-                text = f"<b>{category_name}</b><br>"
-                text += f"Année: {year}<br>"
-                
-                if cumulative:
-                    text += f"Total cumulé: {year_count}<br>"
-                    text += f"Nouveaux cette année: {annual_count}<br>"
-                else:
-                    text += f"Nombre cette année: {annual_count}<br>"
-                
-                # Exemples de gagnants/nominés
-                if not year_data.empty and annual_count > 0:
-                    text += "<br>Exemples:<br>"
-                    for _, entry in year_data.head(3).iterrows():
-                        text += f"• {entry['Name']} ({entry['Film']})<br>"
-                    
-                    if len(year_data) > 3:
-                        text += f"...et {len(year_data) - 3} autres"
-                
-                hover_texts.append(text)
+
+            if lazy_hover:
+                hover = dict(customdata=[category_name] * len(x_years), hoverinfo='none')
+            else:
+                hover = dict(hoverinfo='text', hovertext=hover_texts[category_name])
 
             # Ajouter la trace au graphique
             fig.add_trace(go.Scatter(
@@ -77,8 +52,7 @@ class LineChart():
                 name=category_name,
                 line=dict(color=color_dict[category_name], width=3),
                 marker=dict(size=8, color=color_dict[category_name]),
-                hoverinfo='text',
-                hovertext=hover_texts
+                **hover
             ))
 
         # Ligne verticale pour marquer 2015 (si dans l'intervalle)
@@ -139,4 +113,71 @@ class LineChart():
             ),
         )
         
-        return fig
\ No newline at end of file
+        return fig
+
+    @staticmethod
+    def _get_hover_texts(distribution_dict, category, selected_categories, df, cumulative=True, n_examples=3):
+        """
+        Textes d'infobulle de toutes les courbes, construits en une seule passe groupée.
+
+        Les lignes de df sont regroupées par (catégorie, année) avec un tri stable; les comptages
+        annuels et cumulés sont lus dans des tableaux et seuls les n_examples premiers exemples
+        de chaque groupe sont formatés.
+
+        Returns:
+            dict: {catégorie: liste des textes, un par année de distribution_dict}
+        """
+        selected_categories = list(dict.fromkeys(selected_categories))
+        x_years = sorted(distribution_dict.keys())
+        n_years, n_categories = len(x_years), len(selected_categories)
+
+        # Comptages (année × catégorie) et nouveaux comptages de chaque année
+        counts = np.array([[distribution_dict[year].get(name, 0) for name in selected_categories] for year in x_years],
+                          dtype=np.int64).reshape(n_years, n_categories)
+        annual_counts = np.diff(counts, axis=0, prepend=0) if cumulative else counts
+
+        # Groupe (catégorie, année) de chaque ligne, -1 hors sélection ou hors des années tracées
+        row_categories = pd.Categorical(df[category], categories=selected_categories).codes.astype(np.int64)
+        years = df['Year_Ceremony'].to_numpy()
+        row_years = np.searchsorted(x_years, years)
+        valid = (row_categories >= 0) & (row_years < n_years)
+        valid[valid] = np.asarray(x_years)[row_years[valid]] == years[valid]
+        rows = np.flatnonzero(valid)
+        groups = row_categories[rows] * n_years + row_years[rows]
+
+        # Taille de chaque groupe et rang de chaque ligne dans son groupe (ordre d'origine conservé)
+        order = np.argsort(groups, kind='stable')
+        groups, rows = groups[order], rows[order]
+        group_sizes = np.bincount(groups, minlength=n_categories * n_years)
+        ranks = np.arange(len(groups)) - (np.cumsum(group_sizes) - group_sizes)[groups]
+
+        # Exemples: seules les n_examples premières lignes de chaque groupe sont formatées
+        keep = ranks < n_examples
+        names = df['Name'].to_numpy()[rows[keep]]
+        films = df['Film'].to_numpy()[rows[keep]]
+        examples = [''] * (n_categories * n_years)
+        for group, name, film in zip(groups[keep].tolist(), names, films):
+            examples[group] += f"• {name} ({film})<br>"
+
+        hover_texts = {}
+        for c, category_name in enumerate(selected_categories):
+            texts = []
+            for y, year in enumerate(x_years):
+                year_count, annual_count = counts[y, c], annual_counts[y, c]
+                group_size = group_sizes[c * n_years + y]
+
+                # Texte pour l'infobulle
+                text = f"<b>{category_name}</b><br>Année: {year}<br>"
+                if cumulative:
+                    text += f"Total cumulé: {year_count}<br>Nouveaux cette année: {annual_count}<br>"
+                else:
+                    text += f"Nombre cette année: {annual_count}<br>"
+
+                # Exemples de gagnants/nominés
+                if group_size and annual_count > 0:
+                    text += "<br>Exemples:<br>" + examples[c * n_years + y]
+                    if group_size > n_examples:
+                        text += f"...et {group_size - n_examples} autres"
+                texts.append(text)
+            hover_texts[category_name] = texts
+        return hover_texts
@@ -25,26 +25,28 @@ class StackedAreaChart():
         Returns:
             Figure Plotly
         """
-        # Convertir les données en DataFrame
-        df = pd.DataFrame(data).T.fillna(0)
-        df.index = df.index.astype(str)
+        # Convertir les données en matrice (période × catégorie), catégories dans l'ordre d'apparition
+        periods = [str(period) for period in data]
+        categories = list(dict.fromkeys(key for distribution in data.values() for key in distribution))
+        counts = np.array([[distribution.get(cat, 0) for cat in categories] for distribution in data.values()], dtype=float)
+        counts = counts.reshape(len(periods), len(categories))
 
-        # Normaliser les valeurs
-        df_normalized = df.div(df.sum(axis=1), axis=0)
-        df_percentage = df_normalized * 100
+        # Normaliser les valeurs (une période sans données donne NaN, comme une division 0/0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentages = counts / counts.sum(axis=1, keepdims=True) * 100
         
         # Obtenir les couleurs pour chaque catégorie
-        color_dict = generate_color_dict(identifiers=df_normalized.columns, colorscale_name='Oranges')
-        color_sequence = [color_dict[cat] for cat in df_normalized.columns]
+        color_dict = generate_color_dict(identifiers=categories, colorscale_name='Oranges')
+        color_sequence = [color_dict[cat] for cat in categories]
 
         # Créer une figure
         fig = go.Figure()
         
         # Ajouter chaque catégorie comme aire empilée
-        for i, col in enumerate(df_percentage.columns):
+        for i, col in enumerate(categories):
             fig.add_trace(go.Scatter(
-                x=df_percentage.index,
-                y=df_percentage[col],
+                x=periods,
+                y=percentages[:, i],
                 mode='lines',
                 stackgroup='one',
                 name=col,
@@ -53,20 +55,17 @@ class StackedAreaChart():
                 hoverinfo='skip'
             ))
         
-        # Textes personnalisés pour les infobulles
-        hover_texts = []
-        for year in df_percentage.index:
-            text = f"Année : {year}<br>"
-            for col in df_percentage.columns:
-                percentage = df_percentage.loc[year, col]
-                absolute = df.loc[year, col]
-                text += f"{col} : {percentage:.1f}% ({int(absolute)})<br>"
-            hover_texts.append(text)
+        # Textes personnalisés pour les infobulles: une ligne par catégorie, assemblées par période
+        lines = [
+            [f"{col} : {percentage:.1f}% ({int(absolute)})<br>" for col, percentage, absolute in zip(categories, percentage_row, count_row)]
+            for percentage_row, count_row in zip(percentages.tolist(), counts.tolist())
+        ]
+        hover_texts = [f"Année : {period}<br>" + ''.join(period_lines) for period, period_lines in zip(periods, lines)]
         
         # Trace invisible pour les infobulles personnalisées
         fig.add_trace(go.Scatter(
-            x=df_percentage.index,
-            y=[50] * len(df_percentage),
+            x=periods,
+            y=[50] * len(periods),
             mode='markers',
             marker=dict(opacity=0),
             hoverinfo='text',
@@ -0,0 +1,31 @@
+# Configuration gunicorn du point d'entrée de production (voir wsgi.py)
+#     gunicorn -c gunicorn.conf.py wsgi:server
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('OSCARS_BIND', '0.0.0.0:8070')
+
+# Un worker par cœur: les callbacks sont liés au CPU (agrégation et construction des figures)
+workers = int(os.environ.get('OSCARS_WORKERS', multiprocessing.cpu_count()))
+
+# Chargement de l'application (et des données) dans le maître, avant le fork des workers
+preload_app = True
+
+# Métriques additionnées sur tous les workers: un dossier propre à cette instance, sauf s'il est imposé
+# (le dossier est lu à l'import de app.py, donc avant le fork)
+if 'OSCARS_METRIQUES_DIR' not in os.environ:
+    os.environ['OSCARS_METRIQUES_DIR'] = tempfile.mkdtemp(prefix='oscars-metriques-')
+    _dossier_metriques_temporaire = os.environ['OSCARS_METRIQUES_DIR']
+else:
+    _dossier_metriques_temporaire = None
+
+
+def on_exit(server):
+    """Supprime le dossier temporaire des métriques à l'arrêt du maître."""
+    if _dossier_metriques_temporaire:
+        shutil.rmtree(_dossier_metriques_temporaire, ignore_errors=True)
+
+# Les rendus à froid des plus grandes figures peuvent prendre plusieurs secondes
+timeout = 60
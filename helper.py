@@ -1,9 +1,16 @@
 import pandas as pd 
-import math
+import os
+import threading
+import zipfile
+from collections import OrderedDict
 import plotly.colors as pc
 import plotly.express as px
 import numpy as np
 
+from aggregation import AggregationEngine
+from bitmap import BitmapIndex
+from search import SearchIndex
+
 # Couleurs personnalisées pour les marqueurs dans le diagramme en gaufre
 CUSTOM_COLORS = [
     '#FFFFFF',  # Blanc
@@ -16,24 +23,578 @@ CUSTOM_COLORS = [
 
 TRANSPARENT = 'rgba(0,0,0,0)'
 
+# Colonnes démographiques agrégées
+DEMOGRAPHIC_COLUMNS = ['Age', 'Gender', 'Race or Ethnicity', 'Religion', 'Sexual orientation']
+
+# Catégorie de prix (ACTOR, ACTRESS, DIRECTING, ...)
+AWARD_COLUMN = 'Category'
+
+# Colonnes du cube de comptages (dans l'ordre de get_unique_distribution)
+CUBE_COLUMNS = DEMOGRAPHIC_COLUMNS + [AWARD_COLUMN]
+
+# Colonnes lues dans le CSV et leurs types (Link et Birth_Place ne sont jamais utilisées)
+# Les colonnes textuelles sont encodées en dictionnaire (category): chaque chaîne n'est
+# stockée qu'une fois et chaque ligne ne porte qu'un petit code entier.
+CSV_DTYPES = {
+    'Name': 'category',
+    'Category': 'category',
+    'Film': 'category',
+    'Win_Oscar?': bool,
+    'Year_Ceremony': np.int16,
+    'Birth_Date': object,
+    'Gender': 'category',
+    'Race or Ethnicity': 'category',
+    'Sexual orientation': 'category',
+    'Religion': 'category',
+}
+BIRTH_DATE_FORMAT = '%Y-%m-%d'
+
+# Colonnes utilisables dans les filtres croisés (voir normalize_filters)
+FILTER_COLUMNS = [AWARD_COLUMN] + DEMOGRAPHIC_COLUMNS
+# Marqueur d'une clause de filtre qui est une disjonction d'autres clauses (à la place de la colonne)
+ANY_CLAUSE = 'any'
+
+# Nombre de cubes de comptages filtrés conservés (un par combinaison de filtres récente)
+FILTERED_CUBE_CACHE_SIZE = 16
+
+# Colonnes textuelles de la recherche par nom ou film (voir DataLoader.search)
+SEARCH_COLUMNS = ['Name', 'Film']
+
+# Colonnes affichées dans l'infobulle d'une personne
+HOVER_COLUMNS = ['Name', 'Category', 'Film', 'Year_Ceremony', 'Win_Oscar?']
+
+# Cache binaire des données prétraitées (hors de assets/, qui est servi publiquement par Dash)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+# À incrémenter dès que preprocess_data ou le format du cache change
+CACHE_VERSION = 3
+
 class DataLoader():
 
     def __init__(self):
         self.data = None
+        self.engine = AggregationEngine()
+        # Vocabulaire partagé: étiquettes de chaque colonne encodée, indexées par code
+        self.vocabulary = None
+        # Cube de comptages (année, gagnant, colonne, valeur) et ses sommes préfixes
+        self.years = None
+        self.count_cube = None
+        self.cube_prefix = None
+        self.row_prefix = None
+        # Partitions triées par année (toutes, gagnants, non-gagnants) et leurs décalages par année
+        self.partitions = None
+        self.year_offsets = None
+        # Index bitmap par (colonne, valeur) des filtres croisés, et cubes des filtres récents
+        self.bitmap_index = None
+        self._filtered_cubes = OrderedDict()
+        self._filtered_cubes_lock = threading.Lock()
+        # Index de recherche par préfixe de terme sur les noms et les films
+        self.search_index = None
 
     def load_data(self, path):
-        self.data = pd.read_csv(path)
+        self.data = pd.read_csv(path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES)
+
+    def load_preprocessed(self, path, cache_dir=CACHE_DIR):
+        """
+        Charge les données prétraitées depuis le cache binaire s'il est à jour,
+        sinon lit et prétraite le CSV puis écrit le cache pour les démarrages suivants.
+
+        Le cache est invalidé par la taille et la date de modification du CSV source
+        ainsi que par CACHE_VERSION.
+
+        Args:
+            path (str): Chemin du CSV source
+            cache_dir (str, optional): Dossier du cache. Si None, le cache n'est pas utilisé.
+
+        Returns:
+            pandas.DataFrame: Les données prétraitées
+        """
+        if cache_dir is None:
+            self.load_data(path)
+            return self.preprocess_data()
+
+        cache_path = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + '.npz')
+        fingerprint = self._source_fingerprint(path)
+        if self._read_cache(cache_path, fingerprint):
+            self.build_indexes()
+            return self.data
+
+        self.load_data(path)
+        self.preprocess_data()
+        try:
+            self._write_cache(cache_path, fingerprint)
+        except OSError:
+            # Dossier du cache non inscriptible (lecture seule, droits): les données restent en mémoire
+            pass
+        return self.data
+
+    @staticmethod
+    def _source_fingerprint(path):
+        """Empreinte du CSV source: version du cache, taille et date de modification."""
+        stat = os.stat(path)
+        return np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def _write_cache(self, cache_path, fingerprint):
+        """
+        Écrit self.data au format colonnaire: les colonnes numériques et booléennes
+        sont stockées telles quelles, les autres sous forme de codes entiers et de catégories.
+        """
+        arrays = {'fingerprint': fingerprint, 'columns': np.array(self.data.columns, dtype=str)}
+        for i, col in enumerate(self.data.columns):
+            series = self.data[col]
+            if series.dtype.kind in 'iu':
+                # Entiers stockés sur le plus petit type suffisant, puis restaurés au type d'origine
+                arrays[f'{i}.values'] = pd.to_numeric(series, downcast='integer').to_numpy()
+                arrays[f'{i}.dtype'] = np.array(str(series.dtype))
+            elif series.dtype.kind in 'bf':
+                arrays[f'{i}.values'] = series.to_numpy()
+            else:
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+                    arrays[f'{i}.categorical'] = np.array(True)
+                else:
+                    codes, categories = pd.factorize(series.to_numpy(), sort=True)
+                code_dtype = np.int8 if len(categories) < 2**7 else np.int16 if len(categories) < 2**15 else np.int32
+                arrays[f'{i}.codes'] = codes.astype(code_dtype)
+                arrays[f'{i}.categories'] = np.asarray(categories.tolist())
+
+        # Écriture atomique: plusieurs processus peuvent démarrer en même temps
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Ne pas laisser de fichier temporaire partiel (disque plein, droits)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_cache(self, cache_path, fingerprint):
+        """Charge self.data depuis le cache s'il existe et correspond à fingerprint."""
+        if not os.path.exists(cache_path):
+            return False
+        try:
+            with np.load(cache_path, allow_pickle=False) as arrays:
+                if not np.array_equal(arrays['fingerprint'], fingerprint):
+                    return False
+                columns = {}
+                for i, col in enumerate(arrays['columns'].tolist()):
+                    if f'{i}.dtype' in arrays:
+                        columns[col] = arrays[f'{i}.values'].astype(str(arrays[f'{i}.dtype']))
+                    elif f'{i}.values' in arrays:
+                        columns[col] = arrays[f'{i}.values']
+                    elif f'{i}.categorical' in arrays:
+                        columns[col] = pd.Categorical.from_codes(arrays[f'{i}.codes'], categories=arrays[f'{i}.categories'])
+                    else:
+                        # Le code -1 (valeur manquante) pointe sur le NaN ajouté en dernière position
+                        categories = np.array(arrays[f'{i}.categories'].tolist() + [np.nan], dtype=object)
+                        columns[col] = categories[arrays[f'{i}.codes']]
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Cache illisible, tronqué ou incomplet: il sera régénéré
+            return False
+        self.data = pd.DataFrame(columns)
+        return True
     
     def preprocess_data(self):
-        self.data['Birth_Date'] = pd.to_datetime(self.data['Birth_Date'], format='%Y-%m-%d', errors='coerce')
-        self.data['Ceremony_Date'] = pd.to_datetime(self.data['Year_Ceremony'], format='%Y').apply(lambda x: x.replace(month=3, day=1))
-        self.data['Age'] = ((self.data['Ceremony_Date'] - self.data['Birth_Date']).dt.days / 365.25).apply(math.floor, 0)
-        # Regrouper dans des tranches d'âges de 10 ans
-        self.data['Age'] = (self.data['Age'] // 10) * 10
-        self.data = self.data.drop(columns=['Birth_Date', 'Birth_Place', 'Ceremony_Date', 'Link', 'Ceremony_Date'])
+        """
+        Calcule la tranche d'âge de chaque nominé à la cérémonie (1er mars de Year_Ceremony).
+
+        Tous les calculs sont vectorisés: aucune fonction Python n'est appelée par ligne.
+        """
+        birth_date = pd.to_datetime(self.data['Birth_Date'], format=BIRTH_DATE_FORMAT, errors='coerce')
+        # 1er mars de l'année de cérémonie: années -> mois (+2) -> jours, en datetime64 NumPy
+        years = self.data['Year_Ceremony'].to_numpy()
+        ceremony_date = ((years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + 2).astype('datetime64[ns]')
+        age = np.floor((ceremony_date - birth_date.to_numpy()) / np.timedelta64(1, 'D') / 365.25)
+        # Regrouper dans des tranches d'âges de 10 ans (catégories entières, code -1 si date inconnue)
+        age_bucket = (age // 10) * 10
+        known = ~np.isnan(age_bucket)
+        categories = np.unique(age_bucket[known]).astype(np.int64)
+        codes = np.where(known, np.searchsorted(categories, np.nan_to_num(age_bucket)), -1)
+        self.data['Age'] = pd.Categorical.from_codes(codes, categories=categories)
+        self.data = self.data.drop(columns=['Birth_Date'])
+        self.build_indexes()
         return self.data
+
+    def build_indexes(self):
+        """
+        Construit les structures dérivées des données prétraitées (vocabulaire, cube de comptages,
+        index par année, bitmaps, index de recherche).
+        """
+        self.build_vocabulary()
+        self.build_count_cube()
+        self.build_year_index()
+        # Après le tri par année: les bits et les lignes de l'index de recherche suivent l'ordre final des lignes
+        self.build_bitmap_index()
+        self.build_search_index()
+
+    def build_vocabulary(self):
+        """
+        Encode en dictionnaire toute colonne textuelle qui ne l'est pas encore et
+        construit le vocabulaire partagé {colonne: [étiquette du code 0, du code 1, ...]}.
+        """
+        self.vocabulary = {}
+        self._label_codes = {}
+        for col in self.data.columns:
+            if self.data[col].dtype == object:
+                self.data[col] = self.data[col].astype('category')
+            if isinstance(self.data[col].dtype, pd.CategoricalDtype):
+                self.vocabulary[col] = self.data[col].cat.categories.tolist()
+                self._label_codes[col] = {label: code for code, label in enumerate(self.vocabulary[col])}
+
+    def get_vocabulary(self, column):
+        """Étiquettes d'une colonne encodée, dans l'ordre des codes."""
+        return self.vocabulary[column]
+
+    def get_codes(self, column, data=None):
+        """
+        Codes entiers (int8/int16) d'une colonne encodée, -1 pour les valeurs manquantes.
+
+        Args:
+            column (str): Colonne encodée
+            data (pandas.DataFrame, optional): Sous-ensemble retourné par filter_data. Par défaut, toutes les données.
+
+        Returns:
+            numpy.ndarray: Codes alignés sur les lignes de data
+        """
+        data = self.data if data is None else data
+        return data[column].cat.codes.to_numpy()
+
+    def encode(self, column, labels):
+        """Convertit des étiquettes en codes; -1 pour les étiquettes absentes du vocabulaire (ex. 'Other')."""
+        label_codes = self._label_codes[column]
+        return np.array([label_codes.get(label, -1) for label in labels], dtype=np.int64)
+
+    def decode(self, column, codes):
+        """Convertit des codes en étiquettes (None pour le code -1)."""
+        vocabulary = self.vocabulary[column]
+        return [vocabulary[code] if code >= 0 else None for code in codes]
+
+    def build_count_cube(self):
+        """
+        Construit le cube dense de comptages indexé par (Year_Ceremony, Win_Oscar?, colonne, valeur)
+        ainsi que ses sommes préfixes le long de l'axe des années.
+
+        Toute distribution sur un intervalle d'années devient alors une simple
+        différence de deux tranches du cube cumulé, sans repasser sur les lignes.
+
+        Les comptages sont d'abord calculés par catégorie de prix (award_cube, award_rows):
+        le cube global en est la somme, et un filtre sur les catégories de prix seulement
+        est la somme des catégories retenues (voir _get_cube).
+        """
+        years = self.data['Year_Ceremony'].to_numpy()
+        self.years = np.arange(int(years.min()), int(years.max()) + 1)
+        self.award_cube, self.award_rows = self._compute_award_cube()
+        self.count_cube, self.cube_prefix, self.row_prefix = self._prefix_cube(
+            self.award_cube.sum(axis=2), self.award_rows.sum(axis=2)
+        )
+
+    def _compute_award_cube(self, rows=None):
+        """
+        Comptages par (année, gagnant, catégorie de prix, colonne, valeur) et nombre de lignes
+        par (année, gagnant, catégorie de prix).
+
+        La dernière position de l'axe des catégories de prix regroupe les lignes sans catégorie.
+
+        Args:
+            rows (numpy.ndarray, optional): Masque booléen des lignes de self.data à compter (toutes par défaut)
+
+        Returns:
+            tuple: (award_cube, award_rows)
+        """
+        year_idx = self.data['Year_Ceremony'].to_numpy() - self.years[0]
+        win_idx = self.data['Win_Oscar?'].to_numpy().astype(np.int64)
+        codes = {col: self.get_codes(col).astype(np.int64) for col in CUBE_COLUMNS}
+        n_awards = len(self.vocabulary[AWARD_COLUMN]) + 1
+        award_idx = np.where(codes[AWARD_COLUMN] >= 0, codes[AWARD_COLUMN], n_awards - 1)
+        if rows is not None:
+            year_idx, win_idx, award_idx = year_idx[rows], win_idx[rows], award_idx[rows]
+            codes = {col: col_codes[rows] for col, col_codes in codes.items()}
+        n_values = max(len(self.vocabulary[col]) for col in CUBE_COLUMNS)
+
+        shape = (len(self.years), 2, n_awards, len(CUBE_COLUMNS), n_values)
+        cube = np.zeros(shape, dtype=np.int64)
+        for i, col in enumerate(CUBE_COLUMNS):
+            # Les valeurs manquantes (code -1) sont ignorées, comme dans groupby
+            valid = codes[col] >= 0
+            cube[:, :, :, i, :] = self.engine.bincount_nd(
+                [year_idx[valid], win_idx[valid], award_idx[valid], codes[col][valid]], (shape[0], 2, n_awards, n_values)
+            )
+        award_rows = self.engine.bincount_nd([year_idx, win_idx, award_idx], (len(self.years), 2, n_awards))
+        return cube, award_rows
+
+    @staticmethod
+    def _prefix_cube(cube, row_counts):
+        """
+        Sommes préfixes le long de l'axe des années d'un cube et des nombres de lignes par (année, gagnant).
+
+        Returns:
+            tuple: (count_cube, cube_prefix, row_prefix)
+        """
+        # Ligne de zéros en tête: compte[a:b] = prefix[b] - prefix[a]
+        cube_prefix = np.zeros((cube.shape[0] + 1,) + cube.shape[1:], dtype=np.int64)
+        np.cumsum(cube, axis=0, out=cube_prefix[1:])
+        row_prefix = np.zeros((row_counts.shape[0] + 1, 2), dtype=np.int64)
+        np.cumsum(row_counts, axis=0, out=row_prefix[1:])
+        return cube, cube_prefix, row_prefix
+
+    def build_bitmap_index(self):
+        """Bitmaps par (colonne, valeur) des colonnes de FILTER_COLUMNS, dans l'ordre des lignes de self.data."""
+        self.bitmap_index = BitmapIndex(len(self.data))
+        for col in FILTER_COLUMNS:
+            self.bitmap_index.add_column(col, self.get_codes(col), len(self.vocabulary[col]))
+        with self._filtered_cubes_lock:
+            self._filtered_cubes.clear()
+
+    def get_filter_bitmap(self, filters):
+        """
+        Bitmap compacté des lignes qui satisfont filters (voir normalize_filters).
+
+        Returns:
+            numpy.ndarray: Un bit par ligne de self.data, 8 lignes par octet
+        """
+        clauses = []
+        for clause in normalize_filters(filters):
+            literals = [(column, self.encode(column, values), exclude) for column, values, exclude in filter_literals(clause)]
+            clauses.append(literals if clause[0] == ANY_CLAUSE else literals[0])
+        return self.bitmap_index.evaluate(clauses)
+
+    def count_filtered_rows(self, filters):
+        """Nombre de lignes qui satisfont filters, toutes années confondues."""
+        return self.bitmap_index.count(self.get_filter_bitmap(filters))
+
+    def _award_selection(self, filters):
+        """
+        Masque des positions de l'axe des catégories de prix de award_cube retenues par filters,
+        ou None si filters porte aussi sur d'autres colonnes.
+        """
+        if any(column != AWARD_COLUMN for clause in filters for column, _, _ in filter_literals(clause)):
+            return None
+        keep = np.ones(self.award_cube.shape[2], dtype=bool)
+        for clause in filters:
+            # Disjonction: union des catégories retenues par chacune de ses clauses
+            selected = np.zeros_like(keep)
+            for _, values, exclude in filter_literals(clause):
+                codes = self.encode(AWARD_COLUMN, values)
+                matched = np.zeros_like(keep)
+                matched[codes[codes >= 0]] = True
+                selected |= ~matched if exclude else matched
+            keep &= selected
+        return keep
+
+    def _get_cube(self, filters=None):
+        """
+        (count_cube, cube_prefix, row_prefix) des lignes qui satisfont filters.
+
+        Sans filtre, ce sont les structures précalculées. Un filtre sur les catégories de prix
+        seulement somme les comptages précalculés des catégories retenues; les autres filtres
+        recalculent le cube sur les lignes sélectionnées par l'index bitmap. Le résultat est
+        conservé pour les requêtes suivantes.
+        """
+        filters = normalize_filters(filters)
+        if not filters:
+            return self.count_cube, self.cube_prefix, self.row_prefix
+        with self._filtered_cubes_lock:
+            if filters in self._filtered_cubes:
+                self._filtered_cubes.move_to_end(filters)
+                return self._filtered_cubes[filters]
+        keep = self._award_selection(filters)
+        if keep is not None:
+            award_cube, award_rows = self.award_cube[:, :, keep], self.award_rows[:, :, keep]
+        else:
+            award_cube, award_rows = self._compute_award_cube(self.bitmap_index.to_mask(self.get_filter_bitmap(filters)))
+        cube = self._prefix_cube(award_cube.sum(axis=2), award_rows.sum(axis=2))
+        with self._filtered_cubes_lock:
+            self._filtered_cubes[filters] = cube
+            while len(self._filtered_cubes) > FILTERED_CUBE_CACHE_SIZE:
+                self._filtered_cubes.popitem(last=False)
+        return cube
+
+    def build_year_index(self):
+        """
+        Trie les données par Year_Ceremony et les partitionne selon le statut de gagnant.
+
+        Pour chaque partition, year_offsets[p][k] est la position de la première ligne
+        de l'année self.years[k]. Un filtre par intervalle d'années devient alors une
+        tranche contiguë (une vue), sans masque booléen. Le tri est stable afin de
+        conserver l'ordre d'origine au sein d'une même année.
+
+        Les partitions conservent l'index de self.data: l'index d'une ligne filtrée est
+        son identifiant global, utilisable avec get_rows().
+        """
+        self.data = self.data.sort_values('Year_Ceremony', kind='stable').reset_index(drop=True)
+        winners = self.data['Win_Oscar?'].to_numpy(dtype=bool)
+        self.partitions = {
+            None: self.data,
+            True: self.data[winners],
+            False: self.data[~winners],
+        }
+        # Bornes des années: len(self.years) + 1 décalages par partition
+        bounds = np.append(self.years, self.years[-1] + 1)
+        self.year_offsets = {
+            key: np.searchsorted(part['Year_Ceremony'].to_numpy(), bounds, side='left')
+            for key, part in self.partitions.items()
+        }
+
+    def _year_slice(self, start_year, end_year):
+        """Convertit un intervalle d'années inclusif en bornes d'indices du cube."""
+        start = int(np.clip(start_year - self.years[0], 0, len(self.years)))
+        end = int(np.clip(end_year - self.years[0] + 1, start, len(self.years)))
+        return start, end
+
+    @staticmethod
+    def _winner_slice(is_winner):
+        """Indices de l'axe gagnant du cube selon le filtre is_winner."""
+        if is_winner is None:
+            return slice(0, 2)
+        return slice(1, 2) if is_winner else slice(0, 1)
+
+    def get_range_counts(self, start_year, end_year, column, is_winner=None, filters=None):
+        """
+        Comptages par valeur d'une colonne de CUBE_COLUMNS sur un intervalle d'années.
+
+        Args:
+            start_year (int): L'année de début (incluse)
+            end_year (int): L'année de fin (incluse)
+            column (str): Colonne de CUBE_COLUMNS (démographique ou catégorie de prix)
+            is_winner (bool, optional): Même convention que filter_data
+            filters (list, optional): Filtres croisés (voir normalize_filters)
+
+        Returns:
+            tuple: (labels, counts) où counts est un tableau NumPy aligné sur labels
+        """
+        _, cube_prefix, _ = self._get_cube(filters)
+        start, end = self._year_slice(start_year, end_year)
+        col = CUBE_COLUMNS.index(column)
+        labels = self.vocabulary[column]
+        wins = self._winner_slice(is_winner)
+        counts = (cube_prefix[end, wins, col, :len(labels)] - cube_prefix[start, wins, col, :len(labels)]).sum(axis=0)
+        return labels, counts
+
+    def get_range_win_counts(self, start_year, end_year, column, selected_categories=None, filters=None):
+        """
+        Comptages (valeur × statut) d'une colonne de CUBE_COLUMNS sur un intervalle d'années.
+
+        Args:
+            start_year (int): L'année de début (incluse)
+            end_year (int): L'année de fin (incluse)
+            column (str): Colonne de CUBE_COLUMNS (démographique ou catégorie de prix)
+            selected_categories (list, optional): Valeurs à conserver; les autres sont comptées à 0
+                ('Other', absent du vocabulaire, est ignoré). Par défaut, toutes les valeurs.
+            filters (list, optional): Filtres croisés (voir normalize_filters)
+
+        Returns:
+            tuple: (labels, counts) où counts, de forme (len(labels), 2), donne pour chaque
+            valeur le nombre de perdants (colonne 0) et de gagnants (colonne 1)
+        """
+        _, cube_prefix, _ = self._get_cube(filters)
+        start, end = self._year_slice(start_year, end_year)
+        col = CUBE_COLUMNS.index(column)
+        labels = self.vocabulary[column]
+        counts = (cube_prefix[end, :, col, :len(labels)] - cube_prefix[start, :, col, :len(labels)]).T
+        if selected_categories:
+            codes = self.encode(column, selected_categories)
+            keep = np.zeros(len(labels), dtype=bool)
+            keep[codes[codes >= 0]] = True
+            counts[~keep] = 0
+        return labels, counts
+
+    def get_range_distribution(self, start_year, end_year, is_winner=None, filters=None):
+        """
+        Équivalent de get_unique_distribution(filter_data(...)) calculé à partir du cube.
+
+        Returns:
+            tuple: (distribution_dict, total) au même format que get_unique_distribution
+        """
+        _, _, row_prefix = self._get_cube(filters)
+        start, end = self._year_slice(start_year, end_year)
+        result_dict = {}
+        for col in CUBE_COLUMNS:
+            labels, counts = self.get_range_counts(start_year, end_year, col, is_winner, filters)
+            # Tri décroissant stable, les valeurs absentes de l'intervalle sont exclues
+            order = np.argsort(-counts, kind='stable')
+            result_dict[col] = {labels[i]: int(counts[i]) for i in order if counts[i] > 0}
+        total = int((row_prefix[end] - row_prefix[start])[self._winner_slice(is_winner)].sum())
+        return result_dict, total
+
+    def get_range_yearly_counts(self, start_year, end_year, column, is_winner=None, time_granularity=1, filters=None):
+        """
+        Comptages par période et par valeur d'une colonne, calculés à partir du cube.
+
+        Seules les périodes et les valeurs présentes dans l'intervalle sont conservées,
+        comme avec le groupby de get_yearly_distribution.
+
+        Returns:
+            tuple: (periods, labels, counts) où counts est de forme (len(periods), len(labels))
+        """
+        count_cube, _, _ = self._get_cube(filters)
+        start, end = self._year_slice(start_year, end_year)
+        col = CUBE_COLUMNS.index(column)
+        labels = self.vocabulary[column]
+        counts = count_cube[start:end, self._winner_slice(is_winner), col, :len(labels)].sum(axis=1)
+        years = self.years[start:end]
+
+        # Regrouper les années par tranches de time_granularity ans
+        buckets = (years // time_granularity) * time_granularity
+        periods, bucket_idx = np.unique(buckets, return_inverse=True)
+        bucketed = np.zeros((len(periods), len(labels)), dtype=np.int64)
+        np.add.at(bucketed, bucket_idx, counts)
+
+        present_periods = bucketed.sum(axis=1) > 0
+        present_labels = bucketed.sum(axis=0) > 0
+        return (
+            [int(p) for p in periods[present_periods]],
+            [label for label, keep in zip(labels, present_labels) if keep],
+            bucketed[present_periods][:, present_labels],
+        )
+
+    def get_range_yearly_distribution(self, start_year, end_year, column, is_winner=None, selected_categories=None, time_granularity=1, filters=None):
+        """
+        Équivalent de get_yearly_distribution(filter_data(...)) calculé à partir du cube.
+
+        Returns:
+            dict: Dictionnaire de la forme {période: {catégorie1: valeur1, ...}}
+        """
+        periods, labels, counts = self.get_range_yearly_counts(start_year, end_year, column, is_winner, time_granularity, filters)
+        labels, counts = fold_selected_counts(labels, counts, selected_categories)
+        return counts_to_distribution(periods, labels, counts)
+
+    def get_range_cumulative_yearly_distribution(self, start_year, end_year, column, is_winner=None, selected_categories=None, time_granularity=1, filters=None):
+        """
+        Équivalent de get_cumulative_yearly_distribution(filter_data(...)) calculé à partir du cube.
+
+        Returns:
+            dict: Dictionnaire de la forme {période: {catégorie1: valeur_cumulative1, ...}}
+        """
+        periods, labels, counts = self.get_range_yearly_counts(start_year, end_year, column, is_winner, time_granularity, filters)
+        labels, counts = fold_selected_counts(labels, counts, selected_categories)
+        return counts_to_distribution(periods, labels, counts.cumsum(axis=0))
     
-    def filter_data(self, start_year, end_year, is_winner=None):
+    def export_count_cube(self, filters=None):
+        """
+        Version compacte et sérialisable en JSON du cube de comptages, destinée au navigateur.
+
+        Pour chaque colonne démographique, counts est la liste aplatie des comptages
+        indexés par (année, gagnant, valeur): counts[(y * 2 + w) * len(labels) + v].
+
+        Args:
+            filters (list, optional): Filtres croisés (voir normalize_filters)
+
+        Returns:
+            dict: {'years': [première, dernière], 'columns': {colonne: {'labels': [...], 'counts': [...]}}}
+        """
+        count_cube, _, _ = self._get_cube(filters)
+        columns = {}
+        for i, col in enumerate(DEMOGRAPHIC_COLUMNS):
+            labels = self.vocabulary[col]
+            columns[col] = {
+                'labels': list(labels),
+                'counts': count_cube[:, :, i, :len(labels)].ravel().tolist(),
+            }
+        return {'years': [int(self.years[0]), int(self.years[-1])], 'columns': columns}
+
+    def filter_data(self, start_year, end_year, is_winner=None, filters=None):
         """
         Filtre les données en fonction des années de début et de fin et du statut de gagnant.
         
@@ -43,19 +604,57 @@ class DataLoader():
             is_winner (bool, optional): Si True, seuls les gagnants sont inclus. 
                                       Si False, seuls les non-gagnants. 
                                       Si None, les gagnants et les nominés sont inclus.
+            filters (list, optional): Filtres croisés (voir normalize_filters)
         
         Returns:
             pandas.DataFrame: Le dataframe filtré
         """
-        filtered_df = self.data[(self.data['Year_Ceremony'] >= start_year) & 
-                              (self.data['Year_Ceremony'] <= end_year)]
-        
-        # Appliquer le filtre de gagnant si spécifié
-        if is_winner is not None:
-            filtered_df = filtered_df[filtered_df['Win_Oscar?'] == is_winner]
-            
-        return filtered_df
+        # Tranche contiguë de la partition triée: pas de masque ni de copie des données.
+        # Le résultat partage la mémoire de la partition et ne doit pas être modifié en place.
+        start, end = self._year_slice(start_year, end_year)
+        offsets = self.year_offsets[is_winner]
+        data = self.partitions[is_winner].iloc[offsets[start]:offsets[end]]
+        if normalize_filters(filters):
+            # L'index des partitions est la position de la ligne dans self.data, comme les bits de l'index bitmap
+            rows = self.bitmap_index.to_mask(self.get_filter_bitmap(filters))
+            data = data[rows[data.index.to_numpy()]]
+        return data
     
+    def build_search_index(self):
+        """Index de recherche des colonnes de SEARCH_COLUMNS, construit sur leurs vocabulaires."""
+        self.search_index = SearchIndex(len(self.data)).build(
+            {col: (self.get_codes(col), self.vocabulary[col]) for col in SEARCH_COLUMNS}
+        )
+
+    def search(self, query):
+        """
+        Lignes dont le nom ou le film correspond à une requête: chaque terme de la requête doit être
+        le début d'un mot du nom ou du film, sans tenir compte de la casse ni des accents.
+
+        Args:
+            query (str): Texte saisi (ex. 'halle ber')
+
+        Returns:
+            numpy.ndarray: Identifiants globaux des lignes (index de filter_data), triés
+        """
+        return self.search_index.search(query)
+
+    def get_rows(self, row_ids, columns=None):
+        """
+        Lignes correspondant à des identifiants globaux (index des données filtrées).
+
+        Args:
+            row_ids: Identifiant ou liste d'identifiants de lignes
+            columns: Colonnes à retourner (toutes par défaut)
+
+        Returns:
+            list: Un dictionnaire {colonne: valeur} par identifiant
+        """
+        rows = self.data.iloc[np.atleast_1d(np.asarray(row_ids, dtype=np.int64))]
+        if columns is not None:
+            rows = rows[columns]
+        return rows.to_dict('records')
+
     def get_unique_distribution(self, data):
         """ 
         Calcule la distribution des valeurs uniques pour chaque colonne.
@@ -64,16 +663,14 @@ class DataLoader():
             tuple: (distribution_dict, total) où distribution_dict contient les comptages 
                   pour chaque valeur unique et total est le nombre total d'enregistrements
         """
-        df = data.copy()    
-        df.drop(columns=['Category', 'Name', 'Film', 'Year_Ceremony', 'Win_Oscar?'], inplace=True)
-        df = df.reindex(sorted(df.columns), axis=1)
-
         result_dict = {}
-        for col in df.columns:
-            result_dict[col] = df.groupby(col).size().to_dict()
-            result_dict[col] = dict(sorted(result_dict[col].items(), key=lambda item: item[1], reverse=True))
+        for col in CUBE_COLUMNS:
+            labels, counts = self.engine.count(data, col)
+            # Tri décroissant stable, les valeurs absentes sont exclues
+            order = np.argsort(-counts, kind='stable')
+            result_dict[col] = {labels[i]: int(counts[i]) for i in order if counts[i] > 0}
 
-        total = len(df)
+        total = len(data)
 
         return result_dict, total
     
@@ -95,35 +692,12 @@ class DataLoader():
         dict
             Dictionnaire de la forme {période: {catégorie1: valeur1, catégorie2: valeur2, ...}}
         """
-        df = data.copy()
-        
-        # Appliquer la granularité temporelle
-        if time_granularity > 1:
-            # Arrondir les années à la granularité spécifiée
-            df['Year_Ceremony'] = (df['Year_Ceremony'] // time_granularity) * time_granularity
-        
-        df = df.groupby(['Year_Ceremony', df.columns[1]]).size().unstack(fill_value=0)
-        df = df.astype(int)
-        df = df.reindex(sorted(df.columns), axis=1)
-        distribution_dict = {year: row.to_dict() for year, row in df.iterrows()}
-        # Trier par année
-        distribution_dict = dict(sorted(distribution_dict.items(), key=lambda item: item[0]))
+        # Comptage (période × valeur) par bincount sur les codes, périodes triées
+        periods, labels, counts = self.engine.count_by_period(data, data.columns[1], time_granularity)
 
         # Gestion de la catégorie "Other" si nécessaire
-        need_other = False
-        if selected_categories is not None:
-            if 'Other' in selected_categories:
-                selected_categories.remove('Other')
-                need_other = True
-
-        if selected_categories is not None:
-            for year, distribution in distribution_dict.items():
-                filtered_distribution = {key: distribution[key] for key in selected_categories if key in distribution}
-                if need_other:
-                    filtered_distribution['Other'] = sum(value for key, value in distribution.items() if key not in selected_categories)
-                distribution_dict[year] = filtered_distribution
-
-        return distribution_dict
+        labels, counts = fold_selected_counts(labels, counts, selected_categories)
+        return counts_to_distribution(periods, labels, counts)
 
     def get_cumulative_yearly_distribution(self, data, selected_categories=None, time_granularity=1):
         """
@@ -143,28 +717,178 @@ class DataLoader():
         dict
             Dictionnaire de la forme {période: {catégorie1: valeur_cumulative1, catégorie2: valeur_cumulative2, ...}}
         """
-        # Obtenir la distribution non-cumulative année par année
-        yearly_distribution = self.get_yearly_distribution(data, selected_categories, time_granularity)
-        
-        # Convertir en dataframe pour faciliter le calcul cumulatif
-        years = sorted(yearly_distribution.keys())
-        categories = list(set().union(*[d.keys() for d in yearly_distribution.values()]))
-        
-        # Créer un DataFrame vide avec années comme index et catégories comme colonnes
-        cumulative_df = pd.DataFrame(index=years, columns=categories).fillna(0)
-        
-        # Remplir avec les valeurs annuelles
-        for year, dist in yearly_distribution.items():
-            for category, count in dist.items():
-                cumulative_df.loc[year, category] = count
-        
-        # Calculer les valeurs cumulatives
-        cumulative_df = cumulative_df.cumsum()
-        
-        # Convertir le DataFrame en dictionnaire
-        cumulative_dict = {year: row.to_dict() for year, row in cumulative_df.iterrows()}
-        
-        return cumulative_dict
+        # Comptages (période × catégorie), regroupement 'Other' puis somme cumulée le long des périodes
+        periods, labels, counts = self.engine.count_by_period(data, data.columns[1], time_granularity)
+        labels, counts = fold_selected_counts(labels, counts, selected_categories)
+        return counts_to_distribution(periods, labels, counts.cumsum(axis=0))
+
+
+class QueryContext():
+    """
+    Contexte de requête partagé par les étapes « options de la checklist » et « figure »
+    d'une même interaction: le filtre et la distribution ne sont calculés qu'une fois.
+
+    Deux contextes de mêmes paramètres sont égaux. Le cache de figures n'en garde que la clé
+    (cache_key), et non le contexte lui-même, qui retient les données filtrées une fois calculées.
+    Les filtres croisés sont normalisés (voir normalize_filters) et font partie de la clé.
+    """
+
+    def __init__(self, dataloader, year_range, category, winner_filter='all', filters=None):
+        self.dataloader = dataloader
+        self.year_range = (year_range[0], year_range[1])
+        self.category = category
+        self.winner_filter = winner_filter
+        self.is_winner = None if winner_filter == 'all' else True
+        self.filters = normalize_filters(filters)
+        self.distribution_dict, self.total = dataloader.get_range_distribution(
+            self.year_range[0], self.year_range[1], is_winner=self.is_winner, filters=self.filters
+        )
+        self._df = None
+
+    @property
+    def df(self):
+        """Données filtrées, calculées au premier accès seulement."""
+        if self._df is None:
+            self._df = self.dataloader.filter_data(self.year_range[0], self.year_range[1], is_winner=self.is_winner,
+                                                   filters=self.filters)
+        return self._df
+
+    @property
+    def distribution(self):
+        """Distribution de la catégorie étudiée, triée par comptage décroissant."""
+        return self.distribution_dict[self.category]
+
+    def get_options(self, include_other=False):
+        """Options de la checklist pour la catégorie étudiée."""
+        options = [{'label': key, 'value': key} for key in self.distribution.keys()]
+        if include_other:
+            options.append({'label': 'Other', 'value': 'Other'})
+        return options
+
+    def get_default_selection(self, include_other=False):
+        """Sélection par défaut: les 5 premières catégories, plus 'Other' s'il en reste."""
+        selected_categories = list(self.distribution.keys())[:5]
+        if include_other and len(self.distribution) > 5:
+            selected_categories.append('Other')
+        return selected_categories
+
+    def sort_like_options(self, selected_categories):
+        """
+        Trie la sélection dans l'ordre des options (comptage décroissant, puis 'Other').
+
+        Une même sélection produit ainsi toujours la même figure (ordre des traces et couleurs),
+        quel que soit l'ordre dans lequel les cases ont été cochées.
+        """
+        rank = {key: i for i, key in enumerate(self.distribution)}
+        return tuple(sorted(selected_categories or (), key=lambda key: rank.get(key, len(rank))))
+
+    def cache_key(self):
+        """Paramètres du contexte, sans les données: clé hachable (voir FigureCache.normalize)."""
+        return (self.year_range, self.category, self.winner_filter, self.filters)
+
+    def __eq__(self, other):
+        return isinstance(other, QueryContext) and self.cache_key() == other.cache_key()
+
+    def __hash__(self):
+        return hash(self.cache_key())
+
+    def __repr__(self):
+        return f'QueryContext{self.cache_key()!r}'
+
+
+def normalize_filters(filters):
+    """
+    Forme canonique et hachable des filtres croisés.
+
+    Un filtre est une liste de clauses {'column': colonne de FILTER_COLUMNS, 'values': [...],
+    'exclude': bool}: les valeurs d'une clause sont combinées par OU (Category = DIRECTING ou
+    ACTRESS), les clauses par ET, et exclude inverse la clause (Race or Ethnicity ≠ White).
+    Une clause {'any': [clause, ...]} est la disjonction de ses clauses, de colonnes quelconques
+    (Gender = Female ou Race or Ethnicity ≠ White): toute combinaison de conjonctions et de
+    disjonctions s'écrit ainsi, sous forme normale conjonctive.
+    Les clauses sans valeur sont ignorées; l'ordre des clauses et des valeurs est sans effet.
+
+    Paramètres:
+    -----------
+    filters : list ou tuple, optionnel
+        Clauses au format ci-dessus, ou filtres déjà normalisés
+
+    Retourne:
+    --------
+    tuple
+        ((colonne, valeurs triées, exclude), ...), vide sans filtre; une disjonction devient
+        (ANY_CLAUSE, ((colonne, valeurs triées, exclude), ...), False)
+    """
+    if not filters:
+        return ()
+    if isinstance(filters, tuple):
+        return filters
+    clauses = {clause for clause in map(_normalize_clause, filters) if clause is not None}
+    return tuple(sorted(clauses, key=repr))
+
+
+def _normalize_clause(clause):
+    """Forme normalisée d'une clause de filtre (voir normalize_filters), None si elle est sans effet."""
+    if ANY_CLAUSE in clause:
+        # Les disjonctions imbriquées sont aplaties: (a OU (b OU c)) = (a OU b OU c)
+        literals = set()
+        for sub_clause in map(_normalize_clause, clause[ANY_CLAUSE]):
+            if sub_clause is not None:
+                literals.update(filter_literals(sub_clause))
+        if len(literals) <= 1:
+            return next(iter(literals), None)
+        return (ANY_CLAUSE, tuple(sorted(literals, key=repr)), False)
+    if clause['column'] not in FILTER_COLUMNS:
+        raise ValueError(f"Colonne de filtre inconnue: {clause['column']}")
+    if not clause.get('values'):
+        return None
+    values = tuple(sorted(set(clause['values']), key=repr))
+    return (clause['column'], values, bool(clause.get('exclude', False)))
+
+
+def filter_literals(clause):
+    """Clauses simples (colonne, valeurs, exclude) d'une clause normalisée: elle-même, ou celles de sa disjonction."""
+    return clause[1] if clause[0] == ANY_CLAUSE else (clause,)
+
+
+def fold_selected_counts(labels, counts, selected_categories=None):
+    """
+    Restreint une matrice de comptages (période × catégorie) aux catégories sélectionnées.
+
+    Si 'Other' fait partie de la sélection, les catégories non sélectionnées sont
+    regroupées dans une colonne 'Other' (total moins les colonnes conservées).
+    La liste selected_categories n'est pas modifiée.
+
+    Paramètres:
+    -----------
+    labels : list
+        Étiquettes des colonnes de counts
+    counts : numpy.ndarray
+        Comptages de forme (nombre de périodes, len(labels))
+    selected_categories : list, optionnel
+        Liste des catégories à conserver, dans l'ordre voulu
+
+    Retourne:
+    --------
+    tuple
+        (labels, counts) restreints à la sélection
+    """
+    if selected_categories is None:
+        return list(labels), counts
+
+    position = {label: i for i, label in enumerate(labels)}
+    kept = [key for key in selected_categories if key != 'Other' and key in position]
+    columns = [position[key] for key in kept]
+    folded = counts[:, columns]
+    if 'Other' in selected_categories:
+        other = counts.sum(axis=1) - folded.sum(axis=1)
+        return kept + ['Other'], np.column_stack([folded, other])
+    return kept, folded
+
+
+def counts_to_distribution(periods, labels, counts):
+    """Convertit une matrice de comptages (période × catégorie) en {période: {catégorie: valeur}}."""
+    return {period: dict(zip(labels, row)) for period, row in zip(periods, counts.tolist())}
 
 
 def generate_color_dict(identifiers=None, n_colors=None, colorscale_name='Set1'):
@@ -190,6 +914,9 @@ def generate_color_dict(identifiers=None, n_colors=None, colorscale_name='Set1')
         n_colors = len(identifiers)
     elif n_colors is None:
         raise ValueError("Soit les identifiants, soit le nombre de couleurs doivent être fournis")
+    # Aucune catégorie à colorer (ex. filtres croisés ne laissant aucune nomination)
+    if n_colors == 0:
+        return {}
     
     # Obtenir des couleurs à partir de l'échelle de couleurs spécifiée
     try:
@@ -1,7 +1,7 @@
 from dash import html, dcc
 
 
-def create_figure_section(figure_id, title, graph_id, has_checklist=True, has_control_elements=True, intervalle=[1928, 2025], font='Jost', explanation_text=None):
+def create_figure_section(figure_id, title, graph_id, has_checklist=True, has_control_elements=True, intervalle=[1928, 2025], font='Jost', explanation_text=None, has_tooltip=False, has_search=False):
     """
     Génère un blueprint commun pour toutes les figures
     
@@ -14,6 +14,10 @@ def create_figure_section(figure_id, title, graph_id, has_checklist=True, has_co
         intervalle: Intervalle d'années pour le slider
         font: Police de caractères à utiliser
         explanation_text: Texte explicatif pour la figure (optionnel)
+        has_tooltip: Si True, ajoute une infobulle '<graph_id>-tooltip' remplie côté serveur (survol différé)
+        has_search: Si True, ajoute une recherche par nom ou film: la figure de base est reçue dans le Store
+                    '<graph_id>-figure', les points trouvés dans '<graph_id>-highlight', et le graphique
+                    les combine côté client
         
     Returns:
         Une section de figure complète avec les contrôles
@@ -75,6 +79,21 @@ def create_figure_section(figure_id, title, graph_id, has_checklist=True, has_co
         )
     ], className='control-item year-slider', style={'padding': '10px'})
     
+    # Recherche par nom ou film
+    search_box = html.Div([
+        html.P('Rechercher une personne ou un film:'),
+        dcc.Input(
+            id=f'search_fig_{figure_id}',
+            type='search',
+            placeholder='Ex.: Halle Berry, Monster\'s Ball',
+            debounce=False,
+            className='search-input'
+        ),
+        html.P(id=f'search-count_fig_{figure_id}'),
+        dcc.Store(id=f'{graph_id}-figure'),
+        dcc.Store(id=f'{graph_id}-highlight'),
+    ], className='control-item', style={'padding': '10px'}) if has_search else None
+
     # Sélecteur d'échelle (figure 3 uniquement)
     scale_selector = html.Div([
         html.P('Échelle:'),
@@ -133,12 +152,83 @@ def create_figure_section(figure_id, title, graph_id, has_checklist=True, has_co
                 className='dash-tabs'
             ),
 
+            # Recherche
+            search_box,
+
             # Graphique
             dcc.Graph(id=graph_id, style={'width': '100%', 'margin': '40px 0'}),
+
+            # Infobulle du survol différé
+            dcc.Tooltip(id=f'{graph_id}-tooltip', direction='bottom') if has_tooltip else None,
             
             # Contrôles
             controls,
             
         ], style={'width': '100%', 'margin': '0 auto'}),
     ],
-    style={'margin': '0 auto', 'width': '100%', 'fontFamily': font, 'display': 'block', 'textAlign': 'center'})
\ No newline at end of file
+    style={'margin': '0 auto', 'width': '100%', 'fontFamily': font, 'display': 'block', 'textAlign': 'center'})
+
+
+def create_filter_panel(columns, font='Jost'):
+    """
+    Panneau des filtres croisés, appliqués aux quatre figures.
+
+    Chaque colonne a une liste déroulante de valeurs (combinées par OU) et un choix
+    « est / n'est pas »; les colonnes sont combinées par ET ou par OU selon 'cross-filter-combine'.
+    Le callback de app.py rassemble ces contrôles dans le Store 'cross-filter-store' (format de
+    helper.normalize_filters).
+
+    Args:
+        columns: Liste de (colonne, libellé, valeurs possibles)
+        font: Police de caractères à utiliser
+
+    Returns:
+        La section des filtres croisés
+    """
+    rows = []
+    for i, (column, label, values) in enumerate(columns):
+        rows.append(html.Div([
+            html.P(f'{label}:'),
+            dcc.RadioItems(
+                id=f'cross-filter-mode_{i}',
+                options=[
+                    {'label': 'est', 'value': 'include'},
+                    {'label': "n'est pas", 'value': 'exclude'}
+                ],
+                value='include',
+                inline=True,
+                className='radio-filter'
+            ),
+            dcc.Dropdown(
+                id=f'cross-filter-values_{i}',
+                options=[{'label': str(value), 'value': value} for value in values],
+                value=[],
+                multi=True,
+                placeholder='Toutes les valeurs'
+            ),
+        ], className='control-item', style={'padding': '10px', 'minWidth': '250px'}))
+
+    return html.Div(children=[
+        html.H3('Filtres croisés', className='figure-title'),
+        dcc.Markdown('Ces filtres s\'appliquent aux **quatre figures**. Les valeurs choisies pour une même '
+                     'caractéristique sont combinées par « ou », les différentes caractéristiques par « et » '
+                     'ou par « ou », au choix.',
+                     className='figure-explanation'),
+        html.Div(rows, className='controls-container', style={'margin': '20px 0'}),
+        html.Div([
+            html.P('Combiner les caractéristiques par:'),
+            dcc.RadioItems(
+                id='cross-filter-combine',
+                options=[
+                    {'label': 'et (toutes)', 'value': 'all'},
+                    {'label': 'ou (au moins une)', 'value': 'any'}
+                ],
+                value='all',
+                inline=True,
+                className='radio-filter'
+            ),
+        ], className='control-item', style={'padding': '10px'}),
+        html.P(id='cross-filter-count'),
+        dcc.Store(id='cross-filter-store', data=None),
+    ],
+    style={'margin': '0 auto', 'width': '100%', 'fontFamily': font, 'display': 'block', 'textAlign': 'center'})
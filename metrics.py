@@ -0,0 +1,333 @@
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from dash.exceptions import PreventUpdate
+
+
+# Bornes des histogrammes de durée (secondes)
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram():
+    """Histogramme cumulatif à bornes fixes (format Prometheus), une série par jeu d'étiquettes."""
+
+    def __init__(self, name, help_text, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, labels, value):
+        """Ajoute une observation; labels est un tuple de paires (nom, valeur). À appeler sous le verrou du registre."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def snapshot(self):
+        """Séries au format JSON: [[étiquettes, [comptes par borne, somme]], ...]."""
+        return [[list(labels), series] for labels, series in self._series.items()]
+
+    def merge(self, snapshot):
+        """Ajoute les séries d'un instantané (ex. celui d'un autre processus)."""
+        for labels, (counts, total) in snapshot:
+            labels = tuple(tuple(pair) for pair in labels)
+            series = self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0])
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+class Counter():
+    """Compteur monotone, une série par jeu d'étiquettes."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+
+    def inc(self, labels, value=1):
+        """Incrémente la série labels. À appeler sous le verrou du registre."""
+        self._series[labels] = self._series.get(labels, 0) + value
+
+    def snapshot(self):
+        """Séries au format JSON: [[étiquettes, valeur], ...]."""
+        return [[list(labels), value] for labels, value in self._series.items()]
+
+    def merge(self, snapshot):
+        """Ajoute les séries d'un instantané (ex. celui d'un autre processus)."""
+        for labels, value in snapshot:
+            self.inc(tuple(tuple(pair) for pair in labels), value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        lines += [f'{self.name}{format_labels(labels)} {value}' for labels, value in sorted(self._series.items())]
+        return lines
+
+
+def format_labels(labels):
+    """(('stage', 'plot'),) -> '{stage="plot"}'"""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+class MetricsRegistry():
+    """
+    Métriques de temps des callbacks, exposées au format texte de Prometheus.
+
+    Chaque mesure coûte deux appels à perf_counter et une recherche dichotomique dans les
+    bornes de l'histogramme, sous un verrou: quelques microsecondes, ce qui permet de laisser
+    l'instrumentation active en production.
+
+    Avec plusieurs workers (gunicorn), chaque processus a ses propres compteurs et une lecture
+    de /metrics n'atteint qu'un seul d'entre eux. Avec directory, les processus partagent un
+    dossier: chacun y écrit périodiquement (toutes les flush_interval secondes, si ses métriques
+    ont changé) un instantané metrics_<pid>.json, et render additionne les instantanés de tous
+    les processus. Les compteurs et histogrammes des processus terminés restent comptés, pour
+    rester monotones. Les valeurs lues par fonction (set_gauge, set_counter) décrivent l'état
+    d'un processus: elles sont exposées par processus en vie (étiquette pid), sans somme.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # Sérialise les écritures de l'instantané (fil d'écriture périodique et lectures de /metrics)
+        self._write_lock = threading.Lock()
+        # Dernier instantané lu de chaque processus, réutilisé si sa lecture échoue
+        self._last_snapshots = {}
+        self.stage_duration = Histogram('oscars_stage_duration_seconds',
+                                        'Durée des étapes des callbacks (filtre, agrégation, figure, sérialisation)')
+        self.callback_duration = Histogram('oscars_callback_duration_seconds',
+                                           'Durée totale des callbacks Dash, sérialisation comprise')
+        self.callback_calls = Counter('oscars_callback_calls_total', 'Nombre d\'appels des callbacks Dash')
+        self.callback_errors = Counter('oscars_callback_errors_total', 'Nombre de callbacks Dash terminés par une exception')
+        self._gauges = {}
+        self._dirty = False
+        self._flusher = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        # Un verrou tenu par un autre thread au moment d'un fork le resterait dans l'enfant
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _metrics(self):
+        return (self.stage_duration, self.callback_duration, self.callback_calls, self.callback_errors)
+
+    def _after_fork(self):
+        """
+        Dans un processus créé par fork: repartir de métriques vides. Les séries héritées
+        appartiennent au parent, qui les écrit dans son propre instantané.
+        """
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        for metric in self._metrics():
+            metric._series = {}
+        self._dirty = False
+        self._flusher = None
+
+    def _changed(self):
+        """À appeler sous le verrou après une mesure: programme l'écriture de l'instantané."""
+        if self.directory is None:
+            return
+        self._dirty = True
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    # Le fil doit survivre (ex. dossier supprimé): l'écriture sera retentée
+                    logging.getLogger(__name__).exception("Écriture de l'instantané des métriques impossible")
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f'metrics_{pid}.json')
+
+    def flush(self):
+        """
+        Écrit l'instantané du processus courant dans directory (écriture atomique).
+
+        Un seul écrivain à la fois: l'instantané est pris, écrit et renommé sous _write_lock,
+        de sorte qu'un instantané plus ancien ne remplace jamais un plus récent.
+        """
+        with self._write_lock:
+            with self._lock:
+                snapshot = {metric.name: metric.snapshot() for metric in self._metrics()}
+                self._dirty = False
+            snapshot['gauges'] = {name: value_func() for name, (_, _, value_func) in self._gauges.items()}
+            path = self._snapshot_path(os.getpid())
+            with open(f'{path}.tmp', 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(f'{path}.tmp', path)
+
+    def reset(self):
+        """
+        Oublie les mesures faites jusqu'ici: métriques en mémoire et instantanés de directory.
+
+        À appeler dans le maître avant le fork des workers: les rendus du préchauffage (maître et
+        processus du pool) ne sont pas des requêtes servies, et le maître ne sert rien ensuite.
+        """
+        with self._write_lock:
+            with self._lock:
+                for metric in self._metrics():
+                    metric._series = {}
+                self._dirty = False
+            self._last_snapshots.clear()
+            if self.directory is not None:
+                for path in glob.glob(self._snapshot_path('*')):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def observe(self, stage, operation, seconds):
+        with self._lock:
+            self.stage_duration.observe((('stage', stage), ('operation', operation)), seconds)
+            self._changed()
+
+    def timed(self, stage, operation=None):
+        """Décorateur qui mesure la durée de chaque appel de la fonction décorée."""
+        def decorator(func):
+            name = operation or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(stage, name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def instrument(self, obj, names, stage):
+        """Remplace les méthodes names de obj (instance ou classe) par leurs versions mesurées."""
+        for name in names:
+            setattr(obj, name, self.timed(stage, name)(getattr(obj, name)))
+
+    def instrument_serialization(self, module):
+        """Mesure la fonction to_json utilisée par module pour sérialiser les réponses des callbacks."""
+        if hasattr(module, 'to_json'):
+            self.instrument(module, ['to_json'], stage='serialisation')
+
+    def instrument_callbacks(self, app):
+        """
+        Mesure chaque callback serveur déclaré sur app (durée totale, appels et erreurs).
+
+        À appeler après la déclaration de tous les callbacks.
+        """
+        for output, entry in app.callback_map.items():
+            if entry.get('callback') is not None:
+                entry['callback'] = self._timed_callback(entry['callback'], self.callback_label(output))
+
+    @staticmethod
+    def callback_label(output):
+        """'..a.options...b.figure..' -> 'b.figure': la dernière sortie identifie le callback."""
+        return output.strip('.').split('...')[-1]
+
+    def _timed_callback(self, callback, label):
+        labels = (('callback', label),)
+
+        @functools.wraps(callback)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return callback(*args, **kwargs)
+            except PreventUpdate:
+                raise
+            except Exception:
+                with self._lock:
+                    self.callback_errors.inc(labels)
+                    self._changed()
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.callback_calls.inc(labels)
+                    self.callback_duration.observe(labels, elapsed)
+                    self._changed()
+        return wrapper
+
+    def set_gauge(self, name, help_text, value_func):
+        """Jauge évaluée à chaque lecture de /metrics (ex. taille du cache de figures)."""
+        self._gauges[name] = (help_text, 'gauge', value_func)
+
+    def set_counter(self, name, help_text, value_func):
+        """Comme set_gauge, pour une valeur croissante tenue ailleurs (ex. succès du cache de figures)."""
+        self._gauges[name] = (help_text, 'counter', value_func)
+
+    @staticmethod
+    def _is_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _merged(self):
+        """Métriques et jauges additionnées sur tous les instantanés de directory."""
+        self.flush()
+        metrics = [Histogram(metric.name, metric.help_text, metric.buckets) if isinstance(metric, Histogram)
+                   else Counter(metric.name, metric.help_text) for metric in self._metrics()]
+        gauges = {name: {} for name in self._gauges}
+        for path in glob.glob(self._snapshot_path('*')):
+            try:
+                with open(path) as f:
+                    snapshot = self._last_snapshots[path] = json.load(f)
+            except (OSError, ValueError):
+                # Instantané illisible: le dernier lu est gardé, pour que les sommes ne diminuent pas
+                snapshot = self._last_snapshots.get(path)
+                if snapshot is None:
+                    continue
+            for metric in metrics:
+                metric.merge(snapshot.get(metric.name, []))
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+            if self._is_alive(pid):
+                for name, value in snapshot.get('gauges', {}).items():
+                    if name in gauges:
+                        gauges[name][pid] = value
+        return metrics, gauges
+
+    def render(self):
+        """Toutes les métriques au format texte de Prometheus (version 0.0.4)."""
+        if self.directory is not None:
+            # Les valeurs lues par fonction (état d'un processus, ex. son cache de figures, hérité
+            # du maître lors du fork) ne s'additionnent pas: une série par processus en vie
+            metrics, gauges = self._merged()
+            lines = [line for metric in metrics for line in metric.render()]
+            values = {name: [(format_labels((('pid', pid),)), value) for pid, value in sorted(by_pid.items())]
+                      for name, by_pid in gauges.items()}
+        else:
+            with self._lock:
+                lines = [line for metric in self._metrics() for line in metric.render()]
+            values = {name: [('', value_func())] for name, (_, _, value_func) in self._gauges.items()}
+        for name, (help_text, kind, _) in self._gauges.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            lines += [f'{name}{labels} {value}' for labels, value in values[name]]
+        return '\n'.join(lines) + '\n'
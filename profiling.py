@@ -0,0 +1,150 @@
+import cProfile
+import functools
+import hmac
+import io
+import itertools
+import json
+import marshal
+import pstats
+import threading
+import time
+from collections import OrderedDict
+
+import flask
+
+# En-tête HTTP qui demande le profilage d'une requête de callback, et donne accès aux profils.
+# Sa valeur doit être le jeton secret du profileur
+PROFILE_HEADER = 'X-Oscars-Profile'
+
+# Adresses autorisées pour les routes de consultation et pour l'en-tête
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+class RequestProfiler():
+    """
+    Profilage cProfile à la demande des requêtes de callback Dash.
+
+    Une requête est profilée si le profilage est actif pour toutes les requêtes (always=True,
+    à n'utiliser qu'avec un jeton pour pouvoir lire les profils), ou si elle provient de la machine locale et porte l'en-tête X-Oscars-Profile avec le jeton
+    secret (token). L'adresse seule ne suffit pas: derrière un proxy local, toutes les requêtes
+    semblent locales. Sans jeton, l'en-tête est ignoré et les routes de consultation répondent 404.
+    Les N derniers profils sont conservés en mémoire, un par couple (callback, entrées): rejouer
+    la même interaction remplace son profil.
+    """
+
+    def __init__(self, maxsize=20, always=False, token=None):
+        self.maxsize = maxsize
+        self.always = always
+        self.token = token or None
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_local():
+        return flask.request.remote_addr in LOCAL_ADDRESSES
+
+    def is_authorized(self):
+        """Requête locale portant le jeton dans l'en-tête X-Oscars-Profile (toujours faux sans jeton)."""
+        if self.token is None or not self.is_local():
+            return False
+        return hmac.compare_digest(flask.request.headers.get(PROFILE_HEADER, '').encode(), self.token.encode())
+
+    def should_profile(self):
+        return self.always or self.is_authorized()
+
+    def wrap(self, view):
+        """Enveloppe la vue de dispatch des callbacks (route /_dash-update-component)."""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.should_profile():
+                return view(*args, **kwargs)
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            try:
+                return profile.runcall(view, *args, **kwargs)
+            finally:
+                self.add(profile, time.perf_counter() - start)
+        return wrapper
+
+    def add(self, profile, duration):
+        """Enregistre le profil de la requête courante et évince le plus ancien au-delà de maxsize."""
+        body = flask.request.get_json(silent=True) or {}
+        callback = body.get('output', '')
+        inputs = json.dumps([[i.get('id'), i.get('property'), i.get('value')] for i in body.get('inputs', [])], default=str)
+        profile.create_stats()
+        entry = {
+            'id': next(self._ids),
+            'callback': callback,
+            'inputs': json.loads(inputs),
+            'changed': body.get('changedPropIds', []),
+            'duration_ms': duration * 1000,
+            'timestamp': time.time(),
+            'stats': profile.stats,
+        }
+        with self._lock:
+            key = (callback, inputs)
+            self._profiles.pop(key, None)
+            self._profiles[key] = entry
+            while len(self._profiles) > self.maxsize:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((entry for entry in self._profiles.values() if entry['id'] == profile_id), None)
+
+    def summaries(self):
+        """Profils conservés, du plus récent au plus ancien, sans les statistiques."""
+        with self._lock:
+            entries = list(self._profiles.values())
+        return [{key: value for key, value in entry.items() if key != 'stats'} for entry in reversed(entries)]
+
+    @staticmethod
+    def to_text(entry, sort='cumulative', limit=30):
+        """Les limit fonctions les plus coûteuses selon sort, au format de pstats."""
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.stats = entry['stats']
+        stats.get_top_level_stats()
+        stats.sort_stats(sort).print_stats(limit)
+        return f"{entry['callback']}\n{json.dumps(entry['inputs'])}\n{entry['duration_ms']:.1f} ms\n{stream.getvalue()}"
+
+    def register_routes(self, server, prefix='/_profiles'):
+        """
+        Routes de consultation, réservées aux requêtes locales qui portent le jeton
+        (ex. curl -H 'X-Oscars-Profile: <jeton>' http://127.0.0.1:8070/_profiles):
+          {prefix}               liste JSON des profils conservés
+          {prefix}/<id>          top-N texte (?sort=cumulative|tottime|calls&limit=30)
+          {prefix}/<id>.pstats   fichier pstats (python -m pstats, snakeviz, ...)
+        """
+        def local_only(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.token is None:
+                    flask.abort(404)
+                if not self.is_authorized():
+                    flask.abort(403)
+                return view(*args, **kwargs)
+            return wrapper
+
+        @server.route(prefix)
+        @local_only
+        def profiles_index():
+            return flask.jsonify(self.summaries())
+
+        @server.route(f'{prefix}/<int:profile_id>')
+        @local_only
+        def profile_text(profile_id):
+            entry = self.get(profile_id) or flask.abort(404)
+            sort = flask.request.args.get('sort', 'cumulative')
+            if sort not in pstats.Stats.sort_arg_dict_default:
+                flask.abort(400)
+            limit = flask.request.args.get('limit', 30, type=int)
+            return flask.Response(self.to_text(entry, sort, limit), mimetype='text/plain')
+
+        @server.route(f'{prefix}/<int:profile_id>.pstats')
+        @local_only
+        def profile_pstats(profile_id):
+            entry = self.get(profile_id) or flask.abort(404)
+            return flask.Response(marshal.dumps(entry['stats']), mimetype='application/octet-stream',
+                                  headers={'Content-Disposition': f'attachment; filename=profile_{profile_id}.pstats'})
@@ -0,0 +1,202 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# Suite de lettres ou de chiffres, après passage en minuscules et retrait des accents
+TOKEN_PATTERN = re.compile(r'\w+')
+# Termes et séparateurs d'étiquettes d'un vocabulaire découpé en une seule passe
+TOKEN_OR_BREAK_PATTERN = re.compile(r'\w+|\n')
+# Signes diacritiques combinants laissés par la décomposition NFKD (é -> e + ◌́)
+COMBINING_PATTERN = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+
+# Longueur minimale d'une requête (caractères des termes): en deçà, un préfixe d'une lettre
+# sélectionne une grande partie des lignes et n'aide pas à trouver une personne
+MIN_QUERY_LENGTH = 2
+
+
+def normalize_text(text):
+    """Minuscules sans accents: 'Penélope Cruz' -> 'penelope cruz'."""
+    text = str(text).lower()
+    if text.isascii():
+        return text
+    return COMBINING_PATTERN.sub('', unicodedata.normalize('NFKD', text))
+
+
+def tokenize(text):
+    """Termes normalisés d'un texte: "Monster's Ball" -> ['monster', 's', 'ball']."""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def tokenize_labels(labels):
+    """
+    Termes de toutes les étiquettes d'un vocabulaire, en une seule passe sur leur concaténation.
+
+    Returns:
+        tuple: (indice de l'étiquette de chaque terme, termes), dans l'ordre des étiquettes
+    """
+    text = normalize_text('\n'.join(str(label).replace('\n', ' ') for label in labels))
+    parts = np.array(TOKEN_OR_BREAK_PATTERN.findall(text), dtype=object)
+    breaks = parts == '\n'
+    return np.cumsum(breaks)[~breaks], parts[~breaks]
+
+
+def expand_ranges(offsets, values, ids):
+    """Concaténation de values[offsets[i]:offsets[i + 1]] pour chaque i de ids, sans boucle Python."""
+    starts = offsets[ids]
+    lengths = offsets[ids + 1] - starts
+    positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[positions]
+
+
+class SearchIndex():
+    """
+    Index de recherche par préfixe de terme sur des colonnes textuelles encodées (Name, Film).
+
+    Seuls les vocabulaires sont découpés en termes: chaque étiquette distincte n'est traitée
+    qu'une fois, quel que soit le nombre de lignes. L'index contient la liste triée des termes,
+    partagée par toutes les colonnes, et pour chaque colonne trois tables CSR:
+      - terme -> étiquettes, dans l'ordre des termes: les termes d'un même préfixe forment
+        une tranche contiguë, dont le nombre de lignes est lu dans une somme préfixe;
+      - étiquette -> lignes;
+      - étiquette -> termes.
+
+    Une requête est découpée en termes; une ligne correspond si chaque terme est le préfixe
+    d'un terme de l'une des colonnes. Seul le terme le plus sélectif est développé en lignes;
+    les autres filtrent ces lignes candidates par leurs termes, pour un coût qui ne dépend pas
+    du nombre de lignes qu'ils sélectionneraient seuls (ex. 'person' dans 'person 1234').
+    """
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.tokens = []
+        self.columns = {}
+
+    def build(self, columns):
+        """
+        Construit l'index.
+
+        Args:
+            columns: {colonne: (codes des lignes, vocabulaire)}, code -1 pour une valeur manquante
+        """
+        # Termes de chaque vocabulaire, numérotés dans l'ordre alphabétique commun à toutes les colonnes
+        tokenized = {column: tokenize_labels(vocabulary) for column, (_, vocabulary) in columns.items()}
+        all_tokens = np.concatenate([tokens for _, tokens in tokenized.values()])
+        all_ids, uniques = pd.factorize(all_tokens, sort=True)
+        self.tokens = uniques.tolist()
+        n_terms = len(self.tokens)
+        splits = np.cumsum([len(tokens) for _, tokens in tokenized.values()])[:-1]
+
+        self.columns = {}
+        for (column, (codes, vocabulary)), token_ids in zip(columns.items(), np.split(all_ids, splits)):
+            n_labels = len(vocabulary)
+            codes = np.asarray(codes, dtype=np.int64)
+
+            # Étiquette -> lignes (les lignes sans valeur ne sont jamais trouvées)
+            valid = codes >= 0
+            label_sizes = np.bincount(codes[valid], minlength=n_labels)
+            label_offsets = np.zeros(n_labels + 1, dtype=np.int64)
+            np.cumsum(label_sizes, out=label_offsets[1:])
+            # Positions sur 32 bits: le tri des lignes trouvées est bien plus rapide qu'en 64 bits
+            label_rows = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')].astype(np.int32)
+
+            # Paires (étiquette, terme) distinctes, triées par étiquette puis terme: étiquette -> termes
+            pairs = np.unique(tokenized[column][0] * n_terms + token_ids)
+            pair_labels, label_token_ids = pairs // n_terms, pairs % n_terms
+            label_token_offsets = np.zeros(n_labels + 1, dtype=np.int64)
+            np.cumsum(np.bincount(pair_labels, minlength=n_labels), out=label_token_offsets[1:])
+
+            # Terme -> étiquettes par tri stable des paires selon le terme
+            token_labels = pair_labels[np.argsort(label_token_ids, kind='stable')]
+            token_offsets = np.zeros(n_terms + 1, dtype=np.int64)
+            np.cumsum(np.bincount(label_token_ids, minlength=n_terms), out=token_offsets[1:])
+            # Lignes cumulées le long des paires (terme, étiquette): taille d'une tranche de termes en O(1)
+            token_row_prefix = np.zeros(len(token_labels) + 1, dtype=np.int64)
+            np.cumsum(label_sizes[token_labels], out=token_row_prefix[1:])
+
+            self.columns[column] = {
+                'codes': codes,
+                'label_offsets': label_offsets,
+                'label_rows': label_rows,
+                'label_token_offsets': label_token_offsets,
+                'label_token_ids': label_token_ids,
+                'token_offsets': token_offsets,
+                'token_labels': token_labels,
+                'token_row_prefix': token_row_prefix,
+            }
+        return self
+
+    def _term_range(self, term):
+        """Tranche [low, high) des termes qui commencent par term."""
+        low = bisect_left(self.tokens, term)
+        return low, bisect_left(self.tokens, term + '\uffff', low)
+
+    def _range_size(self, low, high):
+        """Nombre de lignes (majoré: une ligne peut correspondre dans plusieurs colonnes) d'une tranche de termes."""
+        size = 0
+        for index in self.columns.values():
+            start, end = index['token_offsets'][low], index['token_offsets'][high]
+            size += int(index['token_row_prefix'][end] - index['token_row_prefix'][start])
+        return size
+
+    def _labels(self, index, low, high):
+        """Étiquettes d'une colonne ayant un terme dans la tranche [low, high), avec répétitions possibles."""
+        return index['token_labels'][index['token_offsets'][low]:index['token_offsets'][high]]
+
+    def _expand(self, low, high):
+        """Lignes dont une colonne a un terme dans la tranche [low, high), triées."""
+        return np.unique(np.concatenate([
+            expand_ranges(index['label_offsets'], index['label_rows'], self._labels(index, low, high))
+            for index in self.columns.values()
+        ]))
+
+    def _filter(self, rows, low, high):
+        """Lignes de rows dont une colonne a un terme dans la tranche [low, high)."""
+        keep = np.zeros(len(rows), dtype=bool)
+        for index in self.columns.values():
+            codes = index['codes'][rows]
+            labels = self._labels(index, low, high)
+            if len(labels) < 32 * len(rows):
+                # Peu d'étiquettes: masque sur les étiquettes, lu aux codes des lignes
+                # (une case de plus que d'étiquettes: le code -1 lit cette case, toujours fausse)
+                mask = np.zeros(len(index['label_offsets']), dtype=bool)
+                mask[labels] = True
+                keep |= mask[codes]
+                continue
+            # Terme peu sélectif (ex. 'person'): termes des étiquettes des seules lignes candidates
+            candidates = np.flatnonzero(codes >= 0)
+            offsets = index['label_token_offsets']
+            lengths = offsets[codes[candidates] + 1] - offsets[codes[candidates]]
+            tokens = expand_ranges(offsets, index['label_token_ids'], codes[candidates])
+            keep[np.repeat(candidates, lengths)[(tokens >= low) & (tokens < high)]] = True
+        return rows[keep]
+
+    def search(self, query):
+        """
+        Lignes qui correspondent à une requête.
+
+        Args:
+            query: Texte libre (ex. 'halle ber', 'monster')
+
+        Returns:
+            numpy.ndarray: Positions des lignes, triées (vide si la requête est trop courte)
+        """
+        terms = list(dict.fromkeys(tokenize(query or '')))
+        if sum(len(term) for term in terms) < MIN_QUERY_LENGTH:
+            return np.empty(0, dtype=np.int32)
+
+        ranges = [self._term_range(term) for term in terms]
+        sizes = [self._range_size(low, high) for low, high in ranges]
+        if min(sizes) == 0:
+            return np.empty(0, dtype=np.int32)
+
+        # Développer le terme le plus sélectif, filtrer par les autres
+        order = np.argsort(sizes, kind='stable')
+        rows = self._expand(*ranges[order[0]])
+        for i in order[1:]:
+            if len(rows) == 0:
+                break
+            rows = self._filter(rows, *ranges[i])
+        return rows
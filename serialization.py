@@ -0,0 +1,122 @@
+import functools
+import json
+import threading
+import time
+import uuid
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+try:
+    import orjson
+except ImportError:  # orjson absent (voir requirements.txt): encodeur de Plotly seul, plus lent
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class RawJSON():
+    """
+    Valeur de sortie de callback déjà sérialisée en JSON (bytes).
+
+    Avec install_raw_json, le texte est inséré tel quel dans la réponse de Dash. Sinon,
+    to_plotly_json le décode pour l'encodeur de Plotly (même résultat, sans le gain).
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def to_plotly_json(self):
+        return orjson.loads(self.data) if orjson is not None else json.loads(self.data)
+
+
+def _orjson_default(obj):
+    """Types qu'orjson ne sait pas encoder seul (tableaux numpy d'objets, ex. customdata mixte)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError
+
+
+def encode_figure(fig):
+    """
+    Sérialise une figure Plotly en JSON (bytes).
+
+    Avec orjson, le dictionnaire de la figure est encodé directement, les tableaux numpy sans
+    conversion en listes; à défaut (ou pour un type non géré), l'encodeur de Plotly est utilisé.
+    """
+    data = fig.to_plotly_json() if hasattr(fig, 'to_plotly_json') else fig
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=ORJSON_OPTIONS, default=_orjson_default)
+        except TypeError:
+            pass
+    return to_json_plotly(data).encode('utf8')
+
+
+class FigureEncoder():
+    """
+    Encode les figures des callbacks en RawJSON et mesure le temps d'encodage par type de figure.
+
+    observer, s'il est défini, reçoit (nom de la figure, secondes) à chaque encodage
+    (ex. histogramme de MetricsRegistry).
+    """
+
+    def __init__(self, observer=None):
+        self.observer = observer
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def encode(self, name, fig):
+        start = time.perf_counter()
+        data = encode_figure(fig)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            count, total, size = self._stats.get(name, (0, 0.0, 0))
+            self._stats[name] = (count + 1, total + elapsed, size + len(data))
+        if self.observer is not None:
+            self.observer(name, elapsed)
+        return RawJSON(data)
+
+    def stats(self):
+        """{figure: {'count', 'mean_ms', 'total_ms', 'mean_bytes'}}"""
+        with self._lock:
+            return {
+                name: {'count': count, 'mean_ms': total * 1000 / count, 'total_ms': total * 1000, 'mean_bytes': size / count}
+                for name, (count, total, size) in self._stats.items()
+            }
+
+
+def install_raw_json(module):
+    """
+    Remplace la fonction to_json de module (dash._callback) par une version qui insère les
+    valeurs RawJSON de la réponse sans les décoder ni les réencoder.
+
+    Seules les valeurs de premier niveau des sorties ({'response': {id: {propriété: valeur}}})
+    sont examinées; le reste de la réponse (options, valeur des checklists) est encodé normalement.
+    """
+    to_json = module.to_json
+
+    @functools.wraps(to_json)
+    def wrapper(value):
+        outputs = value.get('response') if isinstance(value, dict) else None
+        if not isinstance(outputs, dict):
+            return to_json(value)
+        fragments = {}
+        for props in outputs.values():
+            for prop, prop_value in props.items():
+                if isinstance(prop_value, RawJSON):
+                    placeholder = f'raw-json-{uuid.uuid4().hex}'
+                    fragments[f'"{placeholder}"'] = prop_value.data.decode('utf8')
+                    props[prop] = placeholder
+        text = to_json(value)
+        for placeholder, fragment in fragments.items():
+            text = text.replace(placeholder, fragment, 1)
+        return text
+
+    module.to_json = wrapper
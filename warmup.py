@@ -0,0 +1,151 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from serialization import RawJSON
+
+# Tâches du préchauffage en cours, héritées par les processus du pool lors du fork
+# (les fonctions de rendu et leurs arguments ne sont donc jamais sérialisés)
+_tasks = []
+
+
+def _render(index):
+    """Exécuté dans un processus du pool: rendu hors cache de la tâche index, en JSON (bytes)."""
+    func, args = _tasks[index]
+    return func.__wrapped__(*args).data
+
+
+class Warmup():
+    """
+    Préchauffage du cache de figures au démarrage.
+
+    Chaque tâche est un couple (fonction décorée par FigureCache.memoize, arguments). Les
+    figures sont rendues en parallèle dans un pool de processus créés par fork (ils partagent
+    les données déjà chargées), puis placées dans le cache du processus principal sous la clé
+    que memoize aurait calculée. Les tâches non terminées à l'expiration du budget de temps
+    sont abandonnées, et les processus du pool terminés: elles seront calculées à la première
+    requête.
+
+    Les processus du pool sont créés dès start(), dans le thread appelant: le fork a lieu avant
+    que le serveur ne démarre ses threads, et non depuis le thread d'arrière-plan.
+
+    Sans fork (Windows), ou avec workers=0, les figures sont rendues dans le processus principal.
+    """
+
+    def __init__(self, cache, tasks, workers=None, budget=60.0):
+        self.cache = cache
+        self.tasks = list(tasks)
+        self.workers = multiprocessing.cpu_count() if workers is None else workers
+        self.budget = budget
+        self.rendered = 0
+        self.failed = 0
+        self.duration = None
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def start(self):
+        """
+        Lance le préchauffage: le pool est créé ici, puis ses résultats sont collectés dans
+        un thread; le serveur peut répondre pendant ce temps.
+        """
+        start = time.perf_counter()
+        pool = self._submit() if self._uses_pool() else None
+        self._thread = threading.Thread(target=self.run, args=(pool, start), name='warmup', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Attend la fin du préchauffage (ex. avant le fork des workers gunicorn)."""
+        return self._done.wait(timeout)
+
+    def run(self, pool=None, start=None):
+        """Préchauffage complet dans le thread appelant (pool et start sont fournis par start())."""
+        start = time.perf_counter() if start is None else start
+        try:
+            if pool is None and self._uses_pool():
+                pool = self._submit()
+            if pool is not None:
+                self._collect(*pool, start + self.budget)
+            else:
+                self._run_inline(start + self.budget)
+        finally:
+            self.duration = time.perf_counter() - start
+            self._done.set()
+
+    def _uses_pool(self):
+        return bool(self.tasks) and self.workers > 0 and 'fork' in multiprocessing.get_all_start_methods()
+
+    def _store(self, index, data):
+        func, args = self.tasks[index]
+        self.cache.set(self.cache.make_key(func.__qualname__, args, {}), RawJSON(data))
+        self.rendered += 1
+
+    def _run_inline(self, deadline):
+        for index in range(len(self.tasks)):
+            if time.perf_counter() > deadline:
+                break
+            func, args = self.tasks[index]
+            try:
+                data = func.__wrapped__(*args).data
+            except Exception:
+                # L'erreur se reproduira, et sera signalée, à la requête correspondante
+                self.failed += 1
+                continue
+            self._store(index, data)
+
+    def _submit(self):
+        """Crée le pool et lui soumet toutes les tâches: les processus sont créés (fork) ici."""
+        global _tasks
+        _tasks = self.tasks
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+        return executor, {executor.submit(_render, index): index for index in range(len(self.tasks))}
+
+    def _collect(self, executor, futures, deadline):
+        global _tasks
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        # L'erreur se reproduira, et sera signalée, à la requête correspondante
+                        self.failed += 1
+                        continue
+                    self._store(futures[future], future.result())
+        finally:
+            if pending:
+                self._terminate(executor)
+            executor.shutdown(wait=True, cancel_futures=True)
+            _tasks = []
+
+    @staticmethod
+    def _terminate(executor):
+        """
+        Budget expiré: annule les tâches en attente et termine les processus encore occupés,
+        qui sinon continueraient à rendre des figures inutiles (et seraient hérités par fork).
+        """
+        # Pas d'API publique pour interrompre une tâche en cours: attribut interne de concurrent.futures
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'rendered': self.rendered,
+            'failed': self.failed,
+            'tasks': len(self.tasks),
+            'workers': self.workers,
+            'budget_s': self.budget,
+            'duration_s': self.duration,
+        }
@@ -0,0 +1,48 @@
+"""
+Point d'entrée de production (WSGI).
+
+Les données sont chargées une seule fois, à l'import de app.py, dans le processus maître.
+Avec preload_app (voir gunicorn.conf.py), les workers sont ensuite créés par fork et partagent
+ces données en copie sur écriture: aucun worker ne relit le CSV ni le cache binaire.
+Le mode debug de Dash (outils de développement, rechargement à chaud) n'est pas activé.
+
+Lancement multi-processus (Linux/macOS), un worker par cœur par défaut:
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Variables d'environnement: OSCARS_BIND (défaut 0.0.0.0:8070), OSCARS_WORKERS (défaut: nombre de cœurs),
+OSCARS_METRIQUES_DIR (dossier où /metrics additionne les métriques des workers; défaut: dossier temporaire).
+Avec OSCARS_PRECHAUFFAGE=1, le cache de figures est préchauffé dans le maître avant le fork des
+workers (voir app.py); la sonde /ready répond 200 une fois le préchauffage terminé.
+Le profilage à la demande (en-tête X-Oscars-Profile, /_profiles) reste désactivé sans
+OSCARS_PROFILAGE_JETON: derrière un proxy local, toutes les requêtes semblent locales.
+
+Développement (un seul processus, mode debug):
+    python app.py
+"""
+import gc
+
+
+def create_app():
+    """
+    Retourne l'application Dash prête à servir.
+
+    Le chargement des données et la déclaration des callbacks ont lieu à l'import de app.py;
+    les appels suivants retournent la même instance.
+    """
+    import app
+    # Avec preload_app, les workers héritent du cache de figures préchauffé
+    app.warmup.wait()
+    # /metrics ne décrit que les workers: les mesures du préchauffage et le maître en sont exclus
+    if app.metriques:
+        app.metrics_registry.reset()
+    return app.app
+
+
+application = create_app()
+
+# Serveur Flask à passer au serveur WSGI
+server = application.server
+
+# Les objets chargés avant le fork ne sont plus parcourus par le ramasse-miettes: les workers
+# ne modifient donc pas leurs en-têtes et les pages mémoire restent partagées
+gc.freeze()